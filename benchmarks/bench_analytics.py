@@ -0,0 +1,37 @@
+"""
+Cost of the windowed analytics of `get_window_stats` over a full history.
+"""
+
+from .fake_dataset import ALGORITHM, BACKEND, VERSION, FakeGitHub, dataset_dir
+
+
+class WindowStats:
+    """Window metrics of a history already in memory, computed or read back."""
+
+    params = ([10, 100, 1000], [None, 1], [4, 15])
+    param_names = ["window", "step", "size"]
+    timeout = 300
+
+    def setup_cache(self):
+        dataset_dir()
+
+    def setup(self, window, step, size):
+        self.gh = FakeGitHub()
+        if not hasattr(self.gh.qsb, "get_window_stats"):
+            raise NotImplementedError
+        self.gh.warm(size)
+        self.history = self.gh.qsb._get_data(ALGORITHM, size, BACKEND, VERSION)
+        # Stores the result next to the cache entry
+        self.gh.qsb.get_window_stats(ALGORITHM, size, BACKEND, window, step=step, version=VERSION)
+
+    def teardown(self, window, step, size):
+        self.gh.cleanup()
+
+    def time_window_stats(self, window, step, size):
+        """The computation itself, without the memo or the stored result."""
+        self.history._window_stats.clear()
+        self.history.window_stats(window, step or window, 0)
+
+    def time_window_stats_stored(self, window, step, size):
+        """A repeated call, served from the result stored with the cache entry."""
+        self.gh.qsb.get_window_stats(ALGORITHM, size, BACKEND, window, step=step, version=VERSION)
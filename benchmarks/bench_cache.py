@@ -0,0 +1,67 @@
+"""
+Cost of loading a history: downloaded (cold), from the disk cache, or from
+the in-process cache.
+"""
+
+from .fake_dataset import ALGORITHM, BACKEND, VERSION, FakeGitHub, dataset_dir
+
+
+class LoadHistory:
+    """First `get_outcomes` call of a configuration, by cache state."""
+
+    params = (["cold", "disk", "memory"], [4, 8, 12, 15])
+    param_names = ["cache", "size"]
+    # One call per setup: a cold load warms the cache
+    number = 1
+    repeat = (3, 10, 60.0)
+    warmup_time = 0
+    timeout = 300
+
+    def setup_cache(self):
+        dataset_dir()
+
+    def setup(self, cache, size):
+        self.gh = FakeGitHub()
+        self.gh.reset_cache()
+        if cache != "cold":
+            self.gh.warm(size)
+            if cache == "disk" and hasattr(self.gh.qsb, "clear_memory_cache"):
+                self.gh.qsb.clear_memory_cache()
+
+    def teardown(self, cache, size):
+        self.gh.cleanup()
+
+    def time_load(self, cache, size):
+        self.gh.qsb.get_outcomes(ALGORITHM, size, BACKEND, 100, versions=[VERSION], seed=1)
+
+    def track_requests(self, cache, size):
+        """HTTP requests made by the load."""
+        before = self.gh.adapter.requests
+        self.gh.qsb.get_outcomes(ALGORITHM, size, BACKEND, 100, versions=[VERSION], seed=1)
+        return self.gh.adapter.requests - before
+
+    track_requests.unit = "requests"
+
+
+class Prefetch:
+    """Mirroring every history of the fake dataset into an empty cache."""
+
+    number = 1
+    repeat = (1, 5, 120.0)
+    warmup_time = 0
+    timeout = 600
+
+    def setup_cache(self):
+        dataset_dir()
+
+    def setup(self):
+        self.gh = FakeGitHub()
+        if not hasattr(self.gh.qsb, "prefetch"):
+            raise NotImplementedError
+        self.gh.reset_cache()
+
+    def teardown(self):
+        self.gh.cleanup()
+
+    def time_prefetch(self):
+        self.gh.qsb.prefetch(VERSION, kinds=["circuit"])
@@ -0,0 +1,65 @@
+"""
+Dataset exploration: `get_index` and `get_metadata`.
+"""
+
+from .fake_dataset import ALGORITHM, BACKEND, VERSION, FakeGitHub, dataset_dir
+
+
+class Index:
+    """`get_index` with an empty cache or after a first call."""
+
+    params = ["cold", "warm"]
+    param_names = ["cache"]
+    number = 1
+    repeat = (5, 20, 30.0)
+    warmup_time = 0
+
+    def setup_cache(self):
+        dataset_dir()
+
+    def setup(self, cache):
+        self.gh = FakeGitHub()
+        self.gh.reset_cache()
+        self.gh.qsb.get_versions()
+        if cache == "warm":
+            self.gh.qsb.get_index(version=VERSION)
+
+    def teardown(self, cache):
+        self.gh.cleanup()
+
+    def time_get_index(self, cache):
+        self.gh.qsb.get_index(version=VERSION)
+
+    def track_requests(self, cache):
+        """HTTP requests made by the call."""
+        before = self.gh.adapter.requests
+        self.gh.qsb.get_index(version=VERSION)
+        return self.gh.adapter.requests - before
+
+    track_requests.unit = "requests"
+
+
+class Metadata:
+    """`get_metadata` of one configuration with an empty cache or after a first call."""
+
+    params = ["cold", "warm"]
+    param_names = ["cache"]
+    number = 1
+    repeat = (5, 20, 30.0)
+    warmup_time = 0
+
+    def setup_cache(self):
+        dataset_dir()
+
+    def setup(self, cache):
+        self.gh = FakeGitHub()
+        self.gh.reset_cache()
+        self.gh.qsb.get_versions()
+        if cache == "warm":
+            self.gh.qsb.get_metadata(ALGORITHM, 8, BACKEND, VERSION)
+
+    def teardown(self, cache):
+        self.gh.cleanup()
+
+    def time_get_metadata(self, cache):
+        self.gh.qsb.get_metadata(ALGORITHM, 8, BACKEND, VERSION)
@@ -0,0 +1,80 @@
+"""
+Sampling cost of `get_outcomes` and `get_replicates` with the history already in memory.
+"""
+
+from .fake_dataset import ALGORITHM, BACKEND, VERSION, FakeGitHub, dataset_dir
+
+
+class GetOutcomes:
+    """`get_outcomes` on a warm cache, across shots, strategies and sizes."""
+
+    params = (
+        [10**2, 10**4, 10**6, 10**8],
+        ["sequential", "random"],
+        [False, True],
+        [4, 8, 12, 15],
+    )
+    param_names = ["shots", "strategy", "exact", "size"]
+    timeout = 300
+
+    def setup_cache(self):
+        dataset_dir()
+
+    def setup(self, shots, strategy, exact, size):
+        self.gh = FakeGitHub()
+        self.gh.warm(size)
+
+    def teardown(self, shots, strategy, exact, size):
+        self.gh.cleanup()
+
+    def time_get_outcomes(self, shots, strategy, exact, size):
+        self.gh.qsb.get_outcomes(
+            ALGORITHM, size, BACKEND, shots,
+            strategy=strategy, exact=exact, versions=[VERSION], seed=1,
+        )
+
+
+class MultinomialSample:
+    """Exact down-sampling of an aggregated distribution."""
+
+    params = ([16, 1024, 32768], [10**2, 10**4, 10**6, 10**8])
+    param_names = ["outcomes", "shots"]
+
+    def setup(self, outcomes, shots):
+        self.gh = FakeGitHub()
+        width = max(outcomes - 1, 1).bit_length()
+        # Heavy head, long tail, 10x more shots than requested
+        weights = [1 + (outcomes - i) ** 2 for i in range(outcomes)]
+        scale = 10 * shots / sum(weights)
+        self.agg = {format(i, f"0{width}b"): max(1, int(w * scale)) for i, w in enumerate(weights)}
+
+    def teardown(self, outcomes, shots):
+        self.gh.cleanup()
+
+    def time_multinomial_sample(self, outcomes, shots):
+        self.gh.qsb._multinomial_sample(self.agg, shots, 1)
+
+
+class GetReplicates:
+    """Bootstrap replicates drawn in one `get_replicates` call, warm cache."""
+
+    params = ([10, 1000], [10**3, 10**5], [4, 15])
+    param_names = ["replicates", "shots", "size"]
+    timeout = 300
+
+    def setup_cache(self):
+        dataset_dir()
+
+    def setup(self, replicates, shots, size):
+        self.gh = FakeGitHub()
+        if not hasattr(self.gh.qsb, "get_replicates"):
+            raise NotImplementedError
+        self.gh.warm(size)
+
+    def teardown(self, replicates, shots, size):
+        self.gh.cleanup()
+
+    def time_get_replicates(self, replicates, shots, size):
+        self.gh.qsb.get_replicates(
+            ALGORITHM, size, BACKEND, shots, replicates, versions=[VERSION], seed=1,
+        )
@@ -0,0 +1,226 @@
+"""
+Offline stand-in for the GitHub dataset used by the benchmarks.
+
+A deterministic dataset is generated once into a temporary directory and
+served by a ``requests`` transport adapter mounted on the library's HTTP
+session for the GitHub API and raw-file hosts, so benchmarks exercise the
+real download, parsing and caching code without any network access.
+
+Environment:
+    QSIMBENCH_BENCH_DATA: Directory of the generated dataset
+        (default: ``<tmp>/qsimbench-bench-<batches>``).
+    QSIMBENCH_BENCH_BATCHES: Batches per history (default: 20000, as in
+        the real dataset).
+"""
+
+import hashlib
+import io
+import json
+import os
+import random
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional
+
+from requests.adapters import BaseAdapter
+from requests.models import Response
+
+OWNER, REPO = "superceccho", "qsimbench-dataset"
+API_URL = f"https://api.github.com/repos/{OWNER}/{REPO}/git/trees"
+RAW_URL = f"https://raw.githubusercontent.com/{OWNER}/{REPO}/refs/heads/main/dataset"
+
+VERSION = "v1"
+ALGORITHM = "ghz"
+BACKEND = "fake_fez"
+SIZES = list(range(4, 16))
+SHOTS_PER_BATCH = 50
+N_BATCHES = int(os.getenv("QSIMBENCH_BENCH_BATCHES", 20000))
+
+# Bump when the generated data changes, so stale copies are regenerated
+_GENERATOR_VERSION = 1
+
+
+def _history_lines(size: int, n_batches: int):
+    """GHZ-like batches: all-zeros or all-ones with ~3% independent bit flips."""
+    rng = random.Random(f"{ALGORITHM}-{size}-{BACKEND}")
+    getrandbits = rng.getrandbits
+    ones = (1 << size) - 1
+    spec = f"0{size}b"
+    for _ in range(n_batches):
+        counts: Dict[str, int] = {}
+        for _ in range(SHOTS_PER_BATCH):
+            flips = getrandbits(size) & getrandbits(size) & getrandbits(size) \
+                & getrandbits(size) & getrandbits(size)
+            outcome = format((ones if getrandbits(1) else 0) ^ flips, spec)
+            counts[outcome] = counts.get(outcome, 0) + 1
+        yield json.dumps({"shots": SHOTS_PER_BATCH, "data": counts}) + "\n"
+
+
+def dataset_dir() -> Path:
+    """Generate the fake dataset if needed and return its directory."""
+    root = Path(os.getenv(
+        "QSIMBENCH_BENCH_DATA",
+        Path(tempfile.gettempdir()) / f"qsimbench-bench-{_GENERATOR_VERSION}-{N_BATCHES}",
+    ))
+    if (root / ".complete").exists():
+        return root
+    shutil.rmtree(root, ignore_errors=True)
+    version = root / VERSION
+    (version / "histories" / "circuit").mkdir(parents=True)
+    (root / "versions.json").write_text(json.dumps([VERSION]))
+    (version / "metadata.json").write_text(json.dumps({"version": VERSION}))
+    for size in SIZES:
+        name = f"{ALGORITHM}_{size}_{BACKEND}"
+        with open(version / "histories" / "circuit" / f"{name}.jsonl", "w") as f:
+            f.writelines(_history_lines(size, N_BATCHES))
+        (version / f"{name}_0.json").write_text(json.dumps(
+            {"algorithm": ALGORITHM, "size": size, "backend": BACKEND}
+        ))
+    (root / ".complete").touch()
+    return root
+
+
+def _blob_sha(data: bytes) -> str:
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+class FakeGitHubAdapter(BaseAdapter):
+    """
+    Serve a dataset directory like GitHub does: git trees (recursive or not)
+    under `API_URL` and raw files, with ETags, conditional requests and
+    Range requests, under `RAW_URL`.
+    """
+
+    def __init__(self, root: Path) -> None:
+        super().__init__()
+        self.root = root
+        self.requests = 0
+        self.blobs: Dict[str, str] = {}
+        self.trees: Dict[str, str] = {}  # tree SHA -> directory (relative)
+        self.dirs: Dict[str, str] = {}   # directory -> tree SHA
+        for path in sorted(p for p in root.rglob("*") if p.is_file() and not p.name.startswith(".")):
+            self.blobs[path.relative_to(root).as_posix()] = _blob_sha(path.read_bytes())
+        self._tree_sha("")
+
+    def _tree_sha(self, directory: str) -> str:
+        sha = self.dirs.get(directory)
+        if sha is None:
+            digest = hashlib.sha1(f"tree {directory}".encode())
+            for entry in self._entries(directory):
+                digest.update(f"{entry['path']} {entry['sha']}".encode())
+            sha = self.dirs[directory] = digest.hexdigest()
+            self.trees[sha] = directory
+        return sha
+
+    def _entries(self, directory: str, recursive: bool = False):
+        prefix = f"{directory}/" if directory else ""
+        seen = set()
+        for path, sha in self.blobs.items():
+            if not path.startswith(prefix):
+                continue
+            parts = path[len(prefix):].split("/")
+            for depth in range(1, len(parts) if recursive else min(len(parts), 2)):
+                sub = "/".join(parts[:depth])
+                if sub not in seen:
+                    seen.add(sub)
+                    tree_sha = self._tree_sha(prefix + sub)
+                    yield {"path": sub, "type": "tree", "sha": tree_sha, "url": f"{API_URL}/{tree_sha}"}
+            if recursive or len(parts) == 1:
+                yield {
+                    "path": "/".join(parts), "type": "blob", "sha": sha,
+                    "size": (self.root / path).stat().st_size, "url": "",
+                }
+
+    def send(self, request, **kwargs) -> Response:
+        self.requests += 1
+        url = request.url
+        status, body, headers = 404, b"", {}
+        if url.startswith(f"{API_URL}/"):
+            ref, _, query = url[len(API_URL) + 1:].partition("?")
+            if ref == "main":
+                sha = self._tree_sha("")
+                tree = [{"path": "dataset", "type": "tree", "sha": sha, "url": f"{API_URL}/{sha}"}]
+                status, body = 200, json.dumps({"sha": "main", "tree": tree}).encode()
+            elif ref in self.trees:
+                entries = list(self._entries(self.trees[ref], recursive="recursive" in query))
+                status = 200
+                body = json.dumps({"sha": ref, "tree": entries, "truncated": False}).encode()
+        elif url.startswith(f"{RAW_URL}/"):
+            path = url[len(RAW_URL) + 1:]
+            if path in self.blobs:
+                etag = f'"{self.blobs[path]}"'
+                headers["ETag"] = etag
+                if request.headers.get("If-None-Match") == etag:
+                    status = 304
+                else:
+                    status, body = 200, (self.root / path).read_bytes()
+                    ranged = request.headers.get("Range")
+                    if ranged:
+                        status, body = 206, body[int(ranged.split("=")[1].split("-")[0]):]
+
+        resp = Response()
+        resp.url = url
+        resp.request = request
+        resp.status_code = status
+        resp.headers.update(headers)
+        resp.headers["Content-Length"] = str(len(body))
+        resp.raw = io.BytesIO(body)
+        resp.encoding = "utf-8"
+        return resp
+
+    def close(self) -> None:
+        pass
+
+
+class FakeGitHub:
+    """
+    Point the library at the fake dataset with an empty cache directory.
+
+    Usage (in a benchmark's ``setup``)::
+
+        gh = FakeGitHub()
+        qsb = gh.qsb  # the qsimbench.qsimbench module
+        gh.reset_cache()  # cold cache
+    """
+
+    def __init__(self) -> None:
+        self.cache_dir = Path(tempfile.mkdtemp(prefix="qsimbench-bench-cache-"))
+        os.environ["QSIMBENCH_CACHE_DIR"] = str(self.cache_dir)
+        os.environ.pop("QSIMBENCH_DATASET", None)
+        os.environ.pop("GITHUB_TOKEN", None)
+        import qsimbench.qsimbench as qsb
+
+        self.qsb = qsb
+        if hasattr(qsb, "_configure"):
+            qsb._configure()
+        qsb.CACHE_DIR = self.cache_dir
+        self.adapter = FakeGitHubAdapter(dataset_dir())
+        session = qsb._session() if hasattr(qsb, "_session") else qsb._SESSION
+        for prefix in ("https://api.github.com/", "https://raw.githubusercontent.com/"):
+            session.mount(prefix, self.adapter)
+
+    def reset_cache(self) -> None:
+        """Empty the disk cache and every in-process cache of the library."""
+        qsb = self.qsb
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        self.cache_dir.mkdir(parents=True)
+        for name in ("clear_memory_cache", "reset_cursors"):
+            if hasattr(qsb, name):
+                getattr(qsb, name)()
+        for name in ("get_index", "get_metadata", "get_version_metadata"):
+            cache_clear = getattr(getattr(qsb, name, None), "cache_clear", None)
+            if cache_clear is not None:
+                cache_clear()
+        for name in ("_CATALOGS", "_TREE_CACHE", "_INDEX_CACHE"):
+            cache = getattr(qsb, name, None)
+            if cache is not None:
+                cache.clear()
+
+    def warm(self, size: Optional[int] = None) -> None:
+        """Fill the disk cache with one history (or all of them)."""
+        for s in SIZES if size is None else [size]:
+            self.qsb.get_outcomes(ALGORITHM, s, BACKEND, 1, versions=[VERSION])
+
+    def cleanup(self) -> None:
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
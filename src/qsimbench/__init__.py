@@ -1,5 +1,37 @@
 from .qsimbench import (
     get_outcomes,
+    get_outcomes_many,
+    iter_outcomes,
+    get_distribution,
+    get_replicates,
+    get_window_stats,
     get_index,
-    get_metadata
-)
\ No newline at end of file
+    find_configurations,
+    get_metadata,
+    prefetch,
+    index_dataset,
+    memory_cache_info,
+    clear_memory_cache,
+    set_memory_budget,
+    disk_cache_info,
+    pin,
+    unpin,
+    set_cache_compression,
+    set_cache_quota,
+    set_cursor_store,
+    reset_cursors,
+    stats,
+    reset_stats,
+    set_stats_enabled,
+    set_trace_hook
+)
+
+_ASYNC_API = {"aget_outcomes", "aget_index", "aget_metadata", "aclose", "set_async_concurrency"}
+
+
+def __getattr__(name):
+    # The asyncio API is imported on first access to keep `import qsimbench` light
+    if name in _ASYNC_API:
+        from . import aio
+        return getattr(aio, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
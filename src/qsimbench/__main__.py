@@ -0,0 +1,85 @@
+"""
+Command-line entry point: ``python -m qsimbench prefetch|index ...`` (or ``qsimbench``).
+"""
+
+import argparse
+import sys
+from typing import Any, Dict, List, Optional
+
+from .qsimbench import DEFAULT_MAX_WORKERS, QSimBenchError, index_dataset, prefetch
+
+
+def _print_progress(info: Dict[str, Any]) -> None:
+    print(
+        f"\r[{info['done']}/{info['total']}] "
+        f"{info['bytes'] / 1e6:.1f} MB, {info['rate'] / 1e6:.2f} MB/s",
+        end="", file=sys.stderr, flush=True,
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="qsimbench", description="QSimBench dataset tools.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    pre = commands.add_parser("prefetch", help="Download a dataset version into the local cache.")
+    pre.add_argument("--version", help="Dataset version (default: latest).")
+    pre.add_argument("--kind", dest="kinds", action="append", choices=["circuit", "mirror"],
+                     help="Circuit kind to fetch (repeatable, default: both).")
+    pre.add_argument("--algorithm", dest="algorithms", action="append",
+                     help="Algorithm to fetch (repeatable, default: all).")
+    pre.add_argument("--size", dest="sizes", action="append", type=int,
+                     help="Size to fetch (repeatable, default: all).")
+    pre.add_argument("--backend", dest="backends", action="append",
+                     help="Backend to fetch (repeatable, default: all).")
+    pre.add_argument("--workers", type=int, default=DEFAULT_MAX_WORKERS,
+                     help="Maximum concurrent downloads.")
+    pre.add_argument("--force", action="store_true", help="Refetch files already cached.")
+    pre.add_argument("--quiet", action="store_true", help="Do not report progress.")
+
+    idx = commands.add_parser(
+        "index", help="List a local dataset directory so that it can be served as an HTTP mirror."
+    )
+    idx.add_argument("path", help="Dataset directory, or a clone of the dataset repository.")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "index":
+        try:
+            listed = index_dataset(args.path)
+        except (QSimBenchError, OSError) as e:
+            print(f"error: {e}", file=sys.stderr)
+            return 1
+        for version, files in listed.items():
+            print(f"{version}: {files} files")
+        return 0
+
+    try:
+        summary = prefetch(
+            args.version,
+            kinds=args.kinds or ("circuit", "mirror"),
+            algorithms=args.algorithms,
+            sizes=args.sizes,
+            backends=args.backends,
+            max_workers=args.workers,
+            force=args.force,
+            progress=None if args.quiet else _print_progress,
+        )
+    except QSimBenchError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+
+    if not args.quiet:
+        print(file=sys.stderr)
+    print(
+        f"{summary['files']} files: {summary['downloaded']} downloaded, "
+        f"{summary['skipped']} already cached, {len(summary['failed'])} failed; "
+        f"{summary['bytes'] / 1e6:.1f} MB in {summary['elapsed']:.1f}s "
+        f"({summary['rate'] / 1e6:.2f} MB/s)"
+    )
+    for path, error in summary["failed"].items():
+        print(f"  {path}: {error}", file=sys.stderr)
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
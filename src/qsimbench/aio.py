@@ -0,0 +1,422 @@
+"""
+QSimBench asyncio API
+==================================
+Async counterparts of the public functions, backed by a pooled ``httpx``
+client. Histories are read from and written to the same on-disk cache as the
+synchronous API, so both can be mixed freely.
+
+Requires the optional ``httpx`` dependency (``pip install qsimbench[async]``).
+"""
+
+import asyncio
+import weakref
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import qsimbench as _qsb
+from .qsimbench import QSimBenchError, _History, _HistoryKey
+
+DEFAULT_CONCURRENCY = 16
+
+# Per event loop: pooled client, concurrency limit and in-flight downloads
+_LOOP_STATE: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Tuple[Any, asyncio.Semaphore, Dict[_HistoryKey, asyncio.Task]]]" = weakref.WeakKeyDictionary()
+_CONCURRENCY = DEFAULT_CONCURRENCY
+
+# ---------------------------------------------------------------------------
+# Client management
+# ---------------------------------------------------------------------------
+def set_async_concurrency(limit: int) -> None:
+    """
+    Set the maximum number of concurrent requests per event loop.
+
+    Applies to clients created afterwards (see `aclose`).
+
+    Raises:
+        QSimBenchError: If limit is not a positive integer.
+    """
+    global _CONCURRENCY
+    if not isinstance(limit, int) or limit <= 0:
+        raise QSimBenchError("Concurrency limit must be a positive integer")
+    _CONCURRENCY = limit
+
+
+def _loop_state() -> Tuple[Any, asyncio.Semaphore, Dict[_HistoryKey, asyncio.Task]]:
+    loop = asyncio.get_running_loop()
+    state = _LOOP_STATE.get(loop)
+    if state is None:
+        try:
+            import httpx
+        except ImportError as e:
+            raise QSimBenchError("The asyncio API requires httpx to be installed.") from e
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=_CONCURRENCY, max_keepalive_connections=_CONCURRENCY),
+            timeout=httpx.Timeout(1, pool=None),
+            transport=httpx.AsyncHTTPTransport(retries=3),
+            follow_redirects=True,
+        )
+        state = _LOOP_STATE[loop] = (client, asyncio.Semaphore(_CONCURRENCY), {})
+    return state
+
+
+async def aclose() -> None:
+    """Close the HTTP client of the running event loop."""
+    state = _LOOP_STATE.pop(asyncio.get_running_loop(), None)
+    if state is not None:
+        await state[0].aclose()
+
+
+async def _aget(
+    url: str,
+    allow_404: bool = False,
+    headers: Optional[Dict[str, str]] = None
+) -> Optional[Any]:
+    """
+    GET `url` within the concurrency limit.
+
+    Returns:
+        The response (including 304 Not Modified for conditional requests),
+        or None for a 404 when `allow_404` is True.
+
+    Raises:
+        QSimBenchError: On HTTP or connection errors.
+    """
+    import httpx
+
+    client, limit, _ = _loop_state()
+    headers = {**_qsb._default_headers(), **(headers or {})}
+    async with limit:
+        start = _qsb._clock()
+        try:
+            resp = await client.get(url, headers=headers)
+            if start:
+                _qsb._record("network", start, requests=1, bytes_downloaded=len(resp.content))
+            if resp.status_code == 304:
+                return resp
+            resp.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            if allow_404 and e.response.status_code == 404:
+                return None
+            raise QSimBenchError(f"HTTP error fetching {url}: {e}") from e
+        except httpx.TransportError as e:
+            raise QSimBenchError(f"Couldn't connect to the dataset: {e}") from e
+    return resp
+
+
+async def _adownload(
+    url: str,
+    part_path,
+    headers: Dict[str, str]
+) -> Optional[Tuple[int, Optional[str]]]:
+    """
+    Stream `url` into `part_path` chunk by chunk, within the concurrency limit.
+
+    Returns:
+        (status, etag) of the response (the file is only written for a 200),
+        or None for a 404.
+
+    Raises:
+        QSimBenchError: On HTTP or connection errors.
+    """
+    import httpx
+
+    client, limit, _ = _loop_state()
+    headers = {**_qsb._default_headers(), **headers}
+    async with limit:
+        start = _qsb._clock()
+        transferred = 0
+        try:
+            async with client.stream("GET", url, headers=headers) as resp:
+                if resp.status_code == 404:
+                    return None
+                if resp.status_code == 304:
+                    return resp.status_code, resp.headers.get("ETag")
+                resp.raise_for_status()
+                # File I/O runs in worker threads so a slow disk never
+                # stalls the other downloads sharing the event loop.
+                f = await asyncio.to_thread(open, part_path, "wb")
+                try:
+                    async for chunk in resp.aiter_bytes(_qsb._DOWNLOAD_CHUNK):
+                        await asyncio.to_thread(f.write, chunk)
+                        transferred += len(chunk)
+                finally:
+                    await asyncio.to_thread(f.close)
+        except httpx.HTTPStatusError as e:
+            raise QSimBenchError(f"HTTP error fetching {url}: {e}") from e
+        except httpx.TransportError as e:
+            await asyncio.to_thread(part_path.unlink, missing_ok=True)
+            raise QSimBenchError(f"Couldn't connect to the dataset: {e}") from e
+        if start:
+            _qsb._record("network", start, requests=1, bytes_downloaded=transferred)
+    return resp.status_code, resp.headers.get("ETag")
+
+# ---------------------------------------------------------------------------
+# Dataset tree
+# ---------------------------------------------------------------------------
+async def _aensure_dataset() -> None:
+    """Async counterpart of `_ensure_dataset`."""
+    if _qsb.versions_list:
+        return
+    storage = _qsb._storage()
+    if not isinstance(storage, _qsb._GitHubStorage):
+        # A single listing request (or none, for a local dataset)
+        return await asyncio.to_thread(_qsb._ensure_dataset)
+    if await asyncio.to_thread(_qsb._load_snapshot):
+        return
+    try:
+        main = await _aget(f"https://api.github.com/repos/{storage.owner}/{storage.repo}/git/trees/main")
+        dataset_url = next(p["url"] for p in main.json()["tree"] if p["path"] == "dataset")
+        content, versions = await asyncio.gather(
+            _aget(dataset_url), _aget(f"{storage.raw_url}/versions.json")
+        )
+        await asyncio.to_thread(_qsb._set_dataset, content.json()["tree"], versions.json())
+    except QSimBenchError as e:
+        if not await asyncio.to_thread(_qsb._load_snapshot, allow_stale=True):
+            raise
+        _qsb.logger.warning(f"Using stale dataset snapshot: {e}")
+
+
+async def _aresolve_version(version: Optional[str]) -> str:
+    await _aensure_dataset()
+    return _qsb._resolve_version(version)
+
+
+async def _acatalog(version: str) -> _qsb._Catalog:
+    """Async counterpart of `_catalog`."""
+    catalog = await asyncio.to_thread(_qsb._load_catalog, version)
+    if catalog is not None:
+        return catalog
+    storage = _qsb._storage()
+    if not isinstance(storage, _qsb._GitHubStorage):
+        return await asyncio.to_thread(_qsb._catalog, version)
+    resp = await _aget(f"{storage.tree_url(version)}?recursive=1")
+    tree = resp.json()
+    if tree.get("truncated"):
+        return await asyncio.to_thread(_qsb._catalog, version)
+    files = [item for item in tree["tree"] if item.get("type") == "blob"]
+    return await asyncio.to_thread(
+        _qsb._save_catalog, version, _qsb._version_tree_sha(version) or tree.get("sha"), files
+    )
+
+
+async def _ametadata_text(version: str, fname: str, sha: Optional[str]) -> str:
+    """Async counterpart of `_metadata_text`."""
+    storage = _qsb._storage()
+    if storage.local:
+        return await asyncio.to_thread(_qsb._metadata_text, version, fname, sha)
+    text = await asyncio.to_thread(_qsb._cached_metadata_text, version, fname, sha)
+    if text is None:
+        resp = await _aget(storage.file_url(version, fname))
+        await asyncio.to_thread(_qsb._store_metadata, version, fname, resp.content)
+        text = resp.text
+    return text
+
+# ---------------------------------------------------------------------------
+# Histories
+# ---------------------------------------------------------------------------
+async def _afetch_history(url: str, cache_path, force: bool, key: _HistoryKey) -> _History:
+    history = await asyncio.to_thread(_qsb._load_cached, cache_path, force)
+    if history is not None:
+        return history
+    # Take the entry's cross-process lock in a worker thread; if we are
+    # cancelled while waiting, release it as soon as it is granted.
+    acquire = asyncio.ensure_future(asyncio.to_thread(_qsb._acquire_lock, cache_path))
+    try:
+        handle = await asyncio.shield(acquire)
+    except asyncio.CancelledError:
+        acquire.add_done_callback(_release_granted)
+        raise
+    # Worker threads keep running when we are cancelled, so the lock is only
+    # released once the ones started under it have finished writing.
+    pending: List[asyncio.Future] = []
+    try:
+        if not force:
+            history = await _locked_thread(pending, _qsb._load_cached, cache_path)
+            if history is not None:
+                return history
+        return await _afetch_locked(url, cache_path, force, key, pending)
+    finally:
+        running = [fut for fut in pending if not fut.done()]
+        if running:
+            asyncio.gather(*running, return_exceptions=True).add_done_callback(
+                lambda _: _qsb._release_lock(handle)
+            )
+        else:
+            _qsb._release_lock(handle)
+
+
+def _release_granted(task: asyncio.Future) -> None:
+    if not task.cancelled() and task.exception() is None:
+        _qsb._release_lock(task.result())
+
+
+async def _locked_thread(pending: List[asyncio.Future], fn, *args) -> Any:
+    """Run `fn` in a worker thread under an entry lock, recording it in `pending`."""
+    fut = asyncio.ensure_future(asyncio.to_thread(fn, *args))
+    pending.append(fut)
+    return await asyncio.shield(fut)
+
+
+async def _afetch_locked(
+    url: str,
+    cache_path,
+    force: bool,
+    key: _HistoryKey,
+    pending: List[asyncio.Future]
+) -> _History:
+    if _qsb._storage().local:
+        return await _locked_thread(pending, _qsb._fetch_history, url, cache_path, force, key)
+    headers: Dict[str, str] = {}
+    if not force:
+        history, headers = await _locked_thread(pending, _qsb._revalidation, cache_path, key)
+        if history is not None:
+            return history
+    _qsb.logger.debug(f"Fetching data from URL: {url}")
+    if _qsb._TRACING:
+        _qsb._count(disk_misses=1)
+    await asyncio.to_thread(cache_path.parent.mkdir, parents=True, exist_ok=True)
+    part_path = _qsb._part_path(cache_path)
+    result = await _adownload(url, part_path, headers)
+    if result is None:
+        return _History.from_records([])
+    status, etag = result
+    if status == 304:
+        history = await _locked_thread(pending, _qsb._refresh_cached, cache_path)
+        if history is not None:
+            return history
+        return await _afetch_locked(url, cache_path, True, key, pending)
+    # Parses the download line by line and publishes the cache file with an
+    # atomic rename.
+    return await _locked_thread(
+        pending, _qsb._store_history_file, part_path, cache_path, None, etag
+    )
+
+
+def _retrieve(task: asyncio.Task) -> None:
+    if not task.cancelled():
+        task.exception()
+
+
+async def _aget_data(
+    algorithm: str,
+    size: int,
+    backend: str,
+    version: str,
+    circuit_kind: str = "circuit",
+    force: bool = False
+) -> _History:
+    """Async counterpart of `_get_data`, sharing its memory and disk caches."""
+    key, url, cache_path = _qsb._history_location(algorithm, size, backend, version, circuit_kind)
+    if force:
+        _qsb._HISTORY_CACHE.invalidate(key)
+    else:
+        history = _qsb._HISTORY_CACHE.get(key)
+        if history is not None:
+            return history
+
+    # Concurrent requests for one history share a single download, which is
+    # shielded so that cancelling one caller does not abort it for the others.
+    _, _, inflight = _loop_state()
+    task = None if force else inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_afetch_history(url, cache_path, force, key))
+        task.add_done_callback(_retrieve)
+        if not force:
+            inflight[key] = task
+            task.add_done_callback(lambda _: inflight.pop(key, None))
+    history = await asyncio.shield(task)
+    if len(history):
+        _qsb._HISTORY_CACHE.put(
+            key, history, _qsb.MEMORY_BUDGET, _qsb._validated_at(cache_path), cache_path
+        )
+    return history
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+async def aget_outcomes(
+    algorithm: str,
+    size: int,
+    backend: str,
+    shots: int = 1024,
+    circuit_kind: str = "circuit",
+    *,
+    exact: bool = True,
+    strategy: str = "sequential",
+    versions: Optional[List[str]] = None,
+    seed: Optional[int] = None,
+    force: bool = False,
+    engine: str = "auto",
+    exact_method: str = "multinomial",
+    int_keys: bool = False,
+    version_weights: Optional[List[float]] = None
+) -> Dict[Any, int]:
+    """
+    Async counterpart of `get_outcomes`, with the same arguments and results.
+
+    Raises:
+        QSimBenchError: On invalid args, fetch or sampling failures.
+    """
+    engine = _qsb._check_sampling_args(shots, strategy, engine, exact_method)
+    if versions is None:
+        versions = [await _aresolve_version(None)]
+    if not versions:
+        raise QSimBenchError("At least on version")
+    weights = _qsb._check_version_weights(version_weights, versions)
+
+    histories = await asyncio.gather(*(
+        _aget_data(algorithm, size, backend, version, circuit_kind, force)
+        for version in versions
+    ))
+    return await asyncio.to_thread(
+        lambda: _qsb._sample(
+            _qsb._HistoryView(list(histories)),
+            [
+                _qsb._cursor_key(algorithm, size, backend, circuit_kind, [version])
+                for version in versions
+            ],
+            shots, exact, strategy, seed, engine, exact_method, int_keys, weights,
+        )
+    )
+
+
+async def aget_index(
+    circuit_kind: str = "circuit",
+    by_backend: bool = False,
+    version: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Async counterpart of `get_index`.
+
+    Raises:
+        QSimBenchError: On invalid args or HTTP errors.
+    """
+    kind = circuit_kind.lower()
+    if kind not in {"circuit", "mirror"}:
+        raise QSimBenchError("circuit_kind must be 'circuit' or 'mirror'.")
+    version = await _aresolve_version(version)
+
+    return (await _acatalog(version)).index(kind, by_backend)
+
+
+async def aget_metadata(
+    algorithm: str,
+    size: int,
+    backend: str,
+    version: Optional[str] = None
+) -> List[Any]:
+    """
+    Async counterpart of `get_metadata`; the files of a configuration are
+    fetched concurrently.
+
+    Raises:
+        QSimBenchError: On lookup or HTTP errors.
+    """
+    version = await _aresolve_version(version)
+    catalog = await _acatalog(version)
+    files = _qsb._metadata_files(catalog, algorithm, size, backend, version)
+    texts = await asyncio.gather(*(
+        _ametadata_text(version, fname, catalog.blobs.get(fname)) for fname in files
+    ))
+    metadata: List[Any] = []
+    for text in texts:
+        metadata.extend(_qsb._parse_metadata(text))
+    return metadata
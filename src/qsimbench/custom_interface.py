@@ -10,6 +10,7 @@ from datetime import datetime
 import importlib
 import sys
 import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("theme.json")
@@ -599,17 +600,18 @@ def open_version(event, version_name):
         progress_bar.grid(row=4, column=1, columnspan=2)
 
         def thread_func():
-            for alg in selected_algs:
-                for size in selected_sizes:
-                    for back in selected_backs:
-                        try:
-                            metadata = qsb.get_metadata(alg, size, back, version_name)
-                            download_comb_metadata(f"{alg}_{size}_{back}", metadata)
-                        except Exception as e:
-                            clear_text()
-                            display_error(str(e))
-
-                        progress_bar.set(progress_bar.get() + bar_step)
+            combs = [(alg, size, back) for alg in selected_algs for size in selected_sizes for back in selected_backs]
+            with ThreadPoolExecutor(max_workers=qsb.DEFAULT_MAX_WORKERS) as executor:
+                futures = {executor.submit(qsb.get_metadata, alg, size, back, version_name): (alg, size, back) for alg, size, back in combs}
+                for future in as_completed(futures):
+                    alg, size, back = futures[future]
+                    try:
+                        download_comb_metadata(f"{alg}_{size}_{back}", future.result())
+                    except Exception as e:
+                        clear_text()
+                        display_error(str(e))
+
+                    progress_bar.set(progress_bar.get() + bar_step)
             
             download_runs_metadata_button.configure(state="normal")
             progress_bar.destroy()
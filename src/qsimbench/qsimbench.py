@@ -5,22 +5,34 @@ Functional client library for retrieving and sampling from the QSimBench dataset
 """
 
 import os
+import gzip
+import importlib.util
 import logging
+import mmap
 import threading
+import hashlib
 import json
 import random
-from functools import lru_cache
+import struct
+import sys
+import zlib
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from itertools import accumulate
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 from urllib.parse import urlparse
 import time
 from dotenv import load_dotenv, set_key
-from collections import deque
 
-load_dotenv(override=True)
-
-import requests
-from requests.adapters import HTTPAdapter, Retry
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
 
 # ---------------------------------------------------------------------------
 # Custom exception for QSimBench errors
@@ -36,124 +48,269 @@ logger = logging.getLogger(__name__)
 logger.addHandler(logging.NullHandler())
 
 # ---------------------------------------------------------------------------
-# HTTP client configuration
+# Optional dependencies
 # ---------------------------------------------------------------------------
-# Authentication header injection for GitHub API
-GITHUB_TOKEN = os.getenv("GITHUB_TOKEN") or None
-AUTH_HEADERS = {}
-if GITHUB_TOKEN:
-    AUTH_HEADERS["Authorization"] = f"token {GITHUB_TOKEN}"
-
-# Retry strategy same as before
-_RETRY_STRATEGY = Retry(
-    total=3,
-    backoff_factor=0.5,
-    status_forcelist=[429, 500, 502, 503, 504],
-    allowed_methods={"GET"},
-)
-_HTTP_ADAPTER = HTTPAdapter(max_retries=_RETRY_STRATEGY)
+# NumPy is optional (vectorized engine) and imported on first use only
+_HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+np: Any = None
+
+def _require_numpy(feature: str) -> None:
+    """Import NumPy into the module namespace, or fail naming `feature`."""
+    global np
+    if np is None:
+        if not _HAS_NUMPY:
+            raise QSimBenchError(f"{feature} requires NumPy to be installed.")
+        import numpy
+        np = numpy
 
-# Shared HTTP session with retries
-_SESSION = requests.Session()
-_SESSION.headers.update({"Accept": "application/vnd.github+json"})
-_SESSION.headers.update(AUTH_HEADERS)
-_SESSION.mount("https://", _HTTP_ADAPTER)
-_SESSION.mount("http://", _HTTP_ADAPTER)
+# zstandard is optional (zstd cache compression)
+_HAS_ZSTD = importlib.util.find_spec("zstandard") is not None
+zstd: Any = None
+
+def _require_zstd(feature: str) -> None:
+    """Import zstandard into the module namespace, or fail naming `feature`."""
+    global zstd
+    if zstd is None:
+        if not _HAS_ZSTD:
+            raise QSimBenchError(f"{feature} requires zstandard to be installed.")
+        import zstandard
+        zstd = zstandard
+
+# orjson is optional (faster history parsing); the standard decoder is the fallback
+_HAS_ORJSON = importlib.util.find_spec("orjson") is not None
+_json_loads: Any = None
+
+def _json_decoder() -> Callable[[Union[str, bytes]], Any]:
+    """The JSON decoder for history records: orjson if installed, else json."""
+    global _json_loads
+    if _json_loads is None:
+        if _HAS_ORJSON:
+            import orjson
+            _json_loads = orjson.loads
+        else:
+            _json_loads = json.loads
+    return _json_loads
 
 # ---------------------------------------------------------------------------
-# Defaults & globals
+# HTTP client configuration
 # ---------------------------------------------------------------------------
-DEFAULT_DATASET_URL = os.getenv(
-    "QSIMBENCH_DATASET",
-    "https://github.com/superceccho/qsimbench-dataset"
-).rstrip("/")
-DEFAULT_CACHE_DIR = Path(os.getenv(
-    "QSIMBENCH_CACHE_DIR",
-    Path(__file__).parent / ".qsimbench_cache"
-))
-DEFAULT_CACHE_TIMEOUT = int(os.getenv("QSIMBENCH_CACHE_TIMEOUT", 30 * 24 * 60 * 60))
+# Authentication header injection for GitHub API (resolved on first use)
+GITHUB_TOKEN = None
+
+# Pool sized for the concurrent fetches of get_outcomes_many
+DEFAULT_MAX_WORKERS = 8
+# Bytes read per step of a streamed download, which bounds its memory use
+_DOWNLOAD_CHUNK = 1 << 16
+
+# requests is imported, and the shared session built, on first use only:
+# together they are most of the cost of importing this module
+requests: Any = None
+_SESSION: Any = None
 
-if not os.path.exists(".env"):
-    with open(".env", "w") as file:
-        file.write("QSIMBENCH_DATASET=https://github.com/superceccho/qsimbench-dataset" \
-                   f"QSIMBENCH_CACHE_TIMEOUT={30 * 24 * 60 * 60}")
+def _session() -> "requests.Session":
+    """The shared HTTP session with retries, created on first use."""
+    global requests, _SESSION
+    if _SESSION is None:
+        with _INIT_LOCK:
+            if _SESSION is None:
+                _configure()
+                import requests as requests_module
+                from requests.adapters import HTTPAdapter, Retry
 
-# Ensure cache directory exists
-DEFAULT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+                retries = Retry(
+                    total=3,
+                    backoff_factor=0.5,
+                    status_forcelist=[429, 500, 502, 503, 504],
+                    allowed_methods={"GET"},
+                )
+                adapter = HTTPAdapter(max_retries=retries, pool_maxsize=4 * DEFAULT_MAX_WORKERS)
+                session = requests_module.Session()
+                session.headers.update(_default_headers())
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                requests = requests_module
+                _SESSION = session
+    return _SESSION
+
+def _default_headers() -> Dict[str, str]:
+    """Headers of every dataset request; the token is only ever sent to GitHub."""
+    headers = {"Accept": "application/vnd.github+json"}
+    if GITHUB_TOKEN and isinstance(STORAGE, _GitHubStorage):
+        headers["Authorization"] = f"token {GITHUB_TOKEN}"
+    return headers
+
+# ---------------------------------------------------------------------------
+# Defaults & globals
+# ---------------------------------------------------------------------------
+# Importing this module performs no I/O: `.env` and environment overrides are
+# applied by `_configure()` and the dataset tree and version list are fetched
+# by `_ensure_dataset()`, both on first real use.
+DEFAULT_DATASET_URL = "https://github.com/superceccho/qsimbench-dataset"
+DEFAULT_CACHE_DIR = Path(__file__).parent / ".qsimbench_cache"
+DEFAULT_CACHE_TIMEOUT = 30 * 24 * 60 * 60
+DEFAULT_SNAPSHOT_TIMEOUT = 24 * 60 * 60
+DEFAULT_MEMORY_BUDGET = 512 * 1024 * 1024
+DEFAULT_CACHE_COMPRESSION = "none"
+DEFAULT_CACHE_QUOTA = 0  # unlimited
 
 # Mutable configuration
 DATASET_URL: str = DEFAULT_DATASET_URL
 CACHE_DIR: Path = DEFAULT_CACHE_DIR
 CACHE_TIMEOUT: int = DEFAULT_CACHE_TIMEOUT
+SNAPSHOT_TIMEOUT: int = DEFAULT_SNAPSHOT_TIMEOUT
+MEMORY_BUDGET: int = DEFAULT_MEMORY_BUDGET
+CACHE_COMPRESSION: str = DEFAULT_CACHE_COMPRESSION
+CACHE_QUOTA: int = DEFAULT_CACHE_QUOTA
+CURSOR_STORE: Optional[Path] = None  # None: cursors are process-local
 RAW_URL = None
 owner = None
 repo = None
+STORAGE: Any = None  # backend of DATASET_URL, see `_make_storage`
 
-def get_raw_url() -> None:
-    global owner, repo, RAW_URL
+_INIT_LOCK = threading.RLock()
+_CONFIGURED = False
+
+def _configure() -> None:
+    """Load `.env` and environment overrides once, on first use."""
+    global _CONFIGURED, GITHUB_TOKEN, DATASET_URL, CACHE_DIR, CACHE_TIMEOUT, SNAPSHOT_TIMEOUT, MEMORY_BUDGET
+    global CACHE_COMPRESSION, CACHE_QUOTA, CURSOR_STORE, STATS_ENABLED
+    if _CONFIGURED:
+        return
+    with _INIT_LOCK:
+        if _CONFIGURED:
+            return
+        load_dotenv(override=True)
+
+        GITHUB_TOKEN = os.getenv("GITHUB_TOKEN") or None
+        DATASET_URL = os.getenv("QSIMBENCH_DATASET", DEFAULT_DATASET_URL).rstrip("/")
+        CACHE_DIR = Path(os.getenv("QSIMBENCH_CACHE_DIR", DEFAULT_CACHE_DIR))
+        CACHE_TIMEOUT = int(os.getenv("QSIMBENCH_CACHE_TIMEOUT", DEFAULT_CACHE_TIMEOUT))
+        SNAPSHOT_TIMEOUT = int(os.getenv("QSIMBENCH_SNAPSHOT_TIMEOUT", DEFAULT_SNAPSHOT_TIMEOUT))
+        MEMORY_BUDGET = int(os.getenv("QSIMBENCH_MEMORY_BUDGET", DEFAULT_MEMORY_BUDGET))
+        CACHE_COMPRESSION = os.getenv("QSIMBENCH_CACHE_COMPRESSION", DEFAULT_CACHE_COMPRESSION).lower()
+        CACHE_QUOTA = int(os.getenv("QSIMBENCH_CACHE_QUOTA", DEFAULT_CACHE_QUOTA))
+        CURSOR_STORE = Path(os.environ["QSIMBENCH_CURSOR_STORE"]) if os.getenv("QSIMBENCH_CURSOR_STORE") else None
+        STATS_ENABLED = os.getenv("QSIMBENCH_STATS", "").lower() in ("1", "true", "yes", "on")
+        _update_tracing()
+        get_raw_url()
+        _CONFIGURED = True
 
-    url_parts = DATASET_URL.split("/")
-    owner = url_parts[len(url_parts)-2]
-    repo = url_parts[len(url_parts)-1]
+def get_raw_url() -> None:
+    """Select the storage backend of DATASET_URL and the base URL of its files."""
+    global owner, repo, RAW_URL, STORAGE
 
-    RAW_URL = f"https://raw.githubusercontent.com/{owner}/{repo}/refs/heads/main/dataset"
+    STORAGE = _make_storage(DATASET_URL)
+    RAW_URL = STORAGE.raw_url
+    github = isinstance(STORAGE, _GitHubStorage)
+    owner, repo = (STORAGE.owner, STORAGE.repo) if github else (None, None)
 
-get_raw_url()
+    if _SESSION is not None:
+        _SESSION.headers.pop("Authorization", None)
+        _SESSION.headers.update(_default_headers())
 
 dataset_content = None
+versions_list = []
+latest = ""
 
-def get_dataset_content() -> None:
-    main_url = f"https://api.github.com/repos/{owner}/{repo}/git/trees/main"
-    
-    try:
-        resp = _SESSION.get(main_url, timeout=1)
-        resp.raise_for_status()
-    except requests.HTTPError as e:
-        raise QSimBenchError(f"GitHub API error: {e}") from e
-    except requests.ConnectionError as e:
-        raise QSimBenchError(f"Couldn't connect to the dataset: {e}")
-    
-    paths = resp.json()["tree"]
-    for path in paths:
-        if path["path"] == "dataset":
-            dataset_url = path["url"]
+def _set_dataset(content: List[Dict[str, Any]], versions: List[str]) -> None:
+    """Install a fetched dataset tree and version list and snapshot them."""
+    global dataset_content, versions_list, latest
+    if not versions:
+        raise QSimBenchError("No versions avaible")
+    with _INIT_LOCK:
+        dataset_content = content
+        versions_list = versions
+        latest = versions[-1]
+        _save_snapshot()
 
-    try:
-        resp = _SESSION.get(dataset_url, timeout=1)
-        resp.raise_for_status()
-    except requests.HTTPError as e:
-        raise QSimBenchError(f"GitHub API error: {e}") from e
-    except requests.ConnectionError as e:
-        raise QSimBenchError(f"Couldn't connect to the dataset: {e}")
+def _dataset_cache_dir() -> Path:
+    """
+    Cache directory of the configured dataset: `CACHE_DIR` for the default
+    dataset, a subdirectory named after the dataset URL for any other one,
+    so entries of different datasets never mix.
+    """
+    if DATASET_URL == DEFAULT_DATASET_URL:
+        return CACHE_DIR
+    return CACHE_DIR / "datasets" / hashlib.sha1(DATASET_URL.encode()).hexdigest()[:16]
 
-    global dataset_content
-    dataset_content = resp.json()["tree"]
+def _snapshot_path() -> Path:
+    return _dataset_cache_dir() / "dataset_snapshot.json"
 
-get_dataset_content()
+def _load_snapshot(allow_stale: bool = False) -> bool:
+    """
+    Restore `dataset_content` and `versions_list` from the on-disk snapshot.
 
-# Thread-safe cursor storage for sequential sampling
-_CURSORS: Dict[Tuple[str, int, str, str], int] = {}
-_CURSORS_LOCK = threading.RLock()
+    Args:
+        allow_stale: If True, accept a snapshot older than SNAPSHOT_TIMEOUT.
 
-def load_versions():
+    Returns:
+        True if a usable snapshot for the current dataset URL was loaded.
+    """
+    global dataset_content, versions_list, latest
     try:
-        resp=_SESSION.get(f"{RAW_URL}/versions.json")
-        resp.raise_for_status()
-    except requests.HTTPError as e:
-        raise QSimBenchError(f"HTTP error fetching {f"{RAW_URL}/versions.json"}: {e}") from e
-    except requests.ConnectionError as e:
-        raise QSimBenchError(f"Couldn't connect to the dataset: {e}")
-    
-    global versions_list, latest
-    versions_list=json.loads(resp.text)
-    if not versions_list:
-        raise QSimBenchError("No versions avaible")
-    latest=versions_list[len(versions_list)-1]
+        snapshot = json.loads(_snapshot_path().read_text())
+    except (OSError, ValueError):
+        return False
+    if snapshot.get("dataset_url") != DATASET_URL or not snapshot.get("versions"):
+        return False
+    if not allow_stale and time.time() - snapshot.get("fetched", 0) >= SNAPSHOT_TIMEOUT:
+        return False
+    dataset_content = snapshot["dataset_content"]
+    versions_list = snapshot["versions"]
+    latest = versions_list[-1]
+    logger.debug(f"Loaded dataset snapshot from {_snapshot_path()}")
+    return True
 
-versions_list = []
-latest = ""
+def _save_snapshot() -> None:
+    path = _snapshot_path()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({
+            "dataset_url": DATASET_URL,
+            "fetched": time.time(),
+            "dataset_content": dataset_content,
+            "versions": versions_list,
+        }))
+    except OSError as e:
+        logger.debug(f"Couldn't write dataset snapshot {path}: {e}")
+
+def _ensure_dataset(refresh: bool = False) -> None:
+    """
+    Make `dataset_content` and `versions_list` available, fetching them on
+    first use and falling back to a stale snapshot when the dataset is
+    unreachable. Local datasets are listed directly, without a snapshot.
 
-load_versions()
+    Args:
+        refresh: If True, ignore a fresh snapshot and refetch.
+
+    Raises:
+        QSimBenchError: If the dataset is unreachable and no snapshot exists.
+    """
+    if versions_list and not refresh:
+        return
+    with _INIT_LOCK:
+        if versions_list and not refresh:
+            return
+        _configure()
+        if not refresh and not STORAGE.local and _load_snapshot():
+            return
+        try:
+            content, versions = STORAGE.list_dataset()
+        except QSimBenchError as e:
+            if STORAGE.local or not _load_snapshot(allow_stale=True):
+                raise
+            logger.warning(f"Using stale dataset snapshot: {e}")
+            return
+        _set_dataset(content, versions)
+
+def _resolve_version(version: Optional[str]) -> str:
+    """Return `version`, or the latest version if None, after checking it exists."""
+    _ensure_dataset()
+    if version is None:
+        return latest
+    if version not in versions_list:
+        raise QSimBenchError(f"Version {version} doesn't exist")
+    return version
 
 # ---------------------------------------------------------------------------
 # Configuration functions
@@ -161,32 +318,40 @@ load_versions()
         
 def set_dataset_url(url: str, set_default=False) -> None:
     """
-    Override the base dataset URL.
+    Override the dataset location.
 
     Args:
-        url: Must start with 'http://' or 'https://'.
+        url: A GitHub repository URL, the URL of a static HTTP mirror of its
+            dataset directory, or a local dataset directory (a path or a
+            'file://' URL).
 
     Raises:
         QSimBenchError: If URL is invalid.
     """
     global DATASET_URL
-    if not url.startswith(("http://", "https://")):
-        raise QSimBenchError("Dataset URL must start with 'http://' or 'https://'")
+    if not url.startswith(("http://", "https://", "file://")) and not Path(url).expanduser().is_dir():
+        raise QSimBenchError(
+            "Dataset URL must start with 'http://', 'https://' or 'file://', "
+            "or be a local directory"
+        )
+    _configure()
     DATASET_URL = url.rstrip("/")
     logger.debug(f"Dataset URL set to: {DATASET_URL}")
 
     get_raw_url()
-    get_dataset_content()
-
-    load_versions()
+    _CATALOGS.clear()
+    _HISTORY_CACHE.clear()
+    _ensure_dataset(refresh=True)
 
     if set_default:
         set_key(".env", "QSIMBENCH_DATASET", url)
 
 def set_github_token(token: str, set_default=False) -> None:
     global GITHUB_TOKEN
+    _configure()
     GITHUB_TOKEN = token
-    _SESSION.headers.update({"Authorization": f"token {GITHUB_TOKEN}"})
+    get_raw_url()
+    _HISTORY_CACHE.clear()
 
     if set_default:
         set_key(".env", "GITHUB_TOKEN", token)
@@ -196,394 +361,3919 @@ def set_cache_timeout(timeout: int, set_default=False) -> None:
         raise QSimBenchError("Cache timout must be a positive integer")
     
     global CACHE_TIMEOUT
+    _configure()
     CACHE_TIMEOUT = timeout
 
     if set_default:
         set_key(".env", "QSIMBENCH_CACHE_TIMEOUT", timeout)
 
-# ---------------------------------------------------------------------------
-# Internal helpers
-# ---------------------------------------------------------------------------
-def _multinomial_sample(
-    agg: Dict[str, int],
-    shots: int,
-    seed: int
-) -> Dict[str, int]:
+def set_memory_budget(budget: int, set_default=False) -> None:
     """
-    Down-sample an aggregated distribution to exactly `shots` via multinomial sampling.
+    Set the byte budget of the in-process history cache.
 
     Args:
-        agg: Mapping from outcome bitstring to count.
-        shots: Total draws desired.
-        seed: Random seed.
-
-    Returns:
-        A new mapping with total counts == shots.
+        budget: Maximum bytes of decoded histories kept in memory (0 disables).
 
     Raises:
-        QSimBenchError: If no counts are available.
+        QSimBenchError: If budget is not a non-negative integer.
     """
-    total = sum(agg.values())
-    if total <= 0:
-        raise QSimBenchError("No counts available for multinomial sampling.")
-    rng = random.Random(seed)
-    bits = list(agg.keys())
-    weights = [agg[b] / total for b in bits]
-    sampled = rng.choices(bits, weights=weights, k=shots)
-    result: Dict[str, int] = {}
-    for b in sampled:
-        result[b] = result.get(b, 0) + 1
-    return result
+    if not isinstance(budget, int) or budget < 0:
+        raise QSimBenchError("Memory budget must be a non-negative integer")
 
+    global MEMORY_BUDGET
+    _configure()
+    MEMORY_BUDGET = budget
+    _HISTORY_CACHE.shrink(budget)
 
-def _download_and_cache(
-    url: str,
-    cache_path: Path,
-    force: bool = False
-) -> List[Dict[str, Any]]:
+    if set_default:
+        set_key(".env", "QSIMBENCH_MEMORY_BUDGET", str(budget))
+
+def set_cache_compression(method: str, set_default=False) -> None:
     """
-    Download a JSONL file from `url` and cache it at `cache_path`.
+    Choose how newly cached histories are compressed on disk.
 
-    Args:
-        url: Full URL to JSONL.
-        cache_path: Local Path to cache.
-        force: If True, ignore existing cache.
+    Existing entries keep their format and stay readable.
 
-    Returns:
-        List of JSON objects (one per line).
+    Args:
+        method: "none" (memory-mappable), "gzip" or "zstd" (needs zstandard).
 
     Raises:
-        QSimBenchError: On HTTP errors or empty result.
+        QSimBenchError: If the method is unknown or unavailable.
     """
-    # Serve from cache if fresh
-    if cache_path.exists() and not force:
-        mtime = cache_path.stat().st_mtime
-        now = time.time()
-        if (now - mtime) < CACHE_TIMEOUT:
-            logger.debug(f"Loading data from cache: {cache_path}")
-            return [
-                json.loads(line)
-                for line in cache_path.read_text().splitlines()
-                if line
-            ]
-        cache_path.unlink()
-
-    logger.debug(f"Fetching data from URL: {url}")
-    try:
-        resp = _SESSION.get(url, timeout=1)
-        resp.raise_for_status()
-    except requests.HTTPError as e:
-        if e.response.status_code != 404:
-            raise QSimBenchError(f"HTTP error fetching {url}: {e}") from e
-        else:
-            return []
-    except requests.ConnectionError as e:
-        raise QSimBenchError(f"Couldn't connect to the dataset: {e}")
-
-    records = [
-        json.loads(line) for line in resp.text.splitlines() if line.strip()
-    ]
+    method = method.lower()
+    if method not in _COMPRESSIONS:
+        raise QSimBenchError(f"Cache compression must be one of {', '.join(_COMPRESSIONS)}")
+    if method == "zstd":
+        _require_zstd("zstd cache compression")
 
-    # Cache to disk
-    cache_path.write_text("\n".join(json.dumps(r) for r in records))
-    logger.debug(f"Cached {len(records)} records to {cache_path}")
-    return records
+    global CACHE_COMPRESSION
+    _configure()
+    CACHE_COMPRESSION = method
 
+    if set_default:
+        set_key(".env", "QSIMBENCH_CACHE_COMPRESSION", method)
 
-def _get_data(
-    algorithm: str,
-    size: int,
-    backend: str,
-    version: str,
-    circuit_kind: str = "circuit",
-    force: bool = False
-) -> List[Dict[str, Any]]:
+def set_cache_quota(quota: int, set_default=False) -> None:
     """
-    Retrieve raw history records from the dataset.
+    Set the disk quota of the history cache, evicting entries if needed.
 
     Args:
-        algorithm: Algorithm name (non-empty).
-        size: Positive integer problem size.
-        backend: Backend identifier (non-empty).
-        circuit_kind: Either "circuit" or "mirror".
-        force: If True, bypass cache.
-
-    Returns:
-        List of record dicts.
+        quota: Maximum bytes held in `CACHE_DIR` (0 disables). Histories,
+            their sidecars, metadata and catalogs all count; only histories
+            and their sidecars are evicted.
 
     Raises:
-        QSimBenchError: On invalid parameters or no records.
+        QSimBenchError: If quota is not a non-negative integer.
     """
-    # Validate parameters
-    if not algorithm or size <= 0 or not backend:
-        raise QSimBenchError("algorithm, size, and backend must be valid.")
-    kind = circuit_kind.lower()
-    if kind not in {"circuit", "mirror"}:
-        raise QSimBenchError("circuit_kind must be 'circuit' or 'mirror'.")
+    if not isinstance(quota, int) or quota < 0:
+        raise QSimBenchError("Cache quota must be a non-negative integer")
 
-    # Build URL and cache path
-    alg = algorithm.lower()
-    be = backend.lower()
-    file_name = f"{alg}_{size}_{be}.jsonl"
-    url = f"{RAW_URL}/{version}/histories/{kind}/{file_name}"
-    cache_path = CACHE_DIR / version / kind / file_name
-    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    global CACHE_QUOTA
+    _configure()
+    CACHE_QUOTA = quota
+    _enforce_quota()
 
-    # Download & parse
-    return _download_and_cache(url, cache_path, force=force)
+    if set_default:
+        set_key(".env", "QSIMBENCH_CACHE_QUOTA", str(quota))
 
-# ---------------------------------------------------------------------------
-# Public API
-# ---------------------------------------------------------------------------
-def get_outcomes(
-    algorithm: str,
-    size: int,
-    backend: str,
-    shots: int = 1024,
-    circuit_kind: str = "circuit",
-    *,
-    exact: bool = True,
-    strategy: str = "sequential",
-    versions: List[str] = [latest],
-    seed: Optional[int] = None,
-    force: bool = False
-) -> Dict[str, int]:
+def set_cursor_store(path: Optional[Union[str, Path]], set_default=False) -> None:
     """
-    Sample outcome counts for a given algorithm/size/backend.
+    Choose where sequential-sampling cursors are kept.
 
     Args:
-        algorithm: Algorithm name.
-        size: Problem size > 0.
-        backend: Backend name.
-        shots: Total shots to sample (>0).
-        circuit_kind: "circuit" or "mirror".
-        exact: If True, enforce exactly `shots` via multinomial.
-        strategy: "sequential" or "random".
-        seed: Optional int seed for reproducibility.
-        force: If True, refetch raw data ignoring cache.
+        path: SQLite database file shared by every process that uses the
+            same path (created if missing), or None for process-local
+            cursors.
+    """
+    global CURSOR_STORE
+    _configure()
+    CURSOR_STORE = None if path is None else Path(path)
 
-    Returns:
-        Mapping from outcome bitstring to count.
+    if set_default:
+        set_key(".env", "QSIMBENCH_CURSOR_STORE", "" if path is None else str(path))
 
-    Raises:
-        QSimBenchError: On invalid args or sampling failures.
+def set_stats_enabled(enabled: bool, set_default=False) -> None:
     """
-    if not isinstance(shots, int) or shots <= 0:
-        raise QSimBenchError("Parameter 'shots' must be > 0.")
-    if strategy not in {"sequential", "random"}:
-        raise QSimBenchError("Strategy must be 'sequential' or 'random'.")
-    if not versions:
-        raise QSimBenchError("At least on version") 
-    
-    data=[]
-    for version in versions:
-        new_data=_get_data(algorithm, size, backend, version, circuit_kind, force)
-        data.extend(new_data)
-    n = len(data)
-    if n == 0:
-        raise QSimBenchError("No records available to sample.")
+    Turn the collection of timing and counter statistics on or off.
 
-    # Initialize RNGs
-    master_rng = random.Random(seed)
-    sample_seed = master_rng.randint(0, 2**32 - 1)
-    exact_seed = master_rng.randint(0, 2**32 - 1)
+    Args:
+        enabled: Whether hot paths record into `stats()`. Collected values
+            are kept when it is turned off; see `reset_stats`.
 
-    agg: Dict[str, int] = {}
-    total = 0
+    Raises:
+        QSimBenchError: If enabled is not a boolean.
+    """
+    if not isinstance(enabled, bool):
+        raise QSimBenchError("Stats flag must be a boolean")
 
-    if strategy == "sequential":
-        key = (algorithm, size, backend, circuit_kind)
-        with _CURSORS_LOCK:
-            start_idx = _CURSORS.get(key, 0)
-
-        idx = start_idx
-        consumed = 0
-        while total < shots:
-            if idx >= n:
-                idx = 0
-            rec = data[idx]
-            s = int(rec.get("shots", 0))
-            if s > 0:
-                for bit, cnt in rec.get("data", {}).items():
-                    agg[bit] = agg.get(bit, 0) + int(cnt)
-                total += s
-            idx += 1
-            consumed += 1
-
-        with _CURSORS_LOCK:
-            _CURSORS[key] = idx % n
-
-    else:  # random
-        rng = random.Random(sample_seed)
-        while total < shots:
-            rec = rng.choice(data)
-            s = int(rec.get("shots", 0))
-            if s <= 0:
-                continue
-            for bit, cnt in rec.get("data", {}).items():
-                agg[bit] = agg.get(bit, 0) + int(cnt)
-            total += s
+    global STATS_ENABLED
+    _configure()
+    STATS_ENABLED = enabled
+    _update_tracing()
 
-    # Exact down-sampling
-    if exact and total > shots:
-        agg = _multinomial_sample(agg, shots, exact_seed)
+    if set_default:
+        set_key(".env", "QSIMBENCH_STATS", "1" if enabled else "0")
 
-    return agg
+def set_trace_hook(hook: Optional[Callable[[Dict[str, Any]], None]]) -> None:
+    """
+    Install a callback that receives every instrumentation event.
 
+    Events are dicts with the keys "phase" (one of the phases reported by
+    `stats()`, or None for counter-only events), "seconds", and the counters
+    the event adds. The hook runs synchronously, possibly from worker
+    threads, and is called whether or not stats collection is enabled.
 
-@lru_cache()
-def get_index(
-    circuit_kind: str = "circuit",
-    by_backend: bool = False,
-    version: str = latest
-) -> Dict[str, Any]:
+    Args:
+        hook: The callback, or None to remove it.
+
+    Raises:
+        QSimBenchError: If hook is neither callable nor None.
     """
-    List available algorithms, sizes, and backends in the dataset (via GitHub API).
+    if hook is not None and not callable(hook):
+        raise QSimBenchError("Trace hook must be callable or None")
 
-    Args:
-        circuit_kind: "circuit" or "mirror".
-        by_backend: If True, invert mapping to backend→algorithm→sizes.
+    global _TRACE_HOOK
+    _TRACE_HOOK = hook
+    _update_tracing()
 
-    Returns:
-        Nested dict of available items.
+# ---------------------------------------------------------------------------
+# Binary history cache
+# ---------------------------------------------------------------------------
+# Cached histories are stored as a small JSON header followed by flat,
+# native-endian unsigned integer arrays, so loading them is a single read
+# plus a few zero-copy memoryview casts instead of one json.loads per batch.
+# Outcomes are bitstrings packed into uint16/uint32/uint64 values (chosen by
+# their width); strings are only built for the outcomes a caller receives.
+# The arrays may be compressed as one block, in which case the header stays
+# readable and records the method and the compressed length.
+_QSB_MAGIC = b"QSB\x00"
+_QSB_FORMAT = 2
+_QSB_SUFFIX = ".qsb"
+_QSB_SECTIONS = ("shots", "offsets", "codes", "counts", "values")
+_COMPRESSIONS = ("none", "gzip", "zstd")
+_MAX_PACKED_WIDTH = 64
 
-    Raises:
-        QSimBenchError: On URL parsing or HTTP errors.
+
+def _uint_typecode(max_value: int) -> str:
+    """Smallest unsigned `array` typecode holding `max_value`."""
+    for code in ("H", "I", "Q"):
+        if max_value < 1 << (8 * array(code).itemsize):
+            return code
+    raise QSimBenchError(f"Value {max_value} does not fit in 64 bits.")
+
+
+def _pack_labels(labels: List[str]) -> Optional[Tuple[array, int]]:
     """
-    kind = circuit_kind.lower()
-    if kind not in {"circuit", "mirror"}:
-        raise QSimBenchError("circuit_kind must be 'circuit' or 'mirror'.")
-    
-    if version not in versions_list:
-        raise QSimBenchError(f"Version {version} doesn't exist")
+    Pack equal-width bitstrings into integers.
 
-    paths = dataset_content
-    for path in paths:
-        if path["path"] == version:
-            version_url = path["url"]
+    Returns:
+        (values, width), or None if the labels are not plain bitstrings of a
+        single width of at most 64 bits.
+    """
+    width = len(labels[0]) if labels else 1
+    if not 0 < width <= _MAX_PACKED_WIDTH:
+        return None
+    values = array(_uint_typecode((1 << width) - 1))
+    for label in labels:
+        # Anything but 0/1 (e.g. space-separated registers) keeps the labels
+        if len(label) != width or label.strip("01"):
+            return None
+        values.append(int(label, 2))
+    return values, width
 
-    try:
-        resp = _SESSION.get(version_url, timeout=1)
-        resp.raise_for_status()
-    except requests.HTTPError as e:
-        raise QSimBenchError(f"GitHub API error: {e}") from e
-    except requests.ConnectionError as e:
-        raise QSimBenchError(f"Couldn't connect to the dataset: {e}")
 
-    items = resp.json()["tree"]
-    result: Dict[str, Any] = {}
+def _compress(data: bytes, method: str) -> bytes:
+    if method == "gzip":
+        return gzip.compress(data, compresslevel=6, mtime=0)
+    if method == "zstd":
+        _require_zstd("zstd cache compression")
+        return zstd.ZstdCompressor(level=3).compress(data)
+    return data
 
-    for item in items:
-        name = item.get("path", "")
-        if name in ["artifacts", "histories", "metadata.json"]:
-            continue
-        name = name.replace(".json", "")
-        parts= name.split("_")
-        parts = deque(parts)
-        alg = parts.popleft()
-        while True:
-            part = parts.popleft()
-            if part.isdigit():
-                size = int(part)
-                break
-            alg += "_" + part
 
-        parts.pop()
+def _decompress(data: memoryview, method: str) -> bytes:
+    if method == "gzip":
+        try:
+            return gzip.decompress(data)
+        except (OSError, EOFError, zlib.error) as e:
+            raise QSimBenchError(f"Corrupted compressed cache file: {e}") from e
+    if method == "zstd":
+        _require_zstd("Reading zstd-compressed cache files")
+        try:
+            return zstd.ZstdDecompressor().decompress(data)
+        except zstd.ZstdError as e:
+            raise QSimBenchError(f"Corrupted compressed cache file: {e}") from e
+    raise QSimBenchError(f"Unknown cache compression {method!r}")
 
-        backend = "_".join(parts)
 
-        if not by_backend:
-            result.setdefault(alg, {}).setdefault(size, []).append(backend)
-        else:
-            result.setdefault(backend, {}).setdefault(alg, []).append(size)
+def _as_numpy(a: Union[array, memoryview]) -> Any:
+    """Zero-copy NumPy view of an array or a typed memoryview."""
+    return np.frombuffer(a, dtype=a.typecode if isinstance(a, array) else a.format)
 
-    return result
 
+class _History:
+    """
+    Columnar view of one history file.
 
-@lru_cache()
-def get_metadata(
-    algorithm: str,
-    size: int,
-    backend: str,
-    version: str = latest
-) -> List[Any]:
+    Batch ``i`` has ``shots[i]`` shots and owns the entries
+    ``offsets[i]:offsets[i + 1]`` of the flat ``codes``/``counts`` arrays.
+    ``codes`` are dense outcome indices, numbered in order of first
+    appearance: outcome ``c`` is the bitstring packed in ``values[c]``
+    (``width`` bits wide), or ``labels[c]`` for histories whose outcomes
+    cannot be packed.
     """
-    Fetch metadata JSON files for a given algorithm/size/backend/version.
 
-    Args:
-        algorithm: Algorithm name.
-        size: Problem size.
-        backend: Backend name.
-        version: Dataset version
+    __slots__ = (
+        "labels", "values", "width", "shots", "offsets", "codes", "counts",
+        "_prefix", "_numpy", "_window_index", "_nbytes", "_totals", "_window_stats",
+    )
 
-    Returns:
-        List of parsed JSON metadata objects.
+    def __init__(self, labels, shots, offsets, codes, counts, values=None, width=0) -> None:
+        self.labels: Optional[List[str]] = labels
+        self.values = values
+        self.width = width
+        self.shots = shots
+        self.offsets = offsets
+        self.codes = codes
+        self.counts = counts
+        self._prefix = None
+        self._numpy = None
+        self._window_index = None
+        self._nbytes = None
+        self._totals = None
+        self._window_stats: Dict[Tuple[int, int, int], Dict[str, Any]] = {}
 
-    Raises:
-        QSimBenchError: On lookup or HTTP errors.
-    """
+    def __len__(self) -> int:
+        return len(self.shots)
 
-    if version not in versions_list:
-        raise QSimBenchError(f"Version {version} doesn't exist")
+    @property
+    def n_outcomes(self) -> int:
+        """Number of distinct outcomes (the range of ``codes``)."""
+        return len(self.values) if self.labels is None else len(self.labels)
 
-    paths = dataset_content
-    for path in paths:
-        if path["path"] == version:
-            version_url = path["url"]
+    @property
+    def prefix(self) -> array:
+        """Cumulative shots, ``prefix[i]`` being the shots of batches ``< i``."""
+        if self._prefix is None:
+            self._prefix = array("Q", accumulate(self.shots, initial=0))
+        return self._prefix
+
+    def totals(self) -> Dict[int, int]:
+        """Count of each outcome code over every batch, computed once."""
+        if self._totals is None:
+            if _HAS_NUMPY:
+                _require_numpy("Outcome totals")
+                _, codes, counts = self.as_numpy()
+                totals = np.bincount(codes, weights=counts, minlength=self.n_outcomes)
+                totals = totals.astype(np.int64).tolist()
+            else:
+                totals = [0] * self.n_outcomes
+                for code, cnt in zip(self.codes, self.counts):
+                    totals[code] += cnt
+            self._totals = {code: cnt for code, cnt in enumerate(totals) if cnt}
+        return self._totals
+
+    def as_numpy(self) -> Tuple[Any, Any, Any]:
+        """Zero-copy NumPy views of ``offsets``, ``codes`` and ``counts``."""
+        if self._numpy is None:
+            self._numpy = tuple(map(_as_numpy, (self.offsets, self.codes, self.counts)))
+        return self._numpy
+
+    def window_index(self) -> Tuple[Any, Any]:
+        """
+        Cumulative-count index over the entries sorted by (code, batch).
+
+        Returns:
+            (keys, running): ``keys[k] = code * len(self) + batch`` in sorted
+            order and ``running[k]`` the sum of the first ``k`` sorted counts.
+        """
+        if self._window_index is None:
+            offsets, codes, counts = self.as_numpy()
+            n = len(self)
+            batch = np.repeat(np.arange(n, dtype=np.int64), np.diff(offsets))
+            order = np.argsort(codes, kind="stable")
+            keys = codes[order].astype(np.int64) * n + batch[order]
+            running = np.zeros(len(codes) + 1, dtype=np.int64)
+            np.cumsum(counts[order], out=running[1:])
+            self._window_index = (keys, running)
+        return self._window_index
+
+    def window_counts(self, first: int, stop: int) -> Any:
+        """
+        Per-code counts of batches ``first:stop``, in time proportional to the
+        number of outcomes rather than the number of batches.
+        """
+        keys, running = self.window_index()
+        base = np.arange(self.n_outcomes, dtype=np.int64) * len(self)
+        return running[np.searchsorted(keys, base + stop)] - running[np.searchsorted(keys, base + first)]
+
+    def window_stats(self, window: int, step: int, target: int) -> Dict[str, Any]:
+        """
+        Metrics of the windows of `window` consecutive batches starting every
+        `step` batches, computed once per arguments.
+
+        The counts of the first window are aggregated once; each following
+        window is then derived from the previous one through the batches
+        entering and leaving it. Only the outcomes they hold are updated:
+        the entropy through the running sum of ``c * log2(c)``, and the
+        distances through the changed outcomes plus a closed form for the
+        unchanged ones (whose probabilities only move with the window's
+        shots). The work is proportional to the number of entries rather
+        than windows x outcomes, a block of at most `_WINDOW_BLOCK` changes
+        at a time.
+
+        Args:
+            window: Batches per window.
+            step: Batches between the starts of consecutive windows.
+            target: Outcome code whose probability is tracked.
+
+        Returns:
+            Read-only float64 arrays with one value per window: "start"
+            (first batch), "shots", "entropy" (bits), "success_probability"
+            (of `target`), and "tvd" and "hellinger" (distances to the
+            previous window, NaN for the first one). Probabilities and the
+            metrics derived from them are NaN for windows without shots.
+        """
+        memo = self._window_stats.get((window, step, target))
+        if memo is not None:
+            return memo
+        offsets, codes, counts = self.as_numpy()
+        n, n_codes = len(self), self.n_outcomes
+        n_windows = (n - window) // step + 1 if n >= window else 0
+        starts = np.arange(n_windows, dtype=np.int64) * step
+        prefix = np.frombuffer(self.prefix, dtype=np.uint64).astype(np.int64)
+        shots = (prefix[starts + window] - prefix[starts]).astype(np.float64)
+        sizes = np.diff(offsets).astype(np.int64)
+        weights = counts.astype(np.float64)
+
+        # Target counts through a prefix sum over its per-batch counts
+        hit = np.flatnonzero(codes == target)
+        batch_of = np.searchsorted(offsets, hit, side="right") - 1
+        hits = np.zeros(n + 1)
+        np.cumsum(np.bincount(batch_of, weights=weights[hit], minlength=n), out=hits[1:])
+
+        entropy = np.zeros(n_windows)
+        tvd = np.full(n_windows, np.nan)
+        overlap = np.full(n_windows, np.nan)
+        if n_windows:
+            # Batch b lies in windows jlo..jhi: it enters at transition jlo
+            # (from window jlo - 1) and leaves at transition jhi + 1.
+            batch = np.arange(n, dtype=np.int64)
+            jlo = np.maximum(0, -((window - 1 - batch) // step))
+            jhi = np.minimum(batch // step, n_windows - 1)
+            inside = jlo <= jhi
+
+            lo, hi = offsets[0], offsets[window]
+            current = np.bincount(codes[lo:hi], weights=weights[lo:hi], minlength=n_codes)
+            held = current[current > 0]
+            entropy[0] = (held * np.log2(held)).sum()
+
+            changes = 2 * min(step, window) * len(codes) / max(n, 1)
+            block = max(1, int(_WINDOW_BLOCK // max(changes, 1.0)))
+            for first in range(1, n_windows, block):
+                stop = min(first + block, n_windows)
+                span = stop - first
+                keys, deltas = [], []
+                # Entries entering (transition jlo) and leaving (jhi + 1)
+                for marks, shift, sign in ((jlo, 0, 1.0), (jhi, 1, -1.0)):
+                    b0, b1 = np.searchsorted(marks, [first - shift, stop - shift])
+                    entry_batch = np.repeat(batch[b0:b1], sizes[b0:b1])
+                    keep = inside[entry_batch]
+                    lo, hi = offsets[b0], offsets[b1]
+                    keys.append(
+                        codes[lo:hi][keep].astype(np.int64) * span
+                        + (marks[entry_batch[keep]] + shift - first)
+                    )
+                    deltas.append(sign * weights[lo:hi][keep])
+                # One change per (outcome, transition), sorted by outcome
+                changed, inverse = np.unique(np.concatenate(keys), return_inverse=True)
+                delta = np.bincount(inverse, weights=np.concatenate(deltas), minlength=len(changed))
+                code, at = np.divmod(changed, span)
+                # Counts after each change: a running sum per outcome
+                running = np.cumsum(delta)
+                group = np.flatnonzero(np.r_[True, code[1:] != code[:-1]])
+                sizes_g = np.diff(np.r_[group, len(changed)])
+                after = current[code] + running - np.repeat(running[group] - delta[group], sizes_g)
+                before = after - delta
+                last = np.r_[group[1:], len(changed)] - 1
+                current[code[last]] = after[last]
+
+                totals_before, totals_after = shots[first - 1:stop - 1][at], shots[first:stop][at]
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    xlogx = np.where(after > 0, after * np.log2(np.where(after > 0, after, 1.0)), 0.0) \
+                        - np.where(before > 0, before * np.log2(np.where(before > 0, before, 1.0)), 0.0)
+                    moved = np.abs(before / totals_before - after / totals_after)
+                entropy[first:stop] = np.bincount(at, weights=xlogx, minlength=span)
+                unchanged = shots[first - 1:stop - 1] - np.bincount(at, weights=before, minlength=span)
+                prev, cur = shots[first - 1:stop - 1], shots[first:stop]
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    tvd[first:stop] = 0.5 * (
+                        np.bincount(at, weights=moved, minlength=span)
+                        + np.abs(1.0 / prev - 1.0 / cur) * unchanged
+                    )
+                    overlap[first:stop] = (
+                        np.bincount(at, weights=np.sqrt(before * after), minlength=span) + unchanged
+                    ) / np.sqrt(prev * cur)
+            # entropy holds the running sum of c * log2(c) increments
+            np.cumsum(entropy, out=entropy)
+
+        empty = shots == 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            entropy = np.log2(shots) - entropy / shots
+            success = (hits[starts + window] - hits[starts]) / shots
+        entropy[empty] = np.nan
+        success[empty] = np.nan
+        distances = np.r_[True, empty[1:] | empty[:-1]] if n_windows else empty
+        tvd[distances] = np.nan
+        hellinger = np.sqrt(np.clip(1.0 - overlap, 0.0, None))
+        hellinger[distances] = np.nan
+        stats = {
+            "start": starts.astype(np.float64),
+            "shots": shots,
+            "entropy": entropy,
+            "success_probability": success,
+            "tvd": tvd,
+            "hellinger": hellinger,
+        }
+        for values in stats.values():
+            values.flags.writeable = False
+        self._window_stats[window, step, target] = stats
+        return stats
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate in-memory footprint, used for the cache budget."""
+        if self._nbytes is None:
+            arrays = [self.shots, self.offsets, self.codes, self.counts]
+            size = sum(len(a) * a.itemsize for a in arrays)
+            if self.labels is None:
+                size += len(self.values) * self.values.itemsize
+            else:
+                size += sum(map(len, self.labels)) + 56 * len(self.labels)
+            self._nbytes = size
+        extra = sum(a.nbytes for stats in self._window_stats.values() for a in stats.values())
+        if self._window_index is not None:
+            extra += sum(a.nbytes for a in self._window_index)
+        if extra:
+            return self._nbytes + extra
+        return self._nbytes
+
+    @classmethod
+    def _from_labels(cls, labels: List[str], shots, offsets, codes, counts) -> "_History":
+        """Build a history, packing its outcomes and narrowing its codes when possible."""
+        if len(labels) <= 1 << 16 and codes.typecode != "H":
+            codes = array("H", codes)
+        packed = _pack_labels(labels)
+        if packed is None:
+            return cls(labels, shots, offsets, codes, counts)
+        return cls(None, shots, offsets, codes, counts, *packed)
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]]) -> "_History":
+        """Encode parsed JSONL records into columnar arrays."""
+        index: Dict[str, int] = {}
+        shots = array("I")
+        offsets = array("I", [0])
+        codes = array("I")
+        counts = array("I")
+        for rec in records:
+            s = max(int(rec.get("shots", 0)), 0)
+            shots.append(s)
+            # Batches without shots are skipped by sampling, so drop their data
+            for bit, cnt in (rec.get("data", {}) if s else {}).items():
+                code = index.get(bit)
+                if code is None:
+                    code = index[bit] = len(index)
+                codes.append(code)
+                counts.append(int(cnt))
+            offsets.append(len(codes))
+        return cls._from_labels(list(index), shots, offsets, codes, counts)
+
+    def to_bytes(self, compression: str = "none", **meta: Any) -> bytes:
+        """
+        Serialize to the on-disk ``.qsb`` layout.
+
+        Args:
+            compression: How to compress the arrays ("none", "gzip", "zstd").
+            meta: Extra header fields, e.g. the ``sha`` of the source blob.
+        """
+        return b"".join(self.to_chunks(compression, **meta))
+
+    def to_chunks(self, compression: str = "none", **meta: Any) -> List[Any]:
+        """
+        Serialize like `to_bytes`, as a list of buffers that are written in
+        order. Uncompressed sections are views of the arrays, not copies.
+        """
+        sections = {}
+        payload: List[Any] = []
+        pos = 0
+        for name in _QSB_SECTIONS:
+            data = getattr(self, name)
+            if data is None:
+                continue
+            raw = memoryview(data).cast("B")
+            typecode = data.typecode if isinstance(data, array) else data.format
+            sections[name] = [pos, len(raw), typecode]
+            payload.append(raw)
+            pad = -len(raw) % 8  # keep every section 8-byte aligned
+            if pad:
+                payload.append(b"\x00" * pad)
+            pos += len(raw) + pad
+        if compression != "none":
+            payload = [_compress(b"".join(payload), compression)]
+            meta = {**meta, "compression": compression, "payload": len(payload[0])}
+        outcomes = {"labels": self.labels} if self.labels is not None else {"width": self.width}
+        header = json.dumps({
+            **meta,
+            "format": _QSB_FORMAT,
+            "byteorder": sys.byteorder,
+            **outcomes,
+            "sections": sections,
+        }).encode()
+        pad = b"\x00" * (-(8 + len(header)) % 8)
+        return [_QSB_MAGIC, struct.pack("<I", len(header)), header, pad, *payload]
+
+    @classmethod
+    def from_bytes(cls, buf: bytes) -> "_History":
+        """
+        Decode a ``.qsb`` buffer without copying the arrays (compressed
+        files are decompressed once, into a single buffer).
+
+        The section sizes recorded in the header are checked against the
+        buffer and against each other, so truncated or otherwise partial
+        files are rejected instead of yielding short arrays.
+
+        Raises:
+            QSimBenchError: If the buffer is not a complete, current-format
+                cache file.
+        """
+        view = memoryview(buf)
+        if bytes(view[:4]) != _QSB_MAGIC:
+            raise QSimBenchError("Not a QSimBench cache file.")
+        try:
+            (header_len,) = struct.unpack_from("<I", view, 4)
+            header = json.loads(bytes(view[8:8 + header_len]))
+            if header.get("format") != _QSB_FORMAT or header.get("byteorder") != sys.byteorder:
+                raise QSimBenchError("Cache file was written in an incompatible format.")
+            base = 8 + header_len + (-(8 + header_len) % 8)
+            if header.get("compression", "none") != "none":
+                end = base + header["payload"]
+                if end > len(view):
+                    raise QSimBenchError("Cache file is truncated.")
+                view = memoryview(_decompress(view[base:end], header["compression"]))
+                base = 0
+            arrays = {}
+            for name, (start, length, typecode) in header["sections"].items():
+                if typecode not in ("H", "I", "Q") or name not in _QSB_SECTIONS:
+                    raise QSimBenchError(f"Unexpected section {name!r} in cache file.")
+                if length % array(typecode).itemsize or base + start + length > len(view):
+                    raise QSimBenchError("Cache file is truncated.")
+                arrays[name] = view[base + start:base + start + length].cast(typecode)
+            labels = header.get("labels")
+            width = header.get("width", 0)
+            shots, offsets, codes, counts = (arrays[name] for name in _QSB_SECTIONS[:4])
+            values = arrays.get("values")
+        except (struct.error, ValueError, KeyError, TypeError) as e:
+            raise QSimBenchError(f"Corrupted cache file: {e}") from e
+        n_outcomes = len(labels) if labels is not None else len(values) if values is not None else -1
+        if (
+            n_outcomes < 0
+            or len(offsets) != len(shots) + 1
+            or len(codes) != len(counts)
+            or offsets[0] != 0
+            or offsets[-1] != len(codes)
+        ):
+            raise QSimBenchError("Cache file is inconsistent.")
+        return cls(labels, shots, offsets, codes, counts, values, width)
+
+
+class _HistoryView:
+    """
+    Zero-copy concatenation of the histories of several versions.
+
+    Batches are numbered across the parts in order. Outcomes are merged by
+    value: the packed integer when every part packs outcomes of the same
+    width, the bitstring otherwise.
+    """
+
+    __slots__ = ("parts", "starts", "packed", "width")
+
+    def __init__(self, parts: List[_History]) -> None:
+        self.parts = parts
+        self.starts = list(accumulate((len(p) for p in parts), initial=0))
+        self.packed = all(p.labels is None for p in parts) and len({p.width for p in parts}) <= 1
+        self.width = parts[0].width if parts else 0
+
+    def __len__(self) -> int:
+        return self.starts[-1]
+
+    def locate(self, pos: int) -> Tuple[int, int]:
+        """(part, batch within the part) of global batch `pos`."""
+        part = bisect_left(self.starts, pos + 1) - 1
+        return part, pos - self.starts[part]
+
+    def shots_at(self, pos: int) -> int:
+        part, j = self.locate(pos)
+        return self.parts[part].shots[j]
+
+    def part_shots(self) -> List[int]:
+        """Shots in one pass over each part."""
+        return [p.prefix[len(p)] for p in self.parts]
+
+    def outcome_key(self, part: int) -> Callable[[int], Any]:
+        """Map the outcome codes of a part to merged outcome keys."""
+        history = self.parts[part]
+        if history.labels is not None:
+            return history.labels.__getitem__
+        if self.packed:
+            return history.values.__getitem__
+        values, spec = history.values, f"0{history.width}b"
+        return lambda code: format(values[code], spec)
+
+    def merge(self, aggs: List[Optional[Dict[int, int]]]) -> Dict[Any, int]:
+        """Merge per-part counts keyed by code into counts keyed by outcome."""
+        merged: Dict[Any, int] = {}
+        for part, agg in enumerate(aggs):
+            if not agg:
+                continue
+            key = self.outcome_key(part)
+            for code, cnt in agg.items():
+                k = key(code)
+                merged[k] = merged.get(k, 0) + cnt
+        return merged
+
+    def finalize(self, agg: Dict[Any, int], int_keys: bool = False) -> Dict[Any, int]:
+        """
+        Build the public form of merged counts: bitstring keys, or their
+        integer values when `int_keys` is True.
+
+        Raises:
+            QSimBenchError: If integer keys are requested for outcomes that
+                are not plain bitstrings.
+        """
+        if not self.packed:
+            if int_keys:
+                raise QSimBenchError("Outcomes of this history are not plain bitstrings.")
+            return agg
+        if int_keys:
+            return agg
+        spec = f"0{self.width}b"
+        return {format(value, spec): cnt for value, cnt in agg.items()}
+
+
+def _read_header(path: Path) -> Optional[Dict[str, Any]]:
+    """Read just the header of a ``.qsb`` file, or None if it is unreadable."""
+    try:
+        with open(path, "rb") as f:
+            head = f.read(8)
+            if len(head) < 8 or head[:4] != _QSB_MAGIC:
+                return None
+            (header_len,) = struct.unpack_from("<I", head, 4)
+            return json.loads(f.read(header_len))
+    except (OSError, ValueError):
+        return None
+
+
+# ---------------------------------------------------------------------------
+# In-process history cache
+# ---------------------------------------------------------------------------
+_HistoryKey = Tuple[str, str, str, int, str]
+
+
+class _HistoryCache:
+    """
+    Thread-safe LRU cache of decoded histories bounded by a byte budget.
+
+    Entries expire together with the disk entry they were loaded from:
+    `CACHE_TIMEOUT` seconds after it was last downloaded or revalidated.
+    Hits count as uses of that disk entry for the LRU eviction of
+    `_enforce_quota`, so the hottest histories are not evicted first.
+    """
+
+    def __init__(self) -> None:
+        # key -> (history, size, validated, disk entry, last access time update)
+        self._entries: "OrderedDict[_HistoryKey, Tuple[_History, int, float, Optional[Path], float]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: _HistoryKey) -> Optional[_History]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry[2] >= CACHE_TIMEOUT:
+                self.invalidate(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                if _TRACING:
+                    _count(memory_misses=1)
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            if _TRACING:
+                _count(memory_hits=1)
+            history, size, validated, path, touched = entry
+            if path is not None:
+                _DISK_USAGE.used(path)
+                now = time.time()
+                if now - touched >= _TOUCH_INTERVAL:
+                    _touch(path)
+                    touched = now
+            # Lazily built indexes grow a history after it was cached
+            if history.nbytes != size:
+                self.nbytes += history.nbytes - size
+                size = history.nbytes
+            self._entries[key] = (history, size, validated, path, touched)
+            self.shrink(MEMORY_BUDGET)
+            return history
+
+    def put(
+        self,
+        key: _HistoryKey,
+        history: _History,
+        budget: int,
+        validated: float,
+        path: Optional[Path] = None
+    ) -> None:
+        """
+        Cache `history`, validated against the dataset at time `validated`
+        (see `_validated_at`) and loaded from the disk entry at `path`.
+        """
+        size = history.nbytes
+        with self._lock:
+            self.invalidate(key)
+            if size > budget:
+                return
+            self._entries[key] = (history, size, validated, path, time.time())
+            self.nbytes += size
+            self.shrink(budget)
+
+    def invalidate(self, key: _HistoryKey) -> None:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.nbytes -= entry[1]
+
+    def shrink(self, budget: int) -> None:
+        with self._lock:
+            while self.nbytes > budget and self._entries:
+                _, (_, size, _, _, _) = self._entries.popitem(last=False)
+                self.nbytes -= size
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def info(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self.nbytes,
+                "budget": MEMORY_BUDGET,
+            }
+
+
+_HISTORY_CACHE = _HistoryCache()
+
+
+def _touch(path: Path) -> None:
+    """Update the access time of a cache entry, keeping its mtime (the expiry clock)."""
+    try:
+        os.utime(path, (time.time(), path.stat().st_mtime))
+    except OSError:
+        pass
+
+
+def _validated_at(cache_path: Path) -> float:
+    """When a cache entry was last downloaded or revalidated (its mtime)."""
+    try:
+        return cache_path.stat().st_mtime
+    except OSError:
+        return time.time()
+
+# ---------------------------------------------------------------------------
+# Sequential cursors
+# ---------------------------------------------------------------------------
+# A cursor is the index of the next batch of a sequential stream. Claiming a
+# window reads the cursor, lets the caller compute the window and stores the
+# new position atomically, so concurrent callers get disjoint batch ranges.
+_CursorKey = Tuple[str, int, str, str, Tuple[str, ...]]
+_Claim = Callable[[int], Tuple[Any, int]]
+
+
+def _cursor_key(
+    algorithm: str,
+    size: int,
+    backend: str,
+    circuit_kind: str,
+    versions: Iterable[str]
+) -> _CursorKey:
+    return (algorithm.lower(), size, backend.lower(), circuit_kind.lower(), tuple(versions))
+
+
+class _MemoryCursors:
+    """Process-local cursors."""
+
+    def __init__(self) -> None:
+        self._cursors: Dict[_CursorKey, int] = {}
+        self._lock = threading.RLock()
+
+    def claim(self, key: _CursorKey, fn: _Claim) -> Any:
+        """Call `fn(start)` -> (result, next) under the lock and store `next`."""
+        with self._lock:
+            result, self._cursors[key] = fn(self._cursors.get(key, 0))
+            return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._cursors.clear()
+
+
+class _SQLiteCursors:
+    """
+    Cursors persisted in a SQLite database that several processes can share.
+
+    Each claim runs in an immediate (write-locked) transaction, so claims
+    from different processes are serialized without a coordinator.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._local = threading.local()
+
+    def _connection(self) -> "sqlite3.Connection":
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            import sqlite3
+
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cursors (key TEXT PRIMARY KEY, position INTEGER NOT NULL)"
+            )
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def claim(self, key: _CursorKey, fn: _Claim) -> Any:
+        """Call `fn(start)` -> (result, next) in one transaction and store `next`."""
+        conn = self._connection()
+        skey = json.dumps(key)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT position FROM cursors WHERE key = ?", (skey,)).fetchone()
+            result, position = fn(row[0] if row else 0)
+            conn.execute(
+                "INSERT INTO cursors (key, position) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET position = excluded.position",
+                (skey, position),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        return result
+
+    def reset(self) -> None:
+        self._connection().execute("DELETE FROM cursors")
+
+
+_MEMORY_CURSORS = _MemoryCursors()
+_SQLITE_CURSORS: Dict[Path, _SQLiteCursors] = {}
+
+
+def _cursors() -> Union[_MemoryCursors, _SQLiteCursors]:
+    """The cursor store selected by `CURSOR_STORE`."""
+    _configure()
+    if CURSOR_STORE is None:
+        return _MEMORY_CURSORS
+    with _INIT_LOCK:
+        store = _SQLITE_CURSORS.get(CURSOR_STORE)
+        if store is None:
+            store = _SQLITE_CURSORS[CURSOR_STORE] = _SQLiteCursors(CURSOR_STORE)
+    return store
+
+
+# ---------------------------------------------------------------------------
+# Instrumentation
+# ---------------------------------------------------------------------------
+# Hot paths time their phases and count what they process when tracing is on
+# (`set_stats_enabled` or a trace hook). When it is off, each site costs one
+# global lookup: `_clock()` returns 0.0 and nothing is recorded.
+_PHASES = ("network", "cache_load", "parse", "cache_write", "aggregate", "exact_sample")
+_COUNTERS = (
+    "requests", "bytes_downloaded", "memory_hits", "memory_misses", "disk_hits",
+    "disk_misses", "revalidations", "records_parsed", "batches_aggregated",
+    "exact_samples", "bytes_read", "bytes_written",
+)
+
+STATS_ENABLED: bool = False
+_TRACE_HOOK: Optional[Callable[[Dict[str, Any]], None]] = None
+_TRACING = False  # STATS_ENABLED or a trace hook is set
+
+
+class _Stats:
+    """Thread-safe per-phase timers and counters."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.calls = dict.fromkeys(_PHASES, 0)
+            self.seconds = dict.fromkeys(_PHASES, 0.0)
+            self.counters = dict.fromkeys(_COUNTERS, 0)
+
+    def add(self, phase: Optional[str], seconds: float, counts: Dict[str, int]) -> None:
+        with self._lock:
+            if phase is not None:
+                self.calls[phase] += 1
+                self.seconds[phase] += seconds
+            for name, value in counts.items():
+                self.counters[name] += value
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": STATS_ENABLED,
+                "phases": {
+                    phase: {"calls": self.calls[phase], "seconds": self.seconds[phase]}
+                    for phase in _PHASES
+                },
+                "counters": dict(self.counters),
+            }
+
+
+_STATS = _Stats()
+
+
+def _clock() -> float:
+    """Start of a timed phase, or 0.0 when tracing is off."""
+    return time.perf_counter() if _TRACING else 0.0
+
+
+def _record(phase: str, start: float, **counts: int) -> None:
+    """
+    Close a phase opened with `_clock()`: add its duration and `counts` to
+    the statistics and report it to the trace hook.
+    """
+    seconds = time.perf_counter() - start
+    if STATS_ENABLED:
+        _STATS.add(phase, seconds, counts)
+    hook = _TRACE_HOOK
+    if hook is not None:
+        hook({"phase": phase, "seconds": seconds, **counts})
+
+
+def _count(**counts: int) -> None:
+    """Add `counts` to the statistics (callers check `_TRACING` first)."""
+    if STATS_ENABLED:
+        _STATS.add(None, 0.0, counts)
+    hook = _TRACE_HOOK
+    if hook is not None:
+        hook({"phase": None, "seconds": 0.0, **counts})
+
+
+def _update_tracing() -> None:
+    global _TRACING
+    _TRACING = STATS_ENABLED or _TRACE_HOOK is not None
+
+
+def _http_get(url: str, **kwargs: Any) -> "requests.Response":
+    """GET through the shared session, timed as network time when tracing."""
+    start = _clock()
+    resp = _session().get(url, **kwargs)
+    if start:
+        body = 0 if kwargs.get("stream") else len(resp.content)
+        _record("network", start, requests=1, bytes_downloaded=body)
+    return resp
+
+# ---------------------------------------------------------------------------
+# Internal helpers
+# ---------------------------------------------------------------------------
+_EXACT_METHODS = {"multinomial", "hypergeometric", "portable"}
+
+
+def _multinomial_sample(
+    agg: Dict[Any, int],
+    shots: int,
+    seed: int,
+    method: str = "multinomial"
+) -> Dict[Any, int]:
+    """
+    Down-sample an aggregated distribution to exactly `shots`.
+
+    Args:
+        agg: Mapping from outcome (code, bitstring or integer) to count.
+        shots: Total draws desired.
+        seed: Random seed.
+        method: "multinomial" draws with replacement as a chain of
+            conditional binomials, in time and memory proportional to the
+            number of outcomes. "hypergeometric" draws without replacement
+            from the aggregated shots (requires NumPy). "portable" draws
+            with replacement using integer arithmetic only, so results are
+            bit-identical across platforms.
+
+    Note:
+        "portable" draws every shot individually and therefore runs in time
+        linear in `shots` rather than in the number of outcomes: an exact
+        binomial draw needs floating-point logarithms, whose last bits are
+        platform dependent. Large requests should use "multinomial", which
+        is also the default when NumPy is not installed.
+
+    Returns:
+        A new mapping with total counts == shots.
+
+    Raises:
+        QSimBenchError: If no counts are available.
+    """
+    total = sum(agg.values())
+    if total <= 0:
+        raise QSimBenchError("No counts available for multinomial sampling.")
+    bits = list(agg.keys())
+    result: Dict[Any, int] = {}
+
+    if method == "hypergeometric":
+        _require_numpy("Hypergeometric sampling")
+        rng = np.random.default_rng(seed)
+        drawn = rng.multivariate_hypergeometric(
+            np.fromiter(agg.values(), dtype=np.int64, count=len(bits)),
+            min(shots, total),
+            method="marginals",
+        )
+        for b, k in zip(bits, drawn.tolist()):
+            if k:
+                result[b] = k
+        return result
+
+    rng = random.Random(seed)
+    if method == "portable":
+        cumulative = list(accumulate(agg.values()))
+        tallies = [0] * len(bits)
+        randbelow = rng.randrange
+        for _ in range(shots):
+            tallies[bisect_left(cumulative, randbelow(total) + 1)] += 1
+        return {b: k for b, k in zip(bits, tallies) if k}
+
+    remaining = shots
+    for b in bits:
+        if remaining == 0:
+            break
+        cnt = agg[b]
+        if cnt >= total:
+            k = remaining
+        else:
+            k = rng.binomialvariate(remaining, cnt / total)
+        if k:
+            result[b] = k
+        remaining -= k
+        total -= cnt
+    return result
+
+
+def _sequential_window(
+    history: _History,
+    start: int,
+    shots: int
+) -> Tuple[List[Tuple[int, int, int]], int, int]:
+    """
+    Locate the run of consecutive batches, starting at `start` and wrapping
+    around, that first reaches `shots` shots.
+
+    Args:
+        history: Decoded history with at least one non-empty batch.
+        start: Index of the first batch.
+        shots: Minimum number of shots to cover.
+
+    Returns:
+        (segments, total, end): the window as ``(first, stop, multiplicity)``
+        batch ranges, the shots it contains and the index following it.
+    """
+    prefix = history.prefix
+    n = len(history)
+    per_pass = prefix[n]
+    tail = per_pass - prefix[start]
+    if shots <= tail:
+        end = bisect_left(prefix, prefix[start] + shots)
+        return [(start, end, 1)], prefix[end] - prefix[start], end % n
+
+    remaining = shots - tail
+    passes = (remaining - 1) // per_pass
+    end = bisect_left(prefix, remaining - passes * per_pass)
+    segments = [(start, n, 1), (0, end, 1)]
+    if passes:
+        segments.append((0, n, passes))
+    return segments, tail + passes * per_pass + prefix[end], end % n
+
+
+def _random_batches(
+    history: Union[_History, _HistoryView],
+    shots: int,
+    seed: int
+) -> Tuple[List[int], int]:
+    """
+    Draw batch indices uniformly with replacement until `shots` is reached.
+
+    Both engines share this draw, so a seed yields the same batches whichever
+    engine aggregates them. Over a `_HistoryView` the indices are global.
+
+    Returns:
+        (batches, total): drawn batch indices and the shots they contain.
+    """
+    rng = random.Random(seed)
+    randrange = rng.randrange
+    if isinstance(history, _HistoryView):
+        batch_shots: Callable[[int], int] = history.shots_at
+    else:
+        batch_shots = history.shots.__getitem__
+    n = len(history)
+    batches: List[int] = []
+    total = 0
+    while total < shots:
+        idx = randrange(n)
+        s = batch_shots(idx)
+        if s <= 0:
+            continue
+        batches.append(idx)
+        total += s
+    return batches, total
+
+
+def _allocate_shots(shots: int, weights: List[float]) -> List[int]:
+    """
+    Split `shots` proportionally to `weights` by largest remainder; ties go
+    to the earlier weight.
+    """
+    norm = sum(weights)
+    quotas = [shots * w / norm for w in weights]
+    alloc = [int(q) for q in quotas]
+    by_remainder = sorted(range(len(weights)), key=lambda i: alloc[i] - quotas[i])
+    for i in by_remainder[:shots - sum(alloc)]:
+        alloc[i] += 1
+    return alloc
+
+
+def _aggregate_python(
+    history: _History,
+    segments: Iterable[Tuple[int, int, int]]
+) -> Dict[int, int]:
+    """
+    Sum the counts of ``(first, stop, multiplicity)`` batch ranges in pure
+    Python, keyed by outcome code in code order.
+    """
+    offsets, codes, counts = history.offsets, history.codes, history.counts
+    acc: Dict[int, int] = {}
+    for first, stop, mult in segments:
+        lo, hi = offsets[first], offsets[stop]
+        if mult == 1:
+            for code, cnt in zip(codes[lo:hi], counts[lo:hi]):
+                acc[code] = acc.get(code, 0) + cnt
+        else:
+            for code, cnt in zip(codes[lo:hi], counts[lo:hi]):
+                acc[code] = acc.get(code, 0) + cnt * mult
+    return {code: acc[code] for code in sorted(acc)}
+
+
+# Windows spanning more entries than this many times the number of outcomes are
+# summed through the cumulative index instead of a bincount over their entries.
+_WINDOW_INDEX_MIN_RATIO = 8
+
+
+def _aggregate_numpy(
+    history: _History,
+    segments: Iterable[Tuple[int, int, int]] = (),
+    batches: Optional[List[int]] = None
+) -> Dict[int, int]:
+    """
+    Sum the counts of batch ranges, or of individually drawn batches, with
+    NumPy array operations, keyed by outcome code in code order.
+    """
+    offsets, codes, counts = history.as_numpy()
+    n_labels = history.n_outcomes
+    acc = np.zeros(n_labels, dtype=np.int64)
+    for first, stop, mult in segments:
+        lo, hi = offsets[first], offsets[stop]
+        if hi - lo > _WINDOW_INDEX_MIN_RATIO * n_labels:
+            # Long windows: difference of the cumulative index, O(labels)
+            acc += mult * history.window_counts(first, stop)
+        else:
+            acc += mult * np.bincount(
+                codes[lo:hi], weights=counts[lo:hi], minlength=n_labels
+            ).astype(np.int64)
+    if batches is not None:
+        picked = np.asarray(batches, dtype=np.intp)
+        lo = offsets[picked].astype(np.intp)
+        lengths = offsets[picked + 1].astype(np.intp) - lo
+        n_entries = int(lengths.sum())
+        if 4 * n_entries < len(codes):
+            # Few batches: gather just their entries
+            starts = np.repeat(lo - np.cumsum(lengths) + lengths, lengths)
+            entries = starts + np.arange(n_entries)
+            acc += np.bincount(
+                codes[entries], weights=counts[entries], minlength=n_labels
+            ).astype(np.int64)
+        else:
+            # Many batches: weight every entry by how often its batch was drawn
+            mult = np.bincount(picked, minlength=len(history))
+            weights = counts * np.repeat(mult, np.diff(offsets))
+            acc += np.bincount(codes, weights=weights, minlength=n_labels).astype(np.int64)
+    nonzero = np.flatnonzero(acc)
+    return dict(zip(nonzero.tolist(), acc[nonzero].tolist()))
+
+
+def _atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Write `data` to `path` through a temporary file and an atomic rename."""
+    _atomic_write_chunks(path, [data])
+
+
+def _atomic_write_chunks(path: Path, chunks: Iterable[Any]) -> int:
+    """
+    Write the buffers in `chunks` to `path` through a temporary file and an
+    atomic rename, without joining them in memory.
+
+    Returns:
+        Bytes written.
+    """
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    written = 0
+    try:
+        with open(tmp, "wb") as f:
+            for chunk in chunks:
+                written += f.write(chunk)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    _DISK_USAGE.record(path, written)
+    return written
+
+
+def _lock_path(path: Path) -> Path:
+    """Path of the advisory lock file guarding `path`."""
+    return path.with_name(f".{path.name}.lock")
+
+
+def _acquire_lock(path: Path) -> Any:
+    """
+    Take an exclusive advisory lock on `path`, waiting for other threads or
+    processes that hold it.
+
+    Returns:
+        An open handle to pass to `_release_lock`.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    handle = open(_lock_path(path), "a+b")
+    try:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        else:
+            while True:
+                try:
+                    msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:  # LK_LOCK gives up after ~10s
+                    continue
+    except BaseException:
+        handle.close()
+        raise
+    return handle
+
+
+def _release_lock(handle: Any) -> None:
+    """Release a lock taken by `_acquire_lock`."""
+    try:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+        else:
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+    finally:
+        handle.close()
+
+
+@contextmanager
+def _file_lock(path: Path) -> Iterator[None]:
+    """
+    Hold the cross-process lock of a cache entry, so that only one process
+    (or thread) downloads it while the others wait and then reuse it.
+    """
+    handle = _acquire_lock(path)
+    try:
+        yield
+    finally:
+        _release_lock(handle)
+
+
+def _map_file(path: Path) -> mmap.mmap:
+    """Memory-map a file read-only."""
+    with open(path, "rb") as f:
+        try:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError as e:  # empty file
+            raise QSimBenchError(f"Empty cache file {path}") from e
+
+
+def _load_cached(
+    cache_path: Path,
+    force: bool = False,
+    mapped: bool = False,
+    revalidated: bool = False
+) -> Optional[_History]:
+    """
+    Load a cached history if it exists, is fresh and is readable.
+
+    Unreadable entries are removed; expired ones are kept so that they can
+    be revalidated (see `_revalidation`). Loading an entry records its use in
+    the access time, which drives the LRU eviction of `_enforce_quota`.
+
+    Args:
+        cache_path: Local Path of the cache entry.
+        force: If True, ignore the cache.
+        mapped: If True, memory-map the file instead of reading it, so
+            batches are paged in only when accessed.
+        revalidated: If True, the entry was just revalidated: load it
+            whatever its age and `CACHE_TIMEOUT`.
+
+    Returns:
+        The decoded history, or None if it must be (re)downloaded.
+    """
+    if force:
+        return None
+    try:
+        mtime = cache_path.stat().st_mtime
+    except OSError:  # missing, or evicted meanwhile
+        return None
+    now = time.time()
+    if revalidated or (now - mtime) < CACHE_TIMEOUT:
+        logger.debug(f"Loading data from cache: {cache_path}")
+        start = _clock()
+        try:
+            buf = _map_file(cache_path) if mapped else cache_path.read_bytes()
+            history = _History.from_bytes(buf)
+        except QSimBenchError as e:
+            logger.debug(f"Discarding cache entry {cache_path}: {e}")
+            cache_path.unlink(missing_ok=True)
+        except OSError:
+            return None
+        else:
+            try:
+                os.utime(cache_path, (now, mtime))  # keep mtime: it is the expiry clock
+            except OSError:
+                pass
+            _DISK_USAGE.used(cache_path)
+            if start:
+                _record("cache_load", start, disk_hits=1, bytes_read=0 if mapped else len(buf))
+            return history
+    return None
+
+
+def _revalidation(
+    cache_path: Path,
+    key: Optional[_HistoryKey] = None
+) -> Tuple[Optional[_History], Dict[str, str]]:
+    """
+    Prepare the revalidation of an expired cache entry.
+
+    When the entry records the git blob SHA of its source, it is compared
+    with the SHA in the catalog of its version (or, for a local dataset,
+    with the size and mtime of its source), and an unchanged blob is
+    revalidated without downloading it. The catalog costs at most one
+    listing per version, and none once it is persisted. When no SHA can be
+    compared, the entry's ETag is turned into an If-None-Match header, so
+    the download becomes a conditional request.
+
+    Returns:
+        (history, headers): the revalidated history (or None) and the
+        headers for the conditional request.
+    """
+    header = _read_header(cache_path)
+    if header is None:
+        return None, {}
+    if key is not None and header.get("sha"):
+        version, kind, alg, size, be = key
+        if _storage().revision(version, _history_path(kind, alg, size, be)) == header["sha"]:
+            history = _refresh_cached(cache_path)
+            if history is not None:
+                return history, {}
+    if header.get("etag"):
+        return None, {"If-None-Match": header["etag"]}
+    return None, {}
+
+
+def _refresh_cached(cache_path: Path) -> Optional[_History]:
+    """Mark a revalidated entry as fresh and load it."""
+    logger.debug(f"Revalidated cache entry: {cache_path}")
+    if _TRACING:
+        _count(revalidations=1)
+    try:
+        os.utime(cache_path)
+    except OSError:
+        return None
+    return _load_cached(cache_path, revalidated=True)
+
+
+def _parse_history(lines: Iterable[Union[str, bytes]]) -> _History:
+    """
+    Decode JSONL `lines` one record at a time, so only the current line and
+    the columnar arrays are held in memory.
+    """
+    loads = _json_decoder()
+    start = _clock()
+    history = _History.from_records(loads(line) for line in lines if line.strip())
+    if start:
+        _record("parse", start, records_parsed=len(history))
+    return history
+
+
+def _write_history(
+    history: _History,
+    cache_path: Path,
+    sha: Optional[str] = None,
+    etag: Optional[str] = None
+) -> _History:
+    """
+    Cache `history` at `cache_path`, recording the source blob SHA and HTTP
+    ETag for later revalidation.
+    """
+    meta = {k: v for k, v in (("sha", sha), ("etag", etag)) if v}
+    start = _clock()
+    written = _atomic_write_chunks(cache_path, history.to_chunks(CACHE_COMPRESSION, **meta))
+    if start:
+        _record("cache_write", start, bytes_written=written)
+    logger.debug(f"Cached {len(history)} records to {cache_path}")
+    _enforce_quota(keep=cache_path)
+    return history
+
+
+def _store_history(
+    lines: Iterable[Union[str, bytes]],
+    cache_path: Path,
+    sha: Optional[str] = None,
+    etag: Optional[str] = None
+) -> _History:
+    """
+    Decode JSONL `lines` into a history and cache it at `cache_path`,
+    recording the source blob SHA and HTTP ETag for later revalidation.
+    """
+    return _write_history(_parse_history(lines), cache_path, sha, etag)
+
+
+def _store_history_file(
+    part_path: Path,
+    cache_path: Path,
+    sha: Optional[str] = None,
+    etag: Optional[str] = None
+) -> _History:
+    """
+    Decode a downloaded JSONL file line by line, cache it at `cache_path` and
+    remove the download.
+
+    Args:
+        part_path: The downloaded file.
+        cache_path: Where to cache the history.
+        sha: Git blob SHA of the file, computed from it when None.
+        etag: HTTP ETag of the file.
+    """
+    if sha is None:
+        sha = _git_blob_sha(part_path)
+    with open(part_path, "rb") as f:
+        history = _store_history(f, cache_path, sha=sha, etag=etag)
+    part_path.unlink()
+    return history
+
+
+def _part_path(cache_path: Path) -> Path:
+    """Path a history is downloaded to before it is decoded into `cache_path`."""
+    return cache_path.with_name(f"{cache_path.stem}.jsonl.part")
+
+
+def _iter_lines(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Split a stream of byte chunks into lines, holding one chunk at a time."""
+    tail = b""
+    for chunk in chunks:
+        lines = (tail + chunk).split(b"\n") if tail else chunk.split(b"\n")
+        tail = lines.pop()
+        yield from lines
+    if tail:
+        yield tail
+
+
+def _tee_body(resp: "requests.Response", f: Any) -> Iterator[bytes]:
+    """
+    Yield the body of a streamed response in chunks while copying it to the
+    open file `f`; time spent waiting on the network is recorded as such.
+    """
+    chunks = resp.iter_content(chunk_size=_DOWNLOAD_CHUNK)
+    transferred = 0
+    waited = 0.0
+    while True:
+        start = _clock()
+        chunk = next(chunks, None)
+        if start:
+            waited += time.perf_counter() - start
+        if chunk is None:
+            break
+        f.write(chunk)
+        transferred += len(chunk)
+        yield chunk
+    if _TRACING:
+        _record("network", time.perf_counter() - waited, bytes_downloaded=transferred)
+
+
+def _pin_path(path: Path) -> Path:
+    """Path of the marker that protects a cache entry from eviction."""
+    return path.with_name(f".{path.name}.pin")
+
+
+# Seconds between rescans of the cache directory, and between updates of the
+# access time of a history served from memory (which other processes see)
+_DISK_RESCAN = 60.0
+_TOUCH_INTERVAL = 60.0
+
+
+class _DiskUsage:
+    """
+    Incremental table of the files in `CACHE_DIR`, so that enforcing the
+    quota after every write does not list the whole directory.
+
+    Every file counts towards the quota (histories, their sidecars,
+    metadata, catalogs and snapshots); only histories are evicted, together
+    with their sidecars. The directory is scanned on first use and the table
+    is then kept up to date by the writes, loads and evictions of this
+    process; it is rescanned every `_DISK_RESCAN` seconds to pick up those
+    of other processes.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._root: Optional[Path] = None
+        self._scanned = 0.0
+        self._histories: Dict[Path, List[float]] = {}  # path -> [size, last use]
+        self._others: Dict[Path, int] = {}
+        self._used: Dict[Path, float] = {}  # uses in this process, newer than the atime
+
+    def _scan(self) -> None:
+        histories: Dict[Path, List[float]] = {}
+        others: Dict[Path, int] = {}
+        for directory, _, names in os.walk(CACHE_DIR):
+            for name in names:
+                if name.startswith("."):  # locks, pins and temporary files
+                    continue
+                path = Path(directory, name)
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                if name.endswith(_QSB_SUFFIX):
+                    histories[path] = [st.st_size, max(st.st_atime, self._used.get(path, 0.0))]
+                else:
+                    others[path] = st.st_size
+        self._root, self._scanned = CACHE_DIR, time.monotonic()
+        self._histories, self._others = histories, others
+
+    def _current(self) -> None:
+        if self._root != CACHE_DIR or time.monotonic() - self._scanned >= _DISK_RESCAN:
+            self._scan()
+
+    def record(self, path: Path, size: int) -> None:
+        """Account for a file just written to the cache."""
+        with self._lock:
+            if self._root != CACHE_DIR or not path.is_relative_to(CACHE_DIR):
+                return  # not scanned yet, or outside the cache
+            if path.name.endswith(_QSB_SUFFIX):
+                self._histories[path] = [size, time.time()]
+            else:
+                self._others[path] = size
+
+    def used(self, path: Path) -> None:
+        """Record a use of the history at `path`, for the LRU order."""
+        now = time.time()
+        with self._lock:
+            self._used[path] = now
+            entry = self._histories.get(path)
+            if entry is not None:
+                entry[1] = now
+
+    def discard(self, path: Path) -> None:
+        with self._lock:
+            self._histories.pop(path, None)
+            self._others.pop(path, None)
+            self._used.pop(path, None)
+
+    def snapshot(self, rescan: bool = False) -> Tuple[int, List[Tuple[Path, int, float]]]:
+        """
+        Returns:
+            (total, histories): the bytes held by the cache and the
+            (path, size, last use) of every history, least recently used first.
+        """
+        with self._lock:
+            if rescan or not CACHE_DIR.exists():
+                self._root = None
+            self._current()
+            total = sum(size for size, _ in self._histories.values()) + sum(self._others.values())
+            histories = sorted(
+                ((path, int(size), used) for path, (size, used) in self._histories.items()),
+                key=lambda e: e[2],
+            )
+            return total, histories
+
+
+_DISK_USAGE = _DiskUsage()
+
+
+def _sidecar_paths(path: Path) -> List[Path]:
+    """Files derived from the history cached at `path`, evicted with it."""
+    return [_distribution_path(path), *path.parent.glob(f"{path.stem}{_WINDOWS_SUFFIX}.*")]
+
+
+def _enforce_quota(keep: Optional[Path] = None) -> int:
+    """
+    Evict least-recently-used histories until the cache fits `CACHE_QUOTA`.
+
+    Pinned entries and `keep` (the entry just written) are never evicted.
+
+    Returns:
+        Number of evicted entries.
+    """
+    if not CACHE_QUOTA or not CACHE_DIR.exists():
+        return 0
+    with _DISK_USAGE._lock:
+        total, histories = _DISK_USAGE.snapshot()
+        evicted = 0
+        for path, size, _ in histories:
+            if total <= CACHE_QUOTA:
+                break
+            if path == keep or _pin_path(path).exists():
+                continue
+            try:
+                path.unlink()
+            except FileNotFoundError:  # evicted by another process
+                pass
+            except OSError:
+                continue
+            _DISK_USAGE.discard(path)
+            total -= size
+            for sidecar in _sidecar_paths(path):
+                try:
+                    total -= sidecar.stat().st_size
+                    sidecar.unlink()
+                except OSError:
+                    pass
+                _DISK_USAGE.discard(sidecar)
+            evicted += 1
+            logger.debug(f"Evicted cache entry {path}")
+    if total > CACHE_QUOTA:
+        logger.warning(
+            f"Cache holds {total} bytes, over its quota of {CACHE_QUOTA}, "
+            "but the remaining entries are pinned or in use."
+        )
+    return evicted
+
+
+def _download_and_cache(
+    url: str,
+    cache_path: Path,
+    force: bool = False,
+    key: Optional[_HistoryKey] = None
+) -> _History:
+    """
+    Download a JSONL history from `url` and cache it at `cache_path` in the
+    binary ``.qsb`` format.
+
+    Expired entries are revalidated rather than downloaded again: by blob
+    SHA when the version listing is known, otherwise with a conditional
+    request that only transfers the file if it changed. Misses are handled
+    under the entry's cross-process lock, so concurrent processes sharing
+    the cache directory download each file once.
+
+    Args:
+        url: Full URL to JSONL.
+        cache_path: Local Path to cache.
+        force: If True, ignore existing cache.
+        key: Cache key of the history, used to look up its blob SHA.
+
+    Returns:
+        The decoded history (empty if the file does not exist).
+
+    Raises:
+        QSimBenchError: On HTTP errors.
+    """
+    # Serve from cache if fresh
+    history = _load_cached(cache_path, force)
+    if history is not None:
+        return history
+
+    with _file_lock(cache_path):
+        if not force:
+            # Another process may have filled the entry while we waited
+            history = _load_cached(cache_path)
+            if history is not None:
+                return history
+        return _fetch_history(url, cache_path, force, key)
+
+
+def _fetch_history(
+    url: str,
+    cache_path: Path,
+    force: bool,
+    key: Optional[_HistoryKey]
+) -> _History:
+    """Revalidate or download a cache entry; the caller holds its lock."""
+    if _TRACING:
+        _count(disk_misses=1)
+    headers: Dict[str, str] = {}
+    if not force:
+        history, headers = _revalidation(cache_path, key)
+        if history is not None:
+            return history
+
+    storage = _storage()
+    if storage.local and key is not None:
+        version, kind, alg, size, be = key
+        path = _history_path(kind, alg, size, be)
+        return _store_local_history(
+            storage.file_path(version, path), cache_path, storage.revision(version, path)
+        )
+
+    logger.debug(f"Fetching data from URL: {url}")
+    try:
+        resp = _http_get(url, headers=headers, stream=True, timeout=1)
+        resp.raise_for_status()
+    except requests.HTTPError as e:
+        e.response.close()
+        if e.response.status_code != 404:
+            raise QSimBenchError(f"HTTP error fetching {url}: {e}") from e
+        else:
+            return _History.from_records([])
+    except requests.ConnectionError as e:
+        raise QSimBenchError(f"Couldn't connect to the dataset: {e}")
+
+    if resp.status_code == 304:
+        resp.close()
+        history = _refresh_cached(cache_path)
+        if history is not None:
+            return history
+        return _fetch_history(url, cache_path, True, key)
+
+    # The body is parsed as it arrives and copied to disk, where its blob
+    # SHA is computed afterwards: the file is never held in memory whole.
+    part_path = _part_path(cache_path)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        with resp, open(part_path, "wb") as f:
+            history = _parse_history(_iter_lines(_tee_body(resp, f)))
+        sha = _git_blob_sha(part_path)
+    except requests.RequestException as e:
+        raise QSimBenchError(f"Couldn't download {url}: {e}") from e
+    finally:
+        part_path.unlink(missing_ok=True)
+    return _write_history(history, cache_path, sha=sha, etag=resp.headers.get("ETag"))
+
+
+def _history_path(kind: str, alg: str, size: int, be: str) -> str:
+    """Path of a history within its version directory."""
+    return f"histories/{kind}/{alg}_{size}_{be}.jsonl"
+
+
+def _history_location(
+    algorithm: str,
+    size: int,
+    backend: str,
+    version: str,
+    circuit_kind: str = "circuit"
+) -> Tuple[_HistoryKey, str, Path]:
+    """
+    Validate a configuration and locate its history.
+
+    Returns:
+        (key, url, cache_path): the memory-cache key, the URL of the JSONL
+        source and the on-disk cache path.
+
+    Raises:
+        QSimBenchError: On invalid parameters.
+    """
+    if not algorithm or size <= 0 or not backend:
+        raise QSimBenchError("algorithm, size, and backend must be valid.")
+    kind = circuit_kind.lower()
+    if kind not in {"circuit", "mirror"}:
+        raise QSimBenchError("circuit_kind must be 'circuit' or 'mirror'.")
+
+    storage = _storage()
+    alg = algorithm.lower()
+    be = backend.lower()
+    url = storage.file_url(version, _history_path(kind, alg, size, be))
+    cache_path = _dataset_cache_dir() / version / kind / f"{alg}_{size}_{be}{_QSB_SUFFIX}"
+    return (version, kind, alg, size, be), url, cache_path
+
+
+def _get_data(
+    algorithm: str,
+    size: int,
+    backend: str,
+    version: str,
+    circuit_kind: str = "circuit",
+    force: bool = False
+) -> _History:
+    """
+    Retrieve the history of a configuration from the dataset.
+
+    Args:
+        algorithm: Algorithm name (non-empty).
+        size: Positive integer problem size.
+        backend: Backend identifier (non-empty).
+        circuit_kind: Either "circuit" or "mirror".
+        force: If True, bypass cache.
+
+    Returns:
+        The decoded history.
+
+    Raises:
+        QSimBenchError: On invalid parameters or no records.
+    """
+    key, url, cache_path = _history_location(algorithm, size, backend, version, circuit_kind)
+
+    # Serve decoded data from memory when possible
+    if force:
+        _HISTORY_CACHE.invalidate(key)
+    else:
+        history = _HISTORY_CACHE.get(key)
+        if history is not None:
+            return history
+
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+
+    # Download & parse
+    history = _download_and_cache(url, cache_path, force=force, key=key)
+    if len(history):
+        _HISTORY_CACHE.put(key, history, MEMORY_BUDGET, _validated_at(cache_path), cache_path)
+    return history
+
+
+# ---------------------------------------------------------------------------
+# Full-history distributions
+# ---------------------------------------------------------------------------
+# The distribution of a history (its counts summed over every batch) is
+# stored next to its cache entry as ``<name>.dist.json``, tagged with the
+# blob SHA (or ETag) recorded in the entry's header. While the entry is
+# fresh and still holds that blob, the sidecar is returned without loading
+# the history; otherwise it is recomputed once from the refreshed history.
+_DIST_SUFFIX = ".dist.json"
+
+
+def _distribution_path(cache_path: Path) -> Path:
+    """Path of the distribution sidecar of a cache entry."""
+    return cache_path.with_name(f"{cache_path.stem}{_DIST_SUFFIX}")
+
+
+def _history_source(cache_path: Path) -> Optional[str]:
+    """Identity of the blob a cache entry was built from, or None if unknown."""
+    header = _read_header(cache_path)
+    if header is None:
+        return None
+    return header.get("sha") or header.get("etag")
+
+
+def _fresh_source(cache_path: Path) -> Optional[str]:
+    """Like `_history_source`, but None as well if the entry is expired."""
+    try:
+        mtime = cache_path.stat().st_mtime
+    except OSError:
+        return None
+    if time.time() - mtime >= CACHE_TIMEOUT:
+        return None
+    return _history_source(cache_path)
+
+
+def _load_distribution(cache_path: Path) -> Optional[Dict[str, int]]:
+    """
+    Read the distribution sidecar of a fresh cache entry.
+
+    Returns:
+        Counts keyed by outcome, or None if the entry is expired or missing
+        or the sidecar does not match it.
+    """
+    source = _fresh_source(cache_path)
+    if source is None:
+        return None
+    try:
+        stored = json.loads(_distribution_path(cache_path).read_bytes())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(stored, dict) or stored.get("source") != source:
+        return None
+    return stored["counts"]
+
+
+def _get_distribution(
+    algorithm: str,
+    size: int,
+    backend: str,
+    version: str,
+    circuit_kind: str = "circuit",
+    force: bool = False
+) -> Dict[str, int]:
+    """
+    Counts of a configuration's history summed over every batch.
+
+    Returns:
+        Counts keyed by outcome bitstring.
+
+    Raises:
+        QSimBenchError: On invalid parameters or no records.
+    """
+    _, _, cache_path = _history_location(algorithm, size, backend, version, circuit_kind)
+    if not force:
+        counts = _load_distribution(cache_path)
+        if counts is not None:
+            return counts
+
+    history = _get_data(algorithm, size, backend, version, circuit_kind, force)
+    if not len(history):
+        raise QSimBenchError("No records available to sample.")
+    if not force:
+        # The entry may only have been revalidated, keeping its sidecar valid
+        counts = _load_distribution(cache_path)
+        if counts is not None:
+            return counts
+
+    start = _clock()
+    view = _HistoryView([history])
+    counts = view.finalize(view.merge([history.totals()]))
+    if start:
+        _record("aggregate", start, batches_aggregated=len(history))
+    source = _history_source(cache_path)
+    if source is not None:
+        _atomic_write_bytes(
+            _distribution_path(cache_path),
+            json.dumps({"source": source, "counts": counts}).encode(),
+        )
+    return counts
+
+
+# ---------------------------------------------------------------------------
+# Window statistics
+# ---------------------------------------------------------------------------
+# The result of `get_window_stats` is stored next to the cache entry, one
+# ``<name>.windows.<tag>.bin`` per (window, step, target), and tagged with
+# the entry's source like the distribution sidecar. The file holds a JSON
+# header line followed by the float64 metrics, one row per metric.
+_WINDOWS_SUFFIX = ".windows"
+_WINDOW_METRICS = ("start", "shots", "entropy", "success_probability", "tvd", "hellinger")
+
+
+def _window_stats_path(cache_path: Path, window: int, step: int, target: Any) -> Path:
+    """Path of the window-statistics sidecar of a cache entry for one set of arguments."""
+    tag = hashlib.sha1(json.dumps([window, step, target]).encode()).hexdigest()[:16]
+    return cache_path.with_name(f"{cache_path.stem}{_WINDOWS_SUFFIX}.{tag}.bin")
+
+
+def _load_window_stats(cache_path: Path, window: int, step: int, target: Any) -> Optional[Dict[str, Any]]:
+    """
+    Read a window-statistics sidecar of a fresh cache entry.
+
+    Returns:
+        The `get_window_stats` result, or None if the entry is expired or
+        missing or the sidecar does not match it.
+    """
+    source = _fresh_source(cache_path)
+    if source is None:
+        return None
+    try:
+        data = _window_stats_path(cache_path, window, step, target).read_bytes()
+        head, _, body = data.partition(b"\n")
+        header = json.loads(head)
+    except (OSError, ValueError):
+        return None
+    if (
+        not isinstance(header, dict)
+        or header.get("source") != source
+        or header.get("byteorder") != sys.byteorder
+        or len(body) != 8 * len(_WINDOW_METRICS) * header.get("windows", -1)
+    ):
+        return None
+    rows = np.frombuffer(body, dtype=np.float64).reshape(len(_WINDOW_METRICS), -1)
+    return {"target": header["target"], **dict(zip(_WINDOW_METRICS, rows))}
+
+
+def _save_window_stats(
+    cache_path: Path,
+    window: int,
+    step: int,
+    target: Any,
+    stats: Dict[str, Any]
+) -> None:
+    """Store a `get_window_stats` result next to its cache entry (when its source is known)."""
+    source = _history_source(cache_path)
+    if source is None:
+        return
+    header = {
+        "source": source,
+        "target": stats["target"],
+        "windows": len(stats["start"]),
+        "byteorder": sys.byteorder,
+    }
+    _atomic_write_chunks(
+        _window_stats_path(cache_path, window, step, target),
+        [json.dumps(header).encode() + b"\n", *(stats[name].tobytes() for name in _WINDOW_METRICS)],
+    )
+
+
+def _check_sampling_args(
+    shots: int,
+    strategy: str,
+    engine: str,
+    exact_method: str
+) -> str:
+    """
+    Validate the sampling arguments of `get_outcomes`.
+
+    Returns:
+        The concrete engine ("python" or "numpy").
+
+    Raises:
+        QSimBenchError: On invalid arguments.
+    """
+    if not isinstance(shots, int) or shots <= 0:
+        raise QSimBenchError("Parameter 'shots' must be > 0.")
+    if strategy not in {"sequential", "random"}:
+        raise QSimBenchError("Strategy must be 'sequential' or 'random'.")
+    if engine == "auto":
+        engine = "numpy" if _HAS_NUMPY else "python"
+    if engine not in {"python", "numpy"}:
+        raise QSimBenchError("Engine must be 'python', 'numpy' or 'auto'.")
+    if engine == "numpy":
+        _require_numpy("The 'numpy' engine")
+    if exact_method not in _EXACT_METHODS:
+        raise QSimBenchError("exact_method must be 'multinomial', 'hypergeometric' or 'portable'.")
+    return engine
+
+
+def _check_version_weights(
+    weights: Optional[List[float]],
+    versions: List[str]
+) -> Optional[List[float]]:
+    """
+    Validate per-version weights.
+
+    Raises:
+        QSimBenchError: If there is not one non-negative weight per version,
+            or all weights are zero.
+    """
+    if weights is None:
+        return None
+    weights = list(weights)
+    if len(weights) != len(versions):
+        raise QSimBenchError("Parameter 'version_weights' needs one weight per version.")
+    if any(not isinstance(w, (int, float)) or w < 0 for w in weights):
+        raise QSimBenchError("Parameter 'version_weights' must be non-negative numbers.")
+    if sum(weights) <= 0:
+        raise QSimBenchError("Parameter 'version_weights' must not be all zero.")
+    return [float(w) for w in weights]
+
+
+def _sample(
+    view: _HistoryView,
+    cursor_keys: List[_CursorKey],
+    shots: int,
+    exact: bool,
+    strategy: str,
+    seed: Optional[int],
+    engine: str,
+    exact_method: str,
+    int_keys: bool = False,
+    weights: Optional[List[float]] = None
+) -> Dict[Any, int]:
+    """
+    Sample outcome counts from the loaded histories of one or more versions
+    (see `get_outcomes`).
+
+    Each version is aggregated in place, keyed by outcome code; the versions
+    are only merged, by outcome, once their counts are summed.
+
+    Args:
+        view: Histories of the requested versions.
+        cursor_keys: Sequential cursor of each version.
+        weights: Share of the shots drawn from each version. With
+            `strategy="random"` and no weights, batches are drawn uniformly
+            from all versions together.
+
+    Raises:
+        QSimBenchError: If there is nothing to sample, or a version with a
+            positive weight has no shots.
+    """
+    if len(view) == 0:
+        raise QSimBenchError("No records available to sample.")
+    part_shots = view.part_shots()
+    if sum(part_shots) == 0:
+        raise QSimBenchError("No shots available to sample.")
+
+    # Initialize RNGs
+    master_rng = random.Random(seed)
+    sample_seed = master_rng.randint(0, 2**32 - 1)
+    exact_seed = master_rng.randint(0, 2**32 - 1)
+
+    n_parts = len(view.parts)
+    segments: List[List[Tuple[int, int, int]]] = [[] for _ in range(n_parts)]
+    batches: List[Optional[List[int]]] = [None] * n_parts
+
+    if strategy == "random" and weights is None:
+        drawn, total = _random_batches(view.parts[0] if n_parts == 1 else view, shots, sample_seed)
+        if n_parts == 1:
+            batches[0] = drawn
+        else:
+            for idx in drawn:
+                part, j = view.locate(idx)
+                if batches[part] is None:
+                    batches[part] = []
+                batches[part].append(j)
+    else:
+        if weights is None:
+            weights = [float(s) for s in part_shots]
+        for i, w in enumerate(weights):
+            if w > 0 and part_shots[i] == 0:
+                raise QSimBenchError(
+                    f"No shots available to sample from version #{i + 1}."
+                )
+        alloc = _allocate_shots(shots, weights)
+        part_seeds = random.Random(sample_seed)
+        total = 0
+        for i, history in enumerate(view.parts):
+            part_seed = part_seeds.randint(0, 2**32 - 1)
+            if alloc[i] == 0:
+                continue
+            if strategy == "sequential":
+                n = len(history)
+
+                def claim(
+                    start_idx: int, history: _History = history, n: int = n, want: int = alloc[i]
+                ) -> Tuple[Tuple[List[Tuple[int, int, int]], int], int]:
+                    if start_idx >= n:
+                        start_idx = 0
+                    window, got, end_idx = _sequential_window(history, start_idx, want)
+                    return (window, got), end_idx
+
+                segments[i], got = _cursors().claim(cursor_keys[i], claim)
+            else:  # stratified random
+                batches[i], got = _random_batches(history, alloc[i], part_seed)
+            total += got
+
+    start = _clock()
+    aggs: List[Optional[Dict[int, int]]] = []
+    for i, history in enumerate(view.parts):
+        if not segments[i] and batches[i] is None:
+            aggs.append(None)
+        elif engine == "numpy":
+            aggs.append(_aggregate_numpy(history, segments[i], batches[i]))
+        else:
+            part_segments = segments[i]
+            if batches[i] is not None:
+                part_segments = [(idx, idx + 1, 1) for idx in batches[i]]
+            aggs.append(_aggregate_python(history, part_segments))
+    agg = (aggs[0] or {}) if n_parts == 1 else view.merge(aggs)
+    if start:
+        n_batches = sum(len(b) for b in batches if b is not None) + sum(
+            (stop - first) * mult for part in segments for first, stop, mult in part
+        )
+        _record("aggregate", start, batches_aggregated=n_batches)
+
+    # Exact down-sampling
+    if exact and total > shots:
+        start = _clock()
+        agg = _multinomial_sample(agg, shots, exact_seed, exact_method)
+        if start:
+            _record("exact_sample", start, exact_samples=1)
+
+    if n_parts == 1:
+        key = view.outcome_key(0)
+        agg = {key(code): cnt for code, cnt in agg.items()}
+    return view.finalize(agg, int_keys)
+
+
+# Entries expanded at once when aggregating replicates, bounding temporaries
+_REPLICATE_BLOCK = 1 << 22
+# Outcome changes processed at once by `_History.window_stats`
+_WINDOW_BLOCK = 1 << 22
+
+
+def _replicate_columns(view: _HistoryView) -> Tuple[List[Any], List[Any]]:
+    """
+    Column layout of a replicate matrix over the outcomes of `view`.
+
+    Returns:
+        (outcomes, colmaps): the merged outcome keys in sorted order, and
+        for each part an array mapping its outcome codes to columns.
+    """
+    if view.packed:
+        values = [_as_numpy(p.values) for p in view.parts]
+        outcomes = np.unique(np.concatenate(values))
+        return outcomes.tolist(), [np.searchsorted(outcomes, v) for v in values]
+    keys = [[view.outcome_key(i)(c) for c in range(p.n_outcomes)] for i, p in enumerate(view.parts)]
+    outcomes = sorted(set().union(*keys))
+    column = {k: j for j, k in enumerate(outcomes)}
+    return outcomes, [np.array([column[k] for k in part], dtype=np.int64) for part in keys]
+
+
+def _sample_replicates(
+    view: _HistoryView,
+    shots: int,
+    replicates: int,
+    seed: Optional[int],
+    exact: bool,
+    exact_method: str
+) -> Tuple[List[Any], Any]:
+    """
+    Draw `replicates` independent random-strategy samples of `shots` each.
+
+    Replicate ``r`` uses its own generator, the ``r``-th child of
+    ``SeedSequence(seed)``, for both its batch draws and its down-sampling,
+    so it is reproducible from the master seed whatever `replicates` is.
+    Batches are drawn uniformly with replacement among those with shots,
+    and the drawn batches of many replicates are aggregated at once.
+
+    Only the outcomes counted in at least one replicate get a column, so
+    the matrix stays small for histories with many distinct outcomes.
+
+    Returns:
+        (outcomes, matrix): the merged outcome keys (see `_HistoryView`) of
+        the outcomes drawn, in sorted order, and a
+        ``replicates x len(outcomes)`` int64 count matrix.
+
+    Raises:
+        QSimBenchError: If there are no records to sample.
+    """
+    outcomes, colmaps = _replicate_columns(view)
+    batch_shots = np.concatenate([_as_numpy(p.shots) for p in view.parts]).astype(np.int64)
+    valid = np.flatnonzero(batch_shots)
+    if not len(valid):
+        raise QSimBenchError("No records available to sample.")
+
+    # Entries of every part in one flat layout, codes mapped to columns
+    starts, lengths, columns, counts = [], [], [], []
+    base = 0
+    for part, colmap in zip(view.parts, colmaps):
+        offsets, codes, cnts = part.as_numpy()
+        offsets = offsets.astype(np.int64)
+        starts.append(offsets[:-1] + base)
+        lengths.append(np.diff(offsets))
+        columns.append(colmap[codes])
+        counts.append(cnts)
+        base += len(codes)
+    starts, lengths = np.concatenate(starts), np.concatenate(lengths)
+    columns, counts = np.concatenate(columns), np.concatenate(counts)
+
+    # Batch draws, one generator per replicate
+    start = _clock()
+    generators = [np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(replicates)]
+    estimate = int(shots / batch_shots[valid].mean() * 1.1) + 8
+    draws = []
+    for rng in generators:
+        drawn = valid[rng.integers(len(valid), size=estimate)]
+        cumulative = np.cumsum(batch_shots[drawn])
+        while cumulative[-1] < shots:
+            more = valid[rng.integers(len(valid), size=estimate)]
+            drawn = np.concatenate([drawn, more])
+            cumulative = np.concatenate([cumulative, cumulative[-1] + np.cumsum(batch_shots[more])])
+        draws.append(drawn[:np.searchsorted(cumulative, shots) + 1])
+
+    # Columns for the outcomes of the drawn batches only
+    drawn = np.unique(np.concatenate(draws))
+    sizes = lengths[drawn]
+    ends = np.cumsum(sizes)
+    used = np.unique(columns[np.repeat(starts[drawn] - ends + sizes, sizes) + np.arange(ends[-1])])
+    remap = np.full(len(outcomes), -1, dtype=np.int64)
+    remap[used] = np.arange(len(used))
+    columns = remap[columns]
+    outcomes = [outcomes[j] for j in used.tolist()]
+    n_cols = len(outcomes)
+
+    # Aggregate the entries of the drawn batches, a block of replicates at a
+    # time so that temporaries stay within _REPLICATE_BLOCK elements
+    matrix = np.zeros((replicates, n_cols), dtype=np.int64)
+    n_batches = np.fromiter(map(len, draws), dtype=np.int64, count=replicates)
+    per_replicate = max(n_batches.mean() * lengths.mean(), n_cols, 1)
+    block = max(1, int(_REPLICATE_BLOCK // per_replicate))
+    for first in range(0, replicates, block):
+        stop = min(first + block, replicates)
+        batches = np.concatenate(draws[first:stop])
+        rows = np.repeat(np.arange(stop - first), n_batches[first:stop])
+        sizes = lengths[batches]
+        ends = np.cumsum(sizes)
+        # Position of every entry of every drawn batch in the flat layout
+        entries = np.repeat(starts[batches] - ends + sizes, sizes) + np.arange(ends[-1])
+        cells = np.repeat(rows, sizes) * n_cols + columns[entries]
+        matrix[first:stop] += np.bincount(
+            cells, weights=counts[entries], minlength=(stop - first) * n_cols
+        ).astype(np.int64).reshape(stop - first, n_cols)
+    if start:
+        _record("aggregate", start, batches_aggregated=int(n_batches.sum()))
+
+    # Exact down-sampling of each replicate with its own generator
+    if exact:
+        start = _clock()
+        for row, rng in zip(matrix, generators):
+            total = int(row.sum())
+            if total <= shots:
+                continue
+            nz = np.flatnonzero(row)
+            if exact_method == "hypergeometric":
+                row[nz] = rng.multivariate_hypergeometric(row[nz], shots, method="marginals")
+            else:
+                row[nz] = rng.multinomial(shots, row[nz] / total)
+        if start:
+            _record("exact_sample", start, exact_samples=replicates)
+        # Drop the outcomes that down-sampling removed from every replicate
+        kept = np.flatnonzero(matrix.any(axis=0))
+        if len(kept) < n_cols:
+            matrix = matrix[:, kept]
+            outcomes = [outcomes[j] for j in kept.tolist()]
+    return outcomes, matrix
+
+
+def _metadata_files(
+    catalog: "_Catalog",
+    algorithm: str,
+    size: int,
+    backend: str,
+    version: str
+) -> List[str]:
+    """Names of the metadata files of a configuration in a version catalog."""
+    files = catalog.metadata.get((algorithm.lower(), int(size), backend.lower()))
+    if not files:
+        raise QSimBenchError(
+            f"No metadata files for {algorithm}_{size}_{backend} for version {version}"
+        )
+    return files
+
+
+def _parse_metadata(text: str) -> List[Any]:
+    """Parse a metadata file holding either one JSON document or JSONL."""
+    try:
+        return [json.loads(text)]  # try full parse
+    except json.JSONDecodeError:
+        return [json.loads(line) for line in text.strip().splitlines()]
+
+
+def _metadata_path(version: str, fname: str) -> Path:
+    """Local cache path of a metadata file of a version."""
+    if fname == "metadata.json":
+        return _dataset_cache_dir() / version / fname
+    return _dataset_cache_dir() / version / "metadata" / fname
+
+
+def _cached_metadata_text(version: str, fname: str, sha: Optional[str]) -> Optional[str]:
+    """
+    Contents of a cached metadata file if it holds the same blob as the
+    catalog (`sha`), or is fresh when the blob SHA is unknown.
+    """
+    path = _metadata_path(version, fname)
+    try:
+        if sha is not None:
+            fresh = _git_blob_sha(path) == sha
+        else:
+            fresh = time.time() - path.stat().st_mtime < CACHE_TIMEOUT
+        if fresh:
+            return path.read_text(encoding="utf-8")
+    except OSError:
+        pass
+    return None
+
+
+def _store_metadata(version: str, fname: str, content: bytes) -> None:
+    path = _metadata_path(version, fname)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    _atomic_write_bytes(path, content)
+
+
+def _metadata_text(version: str, fname: str, sha: Optional[str]) -> str:
+    """
+    Contents of a metadata file, from the versioned cache when possible and
+    downloaded (and cached) otherwise. Local datasets are read in place.
+
+    Raises:
+        QSimBenchError: On HTTP or read errors.
+    """
+    storage = _storage()
+    if storage.local:
+        try:
+            return storage.file_path(version, fname).read_text(encoding="utf-8")
+        except OSError as e:
+            raise QSimBenchError(f"Error reading {fname} of version {version}: {e}") from e
+
+    text = _cached_metadata_text(version, fname, sha)
+    if text is not None:
+        return text
+
+    raw_url = storage.file_url(version, fname)
+    try:
+        r = _http_get(raw_url, timeout=1)
+        r.raise_for_status()
+    except requests.HTTPError as e:
+        raise QSimBenchError(f"Error fetching {raw_url}: {e}") from e
+    except requests.ConnectionError as e:
+        raise QSimBenchError(f"Couldn't connect to the dataset: {e}")
+    _store_metadata(version, fname, r.content)
+    return r.text
+
+def _git_blob_sha(path: Path) -> str:
+    """Git blob SHA-1 of a local file, as listed in GitHub trees."""
+    digest = hashlib.sha1(b"blob %d\0" % path.stat().st_size)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _parse_history_name(name: str) -> Optional[Tuple[str, int, str]]:
+    """Split ``{alg}_{size}_{backend}.jsonl`` into its parts, or None."""
+    if not name.endswith(".jsonl"):
+        return None
+    parts = name[:-len(".jsonl")].split("_")
+    for i, part in enumerate(parts[1:], start=1):
+        if part.isdigit():
+            return "_".join(parts[:i]), int(part), "_".join(parts[i + 1:])
+    return None
+
+
+def _get_tree(url: str) -> Dict[str, Any]:
+    try:
+        resp = _http_get(url, timeout=1)
+        resp.raise_for_status()
+    except requests.HTTPError as e:
+        raise QSimBenchError(f"GitHub API error: {e}") from e
+    except requests.ConnectionError as e:
+        raise QSimBenchError(f"Couldn't connect to the dataset: {e}")
+    return resp.json()
+
+
+def _download_resumable(
+    url: str,
+    part_path: Path,
+    sha: Optional[str]
+) -> Tuple[int, Optional[str]]:
+    """
+    Download `url` into `part_path`, resuming a previous partial download
+    with an HTTP Range request, and verify the git blob SHA when known.
+
+    Returns:
+        (transferred, etag): bytes transferred and the ETag of the file.
+
+    Raises:
+        QSimBenchError: On HTTP errors or checksum mismatch.
+    """
+    offset = part_path.stat().st_size if part_path.exists() else 0
+    headers = {"Range": f"bytes={offset}-"} if offset else {}
+    try:
+        resp = _http_get(url, headers=headers, stream=True, timeout=1)
+        etag = resp.headers.get("ETag")
+        if resp.status_code == 416:  # already complete
+            resp.close()
+            resp, etag = None, None
+        else:
+            resp.raise_for_status()
+    except requests.HTTPError as e:
+        raise QSimBenchError(f"HTTP error fetching {url}: {e}") from e
+    except requests.ConnectionError as e:
+        raise QSimBenchError(f"Couldn't connect to the dataset: {e}")
+
+    transferred = 0
+    if resp is not None:
+        start = _clock()
+        with resp, open(part_path, "ab" if resp.status_code == 206 else "wb") as f:
+            for chunk in resp.iter_content(chunk_size=_DOWNLOAD_CHUNK):
+                f.write(chunk)
+                transferred += len(chunk)
+        if start:
+            _record("network", start, bytes_downloaded=transferred)
+
+    if sha and _git_blob_sha(part_path) != sha:
+        part_path.unlink(missing_ok=True)
+        if offset:
+            # The partial file we resumed from was stale: start over once
+            retransferred, etag = _download_resumable(url, part_path, sha)
+            return transferred + retransferred, etag
+        raise QSimBenchError(f"Checksum mismatch for {url}")
+    return transferred, etag
+
+
+# ---------------------------------------------------------------------------
+# Storage backends
+# ---------------------------------------------------------------------------
+# The dataset is read through a backend chosen from DATASET_URL: the GitHub
+# repository (git trees API and raw files), a static HTTP mirror of its
+# dataset directory, or a copy of that directory on a local or shared
+# filesystem. Remote histories are downloaded into the cache; local ones are
+# converted straight from a memory map and revalidated by size and mtime, so
+# a local dataset is used without any network access.
+def _file_revision(st: os.stat_result) -> str:
+    """Revision of a local dataset file, standing in for its git blob SHA."""
+    return f"{st.st_size}-{st.st_mtime_ns}"
+
+
+class _MirrorStorage:
+    """
+    A static HTTP copy of the dataset directory: ``versions.json`` plus one
+    directory per version, each listed by a ``catalog.json`` (see
+    `index_dataset`). Without tree SHAs, a persisted catalog is trusted for
+    `CACHE_TIMEOUT`, then revalidated by the ETag of ``catalog.json``.
+    """
+
+    local = False
+    tree_shas = False
+
+    def __init__(self, url: str) -> None:
+        self.raw_url = url.rstrip("/")
+
+    def _get(self, url: str, headers: Optional[Dict[str, str]] = None) -> "requests.Response":
+        try:
+            resp = _http_get(url, headers=headers, timeout=1)
+            resp.raise_for_status()
+        except requests.HTTPError as e:
+            raise QSimBenchError(f"HTTP error fetching {url}: {e}") from e
+        except requests.ConnectionError as e:
+            raise QSimBenchError(f"Couldn't connect to the dataset: {e}")
+        return resp
+
+    def _get_json(self, url: str) -> Any:
+        return json.loads(self._get(url).text)
+
+    def list_versions(self) -> List[str]:
+        return self._get_json(f"{self.raw_url}/versions.json")
+
+    def list_dataset(self) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """
+        List the versions of the dataset.
+
+        Returns:
+            (content, versions): one entry per version (with its tree SHA
+            when the backend knows it) and the version names, oldest first.
+        """
+        versions = self.list_versions()
+        return [{"path": version, "type": "tree"} for version in versions], versions
+
+    def list_version(self, version: str) -> Tuple[Optional[str], List[Dict[str, Any]]]:
+        """
+        List the files of a version.
+
+        Returns:
+            (sha, files): the tree SHA of the version, if known, and one
+            ``{"path", "sha", "size"}`` entry per file.
+        """
+        listing, _ = self.get_catalog(version)
+        return listing.get("sha"), listing["files"]
+
+    def get_catalog(
+        self,
+        version: str,
+        etag: Optional[str] = None
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        Fetch the ``catalog.json`` of a version, conditionally on `etag`.
+
+        Returns:
+            (listing, etag): the parsed catalog, or None if it still
+            matches `etag`, and its current ETag.
+        """
+        resp = self._get(
+            f"{self.raw_url}/{version}/{_CATALOG_NAME}",
+            headers={"If-None-Match": etag} if etag else None,
+        )
+        if resp.status_code == 304:
+            return None, etag
+        return json.loads(resp.text), resp.headers.get("ETag")
+
+    def file_url(self, version: str, path: str) -> str:
+        return f"{self.raw_url}/{version}/{path}"
+
+    def revision(self, version: str, path: str) -> Optional[str]:
+        """
+        Blob SHA of a file from the catalog of its version. The catalog is
+        listed (once, then persisted) when it is not known yet and can be
+        validated: always for a mirror, and when the dataset snapshot
+        records the version's tree SHA on GitHub. The snapshot itself is
+        loaded or fetched first if needed, since callers that name their
+        versions never trigger it.
+
+        Returns:
+            The blob SHA, or None if the version cannot be listed.
+        """
+        catalog = _load_catalog(version)
+        if catalog is None:
+            try:
+                _ensure_dataset()
+                catalog = _load_catalog(version)
+                if catalog is None and (not self.tree_shas or _version_tree_sha(version) is not None):
+                    catalog = _catalog(version)
+            except QSimBenchError as e:
+                logger.debug(f"Couldn't list version {version}: {e}")
+        return catalog.blobs.get(path) if catalog is not None else None
+
+
+class _GitHubStorage(_MirrorStorage):
+    """The dataset directory of a GitHub repository."""
+
+    tree_shas = True
+
+    def __init__(self, url: str) -> None:
+        url_parts = url.rstrip("/").split("/")
+        self.owner = url_parts[-2]
+        self.repo = url_parts[-1]
+        super().__init__(
+            f"https://raw.githubusercontent.com/{self.owner}/{self.repo}/refs/heads/main/dataset"
+        )
+
+    def list_dataset(self) -> Tuple[List[Dict[str, Any]], List[str]]:
+        main = _get_tree(f"https://api.github.com/repos/{self.owner}/{self.repo}/git/trees/main")
+        dataset_url = next((p["url"] for p in main["tree"] if p["path"] == "dataset"), None)
+        if dataset_url is None:
+            raise QSimBenchError(f"No dataset directory in {self.owner}/{self.repo}")
+        return _get_tree(dataset_url)["tree"], self.list_versions()
+
+    def tree_url(self, version: str) -> str:
+        """GitHub API URL of the tree of a (resolved) dataset version."""
+        for path in dataset_content:
+            if path["path"] == version:
+                return path["url"]
+        raise QSimBenchError(f"Version {version} doesn't exist")
+
+    def list_version(self, version: str) -> Tuple[Optional[str], List[Dict[str, Any]]]:
+        """
+        List a version with one recursive tree request.
+
+        Truncated listings (very large trees) fall back to walking the
+        directories one request at a time.
+        """
+        tree = _get_tree(f"{self.tree_url(version)}?recursive=1")
+        if not tree.get("truncated"):
+            return tree.get("sha"), [item for item in tree["tree"] if item.get("type") == "blob"]
+        logger.debug(f"Tree of version {version} is truncated, walking it instead")
+        files = []
+        pending = [("", self.tree_url(version))]
+        while pending:
+            prefix, url = pending.pop()
+            for item in _get_tree(url)["tree"]:
+                path = f"{prefix}{item['path']}"
+                if item.get("type") == "tree":
+                    pending.append((f"{path}/", item["url"]))
+                else:
+                    files.append({**item, "path": path})
+        return tree.get("sha"), files
+
+
+class _LocalStorage:
+    """
+    A dataset directory on a local or shared filesystem, read in place. A
+    clone of the dataset repository (holding ``dataset/``) works as well.
+    """
+
+    local = True
+    tree_shas = False
+
+    def __init__(self, root: Path) -> None:
+        root = root.expanduser().absolute()
+        if not (root / "versions.json").exists() and (root / "dataset").is_dir():
+            root = root / "dataset"
+        self.root = root
+        self.raw_url = root.as_uri()
+
+    def list_dataset(self) -> Tuple[List[Dict[str, Any]], List[str]]:
+        if not self.root.is_dir():
+            raise QSimBenchError(f"Dataset directory {self.root} doesn't exist")
+        try:
+            versions = json.loads((self.root / "versions.json").read_text())
+        except FileNotFoundError:
+            versions = sorted(
+                p.name for p in self.root.iterdir() if p.is_dir() and not p.name.startswith(".")
+            )
+        except (OSError, ValueError) as e:
+            raise QSimBenchError(f"Couldn't read the versions of {self.root}: {e}") from e
+        return [{"path": version, "type": "tree"} for version in versions], versions
+
+    def list_version(self, version: str) -> Tuple[Optional[str], List[Dict[str, Any]]]:
+        """List a version by walking its directory; file SHAs are revisions."""
+        top = self.root / version
+        if not top.is_dir():
+            raise QSimBenchError(f"Version {version} doesn't exist")
+        files = []
+        for dirpath, dirnames, filenames in os.walk(top):
+            dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+            for name in filenames:
+                if name.startswith(".") or name == _CATALOG_NAME:
+                    continue
+                path = Path(dirpath, name)
+                st = path.stat()
+                files.append({
+                    "path": path.relative_to(top).as_posix(),
+                    "sha": _file_revision(st),
+                    "size": st.st_size,
+                })
+        files.sort(key=lambda item: item["path"])  # the order of git trees
+        return None, files
+
+    def file_path(self, version: str, path: str) -> Path:
+        return self.root / version / path
+
+    def file_url(self, version: str, path: str) -> str:
+        return self.file_path(version, path).as_uri()
+
+    def revision(self, version: str, path: str) -> Optional[str]:
+        """Size and mtime of a file, or None if it is missing."""
+        try:
+            return _file_revision(self.file_path(version, path).stat())
+        except OSError:
+            return None
+
+
+_Storage = Union[_GitHubStorage, _MirrorStorage, _LocalStorage]
+
+
+def _make_storage(url: str) -> _Storage:
+    """The backend serving the dataset at `url` (a URL or a local path)."""
+    parsed = urlparse(url)
+    if parsed.scheme in ("http", "https"):
+        if parsed.netloc.lower() in ("github.com", "www.github.com"):
+            return _GitHubStorage(url)
+        return _MirrorStorage(url)
+    if parsed.scheme == "file":
+        from urllib.request import url2pathname
+
+        return _LocalStorage(Path(url2pathname(parsed.path)))
+    return _LocalStorage(Path(url))
+
+
+def _storage() -> _Storage:
+    """The backend of the configured dataset."""
+    _configure()
+    return STORAGE
+
+
+def _store_local_history(source: Path, cache_path: Path, revision: Optional[str]) -> _History:
+    """
+    Decode a history of a local dataset through a memory map and cache it.
+
+    Returns:
+        The decoded history (empty if the file does not exist).
+
+    Raises:
+        QSimBenchError: If the file cannot be read.
+    """
+    logger.debug(f"Reading data from {source}")
+    try:
+        buf = _map_file(source)
+    except FileNotFoundError:
+        return _History.from_records([])
+    except QSimBenchError:  # empty file
+        return _History.from_records([])
+    except OSError as e:
+        raise QSimBenchError(f"Couldn't read {source}: {e}") from e
+    with buf:
+        return _store_history(iter(buf.readline, b""), cache_path, sha=revision)
+
+
+# ---------------------------------------------------------------------------
+# Dataset catalog
+# ---------------------------------------------------------------------------
+# The listing of a version comes from its storage backend (one recursive tree
+# request on GitHub) and is persisted as CACHE_DIR/<version>/catalog.json,
+# keyed by the tree SHA that the dataset snapshot records for the version: it
+# stays valid (with no request at all) until the version directory actually
+# changes. Listings without a known tree SHA are only kept in memory.
+_CATALOG_NAME = "catalog.json"
+_ConfigKey = Tuple[str, str, int, str]  # (kind, algorithm, size, backend)
+
+
+def _parse_metadata_name(name: str) -> Optional[Tuple[str, int, str]]:
+    """Split ``{alg}_{size}_{backend}_{run}.json`` into its parts, or None."""
+    if not name.endswith(".json") or "_" not in name:
+        return None
+    return _parse_history_name(name[:-len(".json")].rsplit("_", 1)[0] + ".jsonl")
+
+
+class _Catalog:
+    """
+    Indexed listing of the files of one dataset version.
+
+    Configurations are the histories found under ``histories/<kind>/``;
+    metadata files are grouped by (algorithm, size, backend).
+    """
+
+    def __init__(self, sha: Optional[str], files: List[Dict[str, Any]]) -> None:
+        self.sha = sha
+        self.files = files
+        self.blobs: Dict[str, Optional[str]] = {f["path"]: f.get("sha") for f in files}
+        self.configs: List[_ConfigKey] = []
+        self.metadata: Dict[Tuple[str, int, str], List[str]] = {}
+        for item in files:
+            parts = item["path"].split("/")
+            if len(parts) == 3 and parts[0] == "histories":
+                parsed = _parse_history_name(parts[2])
+                if parsed is not None:
+                    self.configs.append((parts[1], *parsed))
+            elif len(parts) == 1 and parts[0] != "metadata.json":
+                parsed = _parse_metadata_name(parts[0])
+                if parsed is not None:
+                    self.metadata.setdefault(parsed, []).append(parts[0])
+
+        # Secondary indexes: field value -> positions in `configs`
+        self._by_field: List[Dict[Any, List[int]]] = [{}, {}, {}, {}]
+        for i, config in enumerate(self.configs):
+            for index, value in zip(self._by_field, config):
+                index.setdefault(value, []).append(i)
+        self._sizes = sorted(self._by_field[2])
+        self._views: Dict[Tuple[str, bool], Dict[str, Any]] = {}
+
+    def query(
+        self,
+        kinds: Optional[Iterable[str]] = None,
+        algorithms: Optional[Iterable[str]] = None,
+        sizes: Optional[Iterable[int]] = None,
+        backends: Optional[Iterable[str]] = None
+    ) -> List[_ConfigKey]:
+        """Configurations matching every given filter, in listing order."""
+        if isinstance(sizes, range) and sizes.step == 1:
+            # Contiguous range: bisect the sorted distinct sizes
+            lo = bisect_left(self._sizes, sizes.start)
+            hi = bisect_left(self._sizes, sizes.stop)
+            sizes = self._sizes[lo:hi]
+        selected: Optional[set] = None
+        for index, values in zip(self._by_field, (kinds, algorithms, sizes, backends)):
+            if values is None:
+                continue
+            hits = set()
+            for value in values:
+                hits.update(index.get(value, ()))
+            selected = hits if selected is None else selected & hits
+        if selected is None:
+            return list(self.configs)
+        return [self.configs[i] for i in sorted(selected)]
+
+    def index(self, kind: str, by_backend: bool) -> Dict[str, Any]:
+        """The nested `get_index` mapping for one circuit kind."""
+        view = self._views.get((kind, by_backend))
+        if view is None:
+            view = {}
+            for _, alg, size, be in self.query(kinds=[kind]):
+                if not by_backend:
+                    view.setdefault(alg, {}).setdefault(size, []).append(be)
+                else:
+                    view.setdefault(be, {}).setdefault(alg, []).append(size)
+            self._views[(kind, by_backend)] = view
+        return view
+
+
+_CATALOGS: Dict[str, _Catalog] = {}
+
+
+def _version_tree_sha(version: str) -> Optional[str]:
+    """Tree SHA of a dataset version, as listed in the dataset snapshot."""
+    for path in dataset_content or ():
+        if path["path"] == version:
+            return path.get("sha")
+    return None
+
+
+def _catalog_path(version: str) -> Path:
+    return _dataset_cache_dir() / version / _CATALOG_NAME
+
+
+def _stored_catalog(version: str) -> Optional[Dict[str, Any]]:
+    """The persisted catalog of `version`, whatever its age, or None."""
+    try:
+        stored = json.loads(_catalog_path(version).read_bytes())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(stored, dict) or stored.get("sha") is None:
+        return None
+    return stored
+
+
+def _load_catalog(version: str) -> Optional[_Catalog]:
+    """
+    The catalog of `version` from memory or disk, without any request.
+
+    A persisted catalog is used when its tree SHA matches the dataset
+    snapshot or, for backends without tree SHAs (mirrors), for
+    `CACHE_TIMEOUT` seconds after it was listed or revalidated. Otherwise,
+    only the catalog listed by this process is used.
+
+    Returns:
+        The catalog, or None if it is missing or outdated.
+    """
+    sha = _version_tree_sha(version)
+    catalog = _CATALOGS.get(version)
+    if catalog is not None and (sha is None or catalog.sha == sha):
+        return catalog
+    stored = _stored_catalog(version)
+    if stored is None:
+        return None
+    if sha is not None:
+        if stored["sha"] != sha:
+            return None
+    elif _storage().tree_shas:
+        return None
+    else:
+        try:
+            if time.time() - _catalog_path(version).stat().st_mtime >= CACHE_TIMEOUT:
+                return None
+        except OSError:
+            return None
+    catalog = _CATALOGS[version] = _Catalog(stored["sha"], stored["files"])
+    return catalog
+
+
+def _save_catalog(
+    version: str,
+    sha: Optional[str],
+    files: List[Dict[str, Any]],
+    etag: Optional[str] = None
+) -> _Catalog:
+    """
+    Build the catalog of `version` and persist it (when its SHA is known),
+    with the ETag of the listing it was read from.
+    """
+    files = [
+        {k: item[k] for k in ("path", "sha", "size") if k in item}
+        for item in files
+    ]
+    catalog = _CATALOGS[version] = _Catalog(sha, files)
+    if sha is not None:
+        path = _catalog_path(version)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        stored: Dict[str, Any] = {"sha": sha, "files": files}
+        if etag:
+            stored["etag"] = etag
+        _atomic_write_bytes(path, json.dumps(stored).encode())
+    return catalog
+
+
+def _catalog(version: str) -> _Catalog:
+    """
+    The catalog of a (resolved) dataset version, listed by the storage
+    backend when it is not already known. The expired catalog of a mirror
+    is revalidated with a conditional request on its ``catalog.json``.
+    """
+    catalog = _load_catalog(version)
+    if catalog is not None:
+        return catalog
+    storage = _storage()
+    if storage.local or storage.tree_shas:
+        sha, files = storage.list_version(version)
+        return _save_catalog(version, _version_tree_sha(version) or sha, files)
+    stored = _stored_catalog(version)
+    listing, etag = storage.get_catalog(version, stored.get("etag") if stored else None)
+    if listing is None:  # 304 Not Modified: valid for another CACHE_TIMEOUT
+        logger.debug(f"Catalog of version {version} revalidated")
+        try:
+            os.utime(_catalog_path(version))
+        except OSError:
+            pass
+        catalog = _CATALOGS[version] = _Catalog(stored["sha"], stored["files"])
+        return catalog
+    return _save_catalog(version, listing.get("sha"), listing["files"], etag)
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+def get_outcomes(
+    algorithm: str,
+    size: int,
+    backend: str,
+    shots: int = 1024,
+    circuit_kind: str = "circuit",
+    *,
+    exact: bool = True,
+    strategy: str = "sequential",
+    versions: Optional[List[str]] = None,
+    seed: Optional[int] = None,
+    force: bool = False,
+    engine: str = "auto",
+    exact_method: str = "multinomial",
+    int_keys: bool = False,
+    version_weights: Optional[List[float]] = None
+) -> Dict[Any, int]:
+    """
+    Sample outcome counts for a given algorithm/size/backend.
+
+    With several `versions`, each version's history is sampled in place (no
+    combined copy is built). The `random` strategy draws batches uniformly
+    from all versions together, or draws each version's share of the shots
+    from that version alone when `version_weights` is given. The
+    `sequential` strategy advances one cursor per version, splitting the
+    shots by `version_weights` or, by default, in proportion to the shots
+    each version holds.
+
+    Args:
+        algorithm: Algorithm name.
+        size: Problem size > 0.
+        backend: Backend name.
+        shots: Total shots to sample (>0).
+        circuit_kind: "circuit" or "mirror".
+        exact: If True, enforce exactly `shots` via multinomial.
+        strategy: "sequential" or "random".
+        versions: Dataset versions to sample from (default: latest).
+        seed: Optional int seed for reproducibility.
+        force: If True, refetch raw data ignoring cache.
+        engine: "python", "numpy" (requires NumPy) or "auto" to use NumPy
+            when installed. Both engines return the same counts.
+        exact_method: Down-sampling used when `exact` is True:
+            "multinomial", "hypergeometric" or "portable" (see
+            `_multinomial_sample`; "portable" costs time linear in `shots`).
+        int_keys: If True, key the result by the integer value of each
+            bitstring instead of the bitstring itself.
+        version_weights: Optional non-negative weight of each of `versions`,
+            giving the share of the shots sampled from it.
+
+    Returns:
+        Mapping from outcome bitstring (or its integer value) to count.
+
+    Raises:
+        QSimBenchError: On invalid args or sampling failures.
+    """
+    engine = _check_sampling_args(shots, strategy, engine, exact_method)
+    if versions is None:
+        versions = [_resolve_version(None)]
+    if not versions:
+        raise QSimBenchError("At least on version") 
+    weights = _check_version_weights(version_weights, versions)
+
+    view = _HistoryView([
+        _get_data(algorithm, size, backend, version, circuit_kind, force)
+        for version in versions
+    ])
+    cursor_keys = [
+        _cursor_key(algorithm, size, backend, circuit_kind, [version])
+        for version in versions
+    ]
+    return _sample(
+        view, cursor_keys, shots, exact, strategy, seed, engine, exact_method,
+        int_keys, weights,
+    )
+
+
+def iter_outcomes(
+    algorithm: str,
+    size: int,
+    backend: str,
+    circuit_kind: str = "circuit",
+    *,
+    chunk_shots: Optional[int] = None,
+    exact: bool = False,
+    strategy: str = "sequential",
+    versions: Optional[List[str]] = None,
+    seed: Optional[int] = None,
+    force: bool = False,
+    exact_method: str = "multinomial",
+    int_keys: bool = False
+) -> Iterator[Dict[Any, int]]:
+    """
+    Lazily stream outcome counts, one batch or one chunk of shots at a time.
+
+    Histories are read from the memory-mapped cache file (or the in-process
+    cache when already loaded), so memory stays constant however long the
+    stream runs. The stream never ends: sequential streams wrap around like
+    `get_outcomes` and advance its cursor as chunks are yielded (a stream
+    over several versions walks them in order with a cursor of its own),
+    random streams keep drawing batches. Use e.g. `itertools.islice` to
+    bound it.
+
+    Args:
+        algorithm: Algorithm name.
+        size: Problem size > 0.
+        backend: Backend name.
+        circuit_kind: "circuit" or "mirror".
+        chunk_shots: If None, yield each non-empty batch. Otherwise yield
+            the counts of consecutive batches covering at least this many shots.
+        exact: If True, down-sample each chunk to exactly `chunk_shots`.
+        strategy: "sequential" or "random".
+        versions: Dataset versions to stream from (default: latest).
+        seed: Optional int seed for reproducibility.
+        force: If True, refetch raw data ignoring cache.
+        exact_method: Down-sampling method used when `exact` is True.
+        int_keys: If True, key the chunks by the integer value of each
+            bitstring instead of the bitstring itself.
+
+    Returns:
+        An infinite iterator of mappings from outcome bitstring (or its
+        integer value) to count.
+
+    Raises:
+        QSimBenchError: On invalid args or if any of `versions` has no
+            records to sample.
+    """
+    if chunk_shots is not None and (not isinstance(chunk_shots, int) or chunk_shots <= 0):
+        raise QSimBenchError("Parameter 'chunk_shots' must be > 0.")
+    _check_sampling_args(chunk_shots or 1, strategy, "python", exact_method)
+    if versions is None:
+        versions = [_resolve_version(None)]
+    if not versions:
+        raise QSimBenchError("At least on version")
+
+    histories = []
+    for version in versions:
+        key, url, cache_path = _history_location(algorithm, size, backend, version, circuit_kind)
+        history = None if force else _HISTORY_CACHE.get(key)
+        if history is None:
+            history = _load_cached(cache_path, force, mapped=True)
+        if history is None:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            history = _download_and_cache(url, cache_path, force=force, key=key)
+            if len(history):
+                # Stream from a memory map of the entry just stored, not the decoded copy
+                history = _load_cached(cache_path, mapped=True, revalidated=True) or history
+        if not len(history):
+            raise QSimBenchError(f"No records available to sample in version {version}.")
+        histories.append(history)
+
+    view = _HistoryView(histories)
+    n = len(view)
+    if not any(view.part_shots()):
+        raise QSimBenchError("No shots available to sample.")
+
+    master_rng = random.Random(seed)
+    rng = random.Random(master_rng.randint(0, 2**32 - 1))
+    exact_rng = random.Random(master_rng.randint(0, 2**32 - 1))
+    cursor_key = _cursor_key(algorithm, size, backend, circuit_kind, versions)
+    target = chunk_shots or 1
+    keys = [view.outcome_key(h) for h in range(len(histories))]
+
+    def chunk(idx: int) -> Tuple[Tuple[Dict[Tuple[int, int], int], int], int]:
+        # Counts keyed by (history, outcome code), decoded once per chunk
+        agg: Dict[Tuple[int, int], int] = {}
+        total = 0
+        while total < target:
+            if strategy == "sequential":
+                if idx >= n:
+                    idx = 0
+                pos = idx
+                idx += 1
+            else:
+                pos = rng.randrange(n)
+            h, j = view.locate(pos)
+            history = histories[h]
+            s = history.shots[j]
+            if s <= 0:
+                continue
+            lo, hi = history.offsets[j], history.offsets[j + 1]
+            for code, cnt in zip(history.codes[lo:hi], history.counts[lo:hi]):
+                agg[h, code] = agg.get((h, code), 0) + cnt
+            total += s
+        return (agg, total), idx % n
+
+    def stream() -> Iterator[Dict[Any, int]]:
+        while True:
+            if strategy == "sequential":
+                agg, total = _cursors().claim(cursor_key, chunk)
+            else:
+                (agg, total), _ = chunk(0)
+            counts: Dict[Any, int] = {}
+            for (h, code), cnt in agg.items():
+                key = keys[h](code)
+                counts[key] = counts.get(key, 0) + cnt
+            if exact and chunk_shots is not None and total > chunk_shots:
+                start = _clock()
+                counts = _multinomial_sample(
+                    counts, chunk_shots, exact_rng.randint(0, 2**32 - 1), exact_method
+                )
+                if start:
+                    _record("exact_sample", start, exact_samples=1)
+            yield view.finalize(counts, int_keys)
+
+    return stream()
+
+
+_SPEC_KEYS = {
+    "algorithm", "size", "backend", "shots", "circuit_kind", "exact", "strategy",
+    "versions", "seed", "force", "engine", "exact_method", "int_keys",
+    "version_weights",
+}
+
+
+def get_outcomes_many(
+    specs: Iterable[Dict[str, Any]],
+    *,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    ordered: bool = True
+) -> Union[List[Dict[Any, int]], Iterator[Tuple[int, Dict[Any, int]]]]:
+    """
+    Sample outcome counts for many configurations, fetching their histories
+    concurrently.
+
+    Each spec holds keyword arguments of `get_outcomes` (algorithm, size and
+    backend are required). Histories shared by several specs are fetched
+    once, through a pool of at most `max_workers` threads; sampling then
+    follows the usual per-spec exact/strategy semantics.
+
+    Args:
+        specs: Request specs, one mapping per result.
+        max_workers: Maximum number of concurrent downloads.
+        ordered: If True, return results in spec order. If False, yield
+            ``(index, counts)`` pairs as soon as each spec's histories are
+            available; sequential cursors then advance in that order.
+
+    Returns:
+        A list of counts, or an iterator of ``(index, counts)`` pairs.
+
+    Raises:
+        QSimBenchError: On invalid specs or fetch/sampling failures.
+    """
+    specs = [dict(spec) for spec in specs]
+    if not isinstance(max_workers, int) or max_workers <= 0:
+        raise QSimBenchError("max_workers must be a positive integer.")
+
+    # Resolve the histories each spec needs, de-duplicated across specs
+    spec_keys: List[List[_HistoryKey]] = []
+    fetches: Dict[_HistoryKey, bool] = {}
+    for spec in specs:
+        unknown = set(spec) - _SPEC_KEYS
+        if unknown:
+            raise QSimBenchError(f"Unknown spec keys: {sorted(unknown)}")
+        if not all(spec.get(k) for k in ("algorithm", "size", "backend")):
+            raise QSimBenchError("Each spec needs algorithm, size and backend.")
+        if spec.get("versions") is None:
+            spec["versions"] = [_resolve_version(None)]
+        kind = spec.get("circuit_kind", "circuit").lower()
+        keys = [
+            (version, kind, spec["algorithm"].lower(), spec["size"], spec["backend"].lower())
+            for version in spec["versions"]
+        ]
+        force = spec.pop("force", False)
+        for key in keys:
+            fetches[key] = fetches.get(key, False) or force
+        spec_keys.append(keys)
+
+    def fetch(key: _HistoryKey) -> None:
+        version, kind, alg, size, be = key
+        _get_data(alg, size, be, version, kind, fetches[key])
+
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="qsimbench")
+    futures = {key: executor.submit(fetch, key) for key in fetches}
+
+    def sample(i: int) -> Dict[Any, int]:
+        for key in spec_keys[i]:
+            futures[key].result()
+        return get_outcomes(**specs[i])
+
+    if ordered:
+        try:
+            return [sample(i) for i in range(len(specs))]
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def completed() -> Iterator[Tuple[int, Dict[Any, int]]]:
+        try:
+            waiting: Dict[_HistoryKey, List[int]] = {}
+            missing = []
+            for i, keys in enumerate(spec_keys):
+                missing.append(len(set(keys)))
+                for key in set(keys):
+                    waiting.setdefault(key, []).append(i)
+            for i, left in enumerate(missing):
+                if not left:
+                    yield i, sample(i)
+            owners = {future: key for key, future in futures.items()}
+            for future in as_completed(owners):
+                for i in waiting[owners[future]]:
+                    missing[i] -= 1
+                    if missing[i] == 0:
+                        yield i, sample(i)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    return completed()
+
+
+def get_distribution(
+    algorithm: str,
+    size: int,
+    backend: str,
+    circuit_kind: str = "circuit",
+    *,
+    versions: Optional[List[str]] = None,
+    normalize: bool = False,
+    force: bool = False,
+    int_keys: bool = False
+) -> Dict[Any, Union[int, float]]:
+    """
+    Empirical distribution of a configuration over every batch of its history.
+
+    The counts are computed once per history and cached next to it, so
+    later calls neither load the history nor loop over its batches.
+
+    Args:
+        algorithm: Algorithm name.
+        size: Problem size > 0.
+        backend: Backend name.
+        circuit_kind: "circuit" or "mirror".
+        versions: Dataset versions to sum over (default: latest).
+        normalize: If True, return probabilities summing to 1 instead of
+            counts.
+        force: If True, refetch raw data ignoring cache.
+        int_keys: If True, key the result by the integer value of each
+            bitstring instead of the bitstring itself.
+
+    Returns:
+        Mapping from outcome bitstring (or its integer value) to its total
+        count, or to its probability when `normalize` is True.
+
+    Raises:
+        QSimBenchError: On invalid args, missing data, or integer keys
+            requested for outcomes that are not plain bitstrings.
+    """
+    if versions is None:
+        versions = [_resolve_version(None)]
+    if not versions:
+        raise QSimBenchError("At least one version is required")
+
+    totals: Dict[str, int] = {}
+    for version in versions:
+        counts = _get_distribution(algorithm, size, backend, version, circuit_kind, force)
+        if len(versions) == 1:
+            totals = dict(counts)
+            break
+        for outcome, cnt in counts.items():
+            totals[outcome] = totals.get(outcome, 0) + cnt
+
+    if int_keys:
+        try:
+            totals = {int(outcome, 2): cnt for outcome, cnt in totals.items()}
+        except ValueError:
+            raise QSimBenchError("Outcomes of this history are not plain bitstrings.") from None
+    if normalize:
+        shots = sum(totals.values())
+        return {outcome: cnt / shots for outcome, cnt in totals.items()}
+    return totals
+
+
+def get_replicates(
+    algorithm: str,
+    size: int,
+    backend: str,
+    shots: int = 1024,
+    replicates: int = 1000,
+    circuit_kind: str = "circuit",
+    *,
+    exact: bool = True,
+    versions: Optional[List[str]] = None,
+    seed: Optional[int] = None,
+    force: bool = False,
+    exact_method: str = "multinomial",
+    int_keys: bool = False
+) -> Tuple[List[Any], Any]:
+    """
+    Draw many independent random samples of a configuration in one pass,
+    e.g. for bootstrap confidence intervals (requires NumPy).
+
+    Each replicate is sampled like `get_outcomes` with the `random`
+    strategy: batches drawn uniformly with replacement (from all `versions`
+    together) until `shots` is reached, then down-sampled when `exact`.
+    Replicate ``r`` is derived from the ``r``-th child of
+    ``numpy.random.SeedSequence(seed)``, so it is the same for a given seed
+    whatever the number of replicates. The draws differ from those of
+    `get_outcomes`, which uses the standard-library generator.
+
+    Args:
+        algorithm: Algorithm name.
+        size: Problem size > 0.
+        backend: Backend name.
+        shots: Shots per replicate (>0).
+        replicates: Number of replicates (>0).
+        circuit_kind: "circuit" or "mirror".
+        exact: If True, enforce exactly `shots` in every replicate.
+        versions: Dataset versions to sample from (default: latest).
+        seed: Optional master seed for reproducibility.
+        force: If True, refetch raw data ignoring cache.
+        exact_method: "multinomial" or "hypergeometric" (see
+            `_multinomial_sample`).
+        int_keys: If True, label the outcomes by the integer value of each
+            bitstring instead of the bitstring itself.
+
+    Returns:
+        (outcomes, counts): the labels, in sorted order, of the outcomes
+        counted in at least one replicate, and a
+        ``replicates x len(outcomes)`` int64 NumPy array whose row ``r``
+        holds the counts of replicate ``r``.
+
+    Raises:
+        QSimBenchError: On invalid args, missing NumPy or sampling failures.
+    """
+    _require_numpy("Replicate sampling")
+    _check_sampling_args(shots, "random", "numpy", exact_method)
+    if not isinstance(replicates, int) or replicates <= 0:
+        raise QSimBenchError("Parameter 'replicates' must be > 0.")
+    if exact_method == "portable":
+        raise QSimBenchError("exact_method must be 'multinomial' or 'hypergeometric' for replicates.")
+    if versions is None:
+        versions = [_resolve_version(None)]
+    if not versions:
+        raise QSimBenchError("At least one version is required")
+
+    view = _HistoryView([
+        _get_data(algorithm, size, backend, version, circuit_kind, force)
+        for version in versions
+    ])
+    outcomes, matrix = _sample_replicates(view, shots, replicates, seed, exact, exact_method)
+    if not view.packed:
+        if int_keys:
+            raise QSimBenchError("Outcomes of this history are not plain bitstrings.")
+    elif not int_keys:
+        spec = f"0{view.width}b"
+        outcomes = [format(value, spec) for value in outcomes]
+    return outcomes, matrix
+
+
+def get_window_stats(
+    algorithm: str,
+    size: int,
+    backend: str,
+    window: int = 100,
+    circuit_kind: str = "circuit",
+    *,
+    step: Optional[int] = None,
+    version: Optional[str] = None,
+    target: Optional[Union[str, int]] = None,
+    force: bool = False
+) -> Dict[str, Any]:
+    """
+    Per-window metrics over the ordered batches of a history, i.e. the
+    stream that the `sequential` strategy walks (requires NumPy).
+
+    Windows hold `window` consecutive batches and start every `step`
+    batches (non-overlapping by default; a smaller step gives rolling
+    windows). Each window is derived from the previous one through the
+    batches entering and leaving it (see `_History.window_stats`). Results
+    are stored next to the cache entry, so repeated calls with the same
+    arguments, from any process, read them back without loading the
+    history while the entry is fresh.
+
+    Args:
+        algorithm: Algorithm name.
+        size: Problem size > 0.
+        backend: Backend name.
+        window: Batches per window (>0).
+        circuit_kind: "circuit" or "mirror".
+        step: Batches between consecutive window starts (>0, default:
+            `window`).
+        version: Dataset version (default: latest).
+        target: Outcome whose probability is reported as
+            "success_probability", as a bitstring or its integer value
+            (default: the most frequent outcome of the whole history).
+        force: If True, refetch raw data ignoring cache.
+
+    Returns:
+        A dict with "target" (the tracked bitstring) and read-only float64
+        NumPy arrays with one value per window: "start" (index of its first
+        batch), "shots", "entropy" (Shannon entropy in bits),
+        "success_probability" (of `target`), "tvd" and "hellinger" (total
+        variation and Hellinger distance to the previous window; NaN for
+        the first window). Metrics of windows without shots are NaN.
+
+    Raises:
+        QSimBenchError: On invalid args, missing NumPy or data, or a
+            `target` that never occurs in the history.
+    """
+    _require_numpy("Window statistics")
+    if not isinstance(window, int) or window <= 0:
+        raise QSimBenchError("Parameter 'window' must be > 0.")
+    if step is None:
+        step = window
+    if not isinstance(step, int) or step <= 0:
+        raise QSimBenchError("Parameter 'step' must be > 0.")
+
+    version = _resolve_version(version)
+    _, _, cache_path = _history_location(algorithm, size, backend, version, circuit_kind)
+    if not force:
+        stored = _load_window_stats(cache_path, window, step, target)
+        if stored is not None:
+            return stored
+
+    history = _get_data(algorithm, size, backend, version, circuit_kind, force)
+    if not len(history):
+        raise QSimBenchError("No records available to sample.")
+    if history.labels is None:
+        values, spec = history.values, f"0{history.width}b"
+        label: Callable[[int], str] = lambda code: format(values[code], spec)
+    else:
+        label = history.labels.__getitem__
+
+    totals = history.totals()
+    if target is None:
+        code = max(totals, key=totals.__getitem__)
+    else:
+        if isinstance(target, int) and history.labels is None:
+            target = format(target, f"0{history.width}b")
+        code = next((c for c in totals if label(c) == target), None)
+        if code is None:
+            raise QSimBenchError(f"Outcome {target!r} never occurs in this history.")
+
+    start = _clock()
+    stats = {"target": label(code), **history.window_stats(window, step, code)}
+    if start:
+        _record("aggregate", start, batches_aggregated=len(history))
+    _save_window_stats(cache_path, window, step, target, stats)
+    return stats
+
+
+def prefetch(
+    version: Optional[str] = None,
+    *,
+    kinds: Iterable[str] = ("circuit", "mirror"),
+    algorithms: Optional[Iterable[str]] = None,
+    sizes: Optional[Iterable[int]] = None,
+    backends: Optional[Iterable[str]] = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    force: bool = False,
+    progress: Optional[Callable[[Dict[str, Any]], None]] = None
+) -> Dict[str, Any]:
+    """
+    Mirror the histories of a dataset version into the local cache.
+
+    The version catalog is listed once, then matching histories are downloaded
+    by a pool of `max_workers` threads. Interrupted downloads resume from
+    their partial file via HTTP Range requests, every file is verified
+    against its git blob SHA, and entries already cached from the same
+    blob are skipped (and revalidated if expired). From a local dataset
+    directory, histories are converted from memory maps instead.
+
+    Args:
+        version: Dataset version (default: latest).
+        kinds: Circuit kinds to fetch.
+        algorithms: Algorithms to fetch (default: all).
+        sizes: Sizes to fetch (default: all).
+        backends: Backends to fetch (default: all).
+        max_workers: Maximum number of concurrent downloads.
+        force: If True, refetch files that are already cached.
+        progress: Optional callback receiving a dict with ``done``,
+            ``total``, ``bytes``, ``elapsed``, ``rate`` (bytes/s) and
+            ``path`` after each file.
+
+    Returns:
+        Summary with ``files``, ``downloaded``, ``skipped``, ``failed``
+        (path → error), ``bytes``, ``elapsed`` and ``rate``.
+
+    Raises:
+        QSimBenchError: On invalid arguments or if the tree cannot be listed.
+    """
+    version = _resolve_version(version)
+    if not isinstance(max_workers, int) or max_workers <= 0:
+        raise QSimBenchError("max_workers must be a positive integer.")
+    kinds = {k.lower() for k in kinds}
+    if not kinds <= {"circuit", "mirror"}:
+        raise QSimBenchError("circuit_kind must be 'circuit' or 'mirror'.")
+    algorithms = None if algorithms is None else {a.lower() for a in algorithms}
+    backends = None if backends is None else {b.lower() for b in backends}
+
+    storage = _storage()
+    catalog = _catalog(version)
+    jobs = []
+    for kind, alg, size, be in catalog.query(kinds, algorithms, sizes, backends):
+        path = _history_path(kind, alg, size, be)
+        item = {"path": path, "sha": catalog.blobs[path]}
+        jobs.append((item, *_history_location(alg, size, be, version, kind)))
+
+    lock = threading.Lock()
+    summary: Dict[str, Any] = {
+        "files": len(jobs), "downloaded": 0, "skipped": 0, "failed": {}, "bytes": 0,
+    }
+    started = time.monotonic()
+
+    def fetch(job) -> None:
+        with _file_lock(job[3]):
+            fetch_locked(job)
+
+    def fetch_locked(job) -> None:
+        item, key, url, cache_path = job
+        sha = item.get("sha")
+        header = None if force else _read_header(cache_path)
+        if header is not None:
+            same_blob = bool(sha) and header.get("sha") == sha
+            fresh = same_blob or (not sha and time.time() - cache_path.stat().st_mtime < CACHE_TIMEOUT)
+            # The header alone does not prove the body is complete: decode
+            # the entry (removing it if unreadable) before skipping it.
+            if fresh and _load_cached(cache_path, mapped=True, revalidated=True) is not None:
+                if same_blob:
+                    os.utime(cache_path)  # revalidated
+                # Leftover of a download interrupted after the entry was written
+                _part_path(cache_path).unlink(missing_ok=True)
+                with lock:
+                    summary["skipped"] += 1
+                return
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        if storage.local:
+            source = storage.file_path(version, item["path"])
+            _store_local_history(source, cache_path, sha)
+            transferred = source.stat().st_size
+        else:
+            part_path = _part_path(cache_path)
+            if force:
+                part_path.unlink(missing_ok=True)
+            transferred, etag = _download_resumable(url, part_path, sha)
+            _store_history_file(part_path, cache_path, sha=sha, etag=etag)
+        _HISTORY_CACHE.invalidate(key)
+        with lock:
+            summary["downloaded"] += 1
+            summary["bytes"] += transferred
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="qsimbench") as executor:
+        futures = {executor.submit(fetch, job): job for job in jobs}
+        for done, future in enumerate(as_completed(futures), start=1):
+            path = futures[future][0]["path"]
+            try:
+                future.result()
+            except (QSimBenchError, OSError, ValueError) as e:
+                logger.warning(f"Failed to prefetch {path}: {e}")
+                summary["failed"][path] = str(e)
+            if progress is not None:
+                elapsed = time.monotonic() - started
+                progress({
+                    "done": done,
+                    "total": len(jobs),
+                    "bytes": summary["bytes"],
+                    "elapsed": elapsed,
+                    "rate": summary["bytes"] / elapsed if elapsed > 0 else 0.0,
+                    "path": path,
+                })
+
+    summary["elapsed"] = time.monotonic() - started
+    summary["rate"] = summary["bytes"] / summary["elapsed"] if summary["elapsed"] > 0 else 0.0
+    return summary
+
+
+def index_dataset(path: Union[str, Path]) -> Dict[str, int]:
+    """
+    Write the ``catalog.json`` listing of every version of a local dataset
+    directory (and its ``versions.json`` if missing), so that the directory
+    can be served as a static HTTP mirror.
+
+    Files are listed with their git blob SHAs, which lets clients verify
+    downloads and revalidate cached histories without downloading them.
+
+    Args:
+        path: The dataset directory, or a clone of the dataset repository.
+
+    Returns:
+        Number of files listed per version.
+
+    Raises:
+        QSimBenchError: If the directory or one of its versions is missing.
+    """
+    storage = _LocalStorage(Path(path))
+    _, versions = storage.list_dataset()
+    if not (storage.root / "versions.json").exists():
+        _atomic_write_bytes(storage.root / "versions.json", json.dumps(versions).encode())
+    listed = {}
+    for version in versions:
+        _, files = storage.list_version(version)
+        for item in files:
+            item["sha"] = _git_blob_sha(storage.file_path(version, item["path"]))
+        sha = hashlib.sha1(json.dumps(files).encode()).hexdigest()
+        _atomic_write_bytes(
+            storage.file_path(version, _CATALOG_NAME),
+            json.dumps({"sha": sha, "files": files}).encode(),
+        )
+        listed[version] = len(files)
+    return listed
+
+
+def get_index(
+    circuit_kind: str = "circuit",
+    by_backend: bool = False,
+    version: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    List available algorithms, sizes, and backends in the dataset.
+
+    Served from the persistent version catalog, so only the first call for
+    a version (on any process sharing the cache) makes a network request.
+
+    Args:
+        circuit_kind: "circuit" or "mirror".
+        by_backend: If True, invert mapping to backend→algorithm→sizes.
+        version: Dataset version (default: latest).
+
+    Returns:
+        Nested dict of available items.
+
+    Raises:
+        QSimBenchError: On URL parsing or HTTP errors.
+    """
+    kind = circuit_kind.lower()
+    if kind not in {"circuit", "mirror"}:
+        raise QSimBenchError("circuit_kind must be 'circuit' or 'mirror'.")
     
-    try:
-        resp = _SESSION.get(version_url, timeout=1)
-        resp.raise_for_status()
-    except requests.HTTPError as e:
-        raise QSimBenchError(f"GitHub API error: {e}") from e
-    except requests.ConnectionError as e:
-        raise QSimBenchError(f"Couldn't connect to the dataset: {e}")
+    version = _resolve_version(version)
 
-    files = [
-        item["path"]
-        for item in resp.json()["tree"]
-        if item.get("path", "").startswith(f"{algorithm}_{size}_{backend}")
+    return _catalog(version).index(kind, by_backend)
+
+
+def find_configurations(
+    algorithms: Optional[Union[str, Iterable[str]]] = None,
+    sizes: Optional[Union[int, Iterable[int]]] = None,
+    backends: Optional[Union[str, Iterable[str]]] = None,
+    circuit_kind: Optional[str] = None,
+    version: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Query the configurations of a dataset version.
+
+    Every filter is optional; the given ones must all match. Results are
+    served from the persistent version catalog.
+
+    Args:
+        algorithms: Algorithm name or names.
+        sizes: Size, collection of sizes or a ``range`` (e.g. ``range(4, 9)``).
+        backends: Backend name or names.
+        circuit_kind: "circuit" or "mirror" (default: both).
+        version: Dataset version (default: latest).
+
+    Returns:
+        One dict per configuration with ``algorithm``, ``size``, ``backend``
+        and ``circuit_kind``, ready to be used as a `get_outcomes_many` spec.
+
+    Raises:
+        QSimBenchError: On invalid arguments or HTTP errors.
+    """
+    kinds = None
+    if circuit_kind is not None:
+        kinds = [circuit_kind.lower()]
+        if kinds[0] not in {"circuit", "mirror"}:
+            raise QSimBenchError("circuit_kind must be 'circuit' or 'mirror'.")
+    if isinstance(algorithms, str):
+        algorithms = [algorithms]
+    if isinstance(backends, str):
+        backends = [backends]
+    if isinstance(sizes, int):
+        sizes = [sizes]
+
+    version = _resolve_version(version)
+    configs = _catalog(version).query(
+        kinds,
+        None if algorithms is None else [a.lower() for a in algorithms],
+        sizes,
+        None if backends is None else [b.lower() for b in backends],
+    )
+    return [
+        {"algorithm": alg, "size": size, "backend": be, "circuit_kind": kind}
+        for kind, alg, size, be in configs
     ]
-    if not files:
-        raise QSimBenchError(
-            f"No metadata files for {algorithm}_{size}_{backend} for version {version}"
-        )
+
+
+def get_metadata(
+    algorithm: str,
+    size: int,
+    backend: str,
+    version: Optional[str] = None
+) -> List[Any]:
+    """
+    Fetch metadata JSON files for a given algorithm/size/backend/version.
+
+    Files are looked up in the version catalog, downloaded concurrently
+    when a configuration has several, and kept in the versioned cache, so
+    later calls (from any process) are served from disk. Every call
+    returns newly parsed objects, which callers may modify.
+
+    Args:
+        algorithm: Algorithm name.
+        size: Problem size.
+        backend: Backend name.
+        version: Dataset version (default: latest).
+
+    Returns:
+        List of parsed JSON metadata objects.
+
+    Raises:
+        QSimBenchError: On lookup or HTTP errors.
+    """
+
+    version = _resolve_version(version)
+
+    catalog = _catalog(version)
+    files = _metadata_files(catalog, algorithm, size, backend, version)
+
+    if len(files) == 1:
+        texts = [_metadata_text(version, files[0], catalog.blobs.get(files[0]))]
+    else:
+        with ThreadPoolExecutor(
+            max_workers=min(DEFAULT_MAX_WORKERS, len(files)), thread_name_prefix="qsimbench"
+        ) as executor:
+            texts = list(executor.map(
+                lambda fname: _metadata_text(version, fname, catalog.blobs.get(fname)), files
+            ))
 
     metadata: List[Any] = []
-    for fname in files:
-        raw_url = f"{RAW_URL}/{version}/{fname}"
-        try:
-            r = _SESSION.get(raw_url, timeout=1)
-            r.raise_for_status()
-        except requests.HTTPError as e:
-            raise QSimBenchError(f"Error fetching {raw_url}: {e}") from e
-        except requests.ConnectionError as e:
-            raise QSimBenchError(f"Couldn't connect to the dataset: {e}")
-        try:
-            metadata.append(r.json())  # try full parse
-        except json.JSONDecodeError:
-            for line in r.text.strip().splitlines():
-                metadata.append(json.loads(line))
+    for text in texts:
+        metadata.extend(_parse_metadata(text))
 
     return metadata
 
-@lru_cache
 def get_version_metadata(
-    version: str = latest
+    version: Optional[str] = None
 ) -> Dict[str, Any]:
     
-    if version not in versions_list:
-        raise QSimBenchError(f"Version {version} doesn't exist")
-    
-    try:
-        resp=_SESSION.get(f"{RAW_URL}/{version}/metadata.json", timeout=1)
-        resp.raise_for_status()
-    except requests.HTTPError as e:
-        raise QSimBenchError(f"Error fetching {f"{RAW_URL}/{version}/metadata.json"}: {e}") from e
-    except requests.ConnectionError as e:
-        raise QSimBenchError(f"Couldn't connect to the dataset: {e}")
+    version = _resolve_version(version)
     
-    return json.loads(resp.text)
+    sha = _catalog(version).blobs.get("metadata.json")
+    return json.loads(_metadata_text(version, "metadata.json", sha))
+
+def memory_cache_info() -> Dict[str, int]:
+    """
+    Statistics of the in-process history cache.
+
+    Returns:
+        Mapping with hit/miss/eviction counters, number of cached entries,
+        their total bytes and the configured budget.
+    """
+    return _HISTORY_CACHE.info()
+
+def clear_memory_cache() -> None:
+    """Drop every decoded history held in memory."""
+    _HISTORY_CACHE.clear()
+
+def reset_cursors() -> None:
+    """Rewind every sequential stream of the current cursor store to batch 0."""
+    _cursors().reset()
+
+def stats() -> Dict[str, Any]:
+    """
+    Return the statistics collected since the last `reset_stats`.
+
+    Returns:
+        A dict with "enabled", "phases" (per phase: "calls" and cumulative
+        "seconds") and "counters" (requests, bytes, cache hits and misses,
+        records parsed, batches aggregated, exact samples).
+    """
+    _configure()
+    return _STATS.snapshot()
+
+def reset_stats() -> None:
+    """Zero every phase timer and counter."""
+    _STATS.reset()
+
+def pin(
+    algorithm: str,
+    size: int,
+    backend: str,
+    circuit_kind: str = "circuit",
+    version: Optional[str] = None
+) -> None:
+    """
+    Protect the cached history of a configuration from quota eviction.
+
+    The pin persists on disk and applies to the entry whether or not it has
+    been downloaded yet.
+
+    Args:
+        algorithm: Algorithm name.
+        size: Problem size.
+        backend: Backend name.
+        circuit_kind: "circuit" or "mirror".
+        version: Dataset version (default: latest).
+
+    Raises:
+        QSimBenchError: On invalid parameters or unknown version.
+    """
+    version = _resolve_version(version)
+    _, _, cache_path = _history_location(algorithm, size, backend, version, circuit_kind)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    _pin_path(cache_path).touch()
+
+def unpin(
+    algorithm: str,
+    size: int,
+    backend: str,
+    circuit_kind: str = "circuit",
+    version: Optional[str] = None
+) -> None:
+    """Undo `pin` for a configuration (same arguments)."""
+    version = _resolve_version(version)
+    _, _, cache_path = _history_location(algorithm, size, backend, version, circuit_kind)
+    _pin_path(cache_path).unlink(missing_ok=True)
+
+def disk_cache_info() -> Dict[str, Any]:
+    """
+    Statistics of the on-disk history cache.
+
+    Returns:
+        Mapping with the number of cached histories, the bytes held by the
+        cache (every file counts towards the quota), the number of pinned
+        entries, the quota and the compression method.
+    """
+    _configure()
+    total, histories = _DISK_USAGE.snapshot(rescan=True)
+    return {
+        "entries": len(histories),
+        "bytes": total,
+        "pinned": sum(_pin_path(path).exists() for path, _, _ in histories),
+        "quota": CACHE_QUOTA,
+        "compression": CACHE_COMPRESSION,
+    }
 
 def get_versions() -> List[str]:
+    _ensure_dataset()
     return versions_list
\ No newline at end of file
@@ -0,0 +1,141 @@
+"""
+Shared fixtures: a small deterministic dataset, served either from a local
+directory or by the fake GitHub of the benchmarks, and a fresh library
+state (configuration, caches and cursors) for every test.
+"""
+
+import json
+import random
+import shutil
+from collections import OrderedDict
+from pathlib import Path
+
+import pytest
+
+from benchmarks.fake_dataset import RAW_URL, FakeGitHubAdapter
+
+SHOTS_PER_BATCH = 10
+
+# (version, algorithm, size, outcomes, batches). The two versions of
+# ghz_4_fake_fez have disjoint outcomes, so the version an outcome was drawn
+# from is known; reg_3_fake_fez has register-separated outcomes, which
+# cannot be packed into integers.
+HISTORIES = [
+    ("v1", "ghz", 4, ["0000", "1111", "0101"], 200),
+    ("v2", "ghz", 4, ["0011", "1100"], 120),
+    ("v1", "qft", 5, [format(i, "05b") for i in range(32)], 150),
+    ("v2", "qft", 5, [format(i, "05b") for i in range(32)], 90),
+    ("v1", "reg", 3, ["00 1", "11 0", "01 1"], 60),
+]
+BACKEND = "fake_fez"
+
+
+def _history_lines(version, algorithm, outcomes, batches):
+    rng = random.Random(f"{version}-{algorithm}")
+    for i in range(batches):
+        if i % 25 == 7:  # batches without shots are skipped by sampling
+            yield json.dumps({"shots": 0, "data": {}}) + "\n"
+            continue
+        counts = {}
+        for _ in range(SHOTS_PER_BATCH):
+            outcome = rng.choice(outcomes)
+            counts[outcome] = counts.get(outcome, 0) + 1
+        yield json.dumps({"shots": SHOTS_PER_BATCH, "data": counts}) + "\n"
+
+
+@pytest.fixture(scope="session")
+def dataset(tmp_path_factory) -> Path:
+    """Directory of the test dataset, laid out like the dataset repository."""
+    root = tmp_path_factory.mktemp("dataset")
+    (root / "versions.json").write_text(json.dumps(["v1", "v2"]))
+    for version, algorithm, size, outcomes, batches in HISTORIES:
+        directory = root / version / "histories" / "circuit"
+        directory.mkdir(parents=True, exist_ok=True)
+        name = f"{algorithm}_{size}_{BACKEND}"
+        with open(directory / f"{name}.jsonl", "w") as f:
+            f.writelines(_history_lines(version, algorithm, outcomes, batches))
+        (root / version / f"{name}_0.json").write_text(json.dumps(
+            {"algorithm": algorithm, "size": size, "backend": BACKEND}
+        ))
+    for version in ("v1", "v2"):
+        (root / version / "metadata.json").write_text(json.dumps({"version": version}))
+    return root
+
+
+@pytest.fixture
+def qsb(tmp_path, monkeypatch):
+    """The library module, configured from scratch with an empty cache."""
+    import qsimbench.qsimbench as qsb
+
+    monkeypatch.chdir(tmp_path)
+    for name in ("QSIMBENCH_DATASET", "GITHUB_TOKEN", "QSIMBENCH_CURSOR_STORE", "QSIMBENCH_STATS"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("QSIMBENCH_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(qsb, "_CONFIGURED", False)
+    monkeypatch.setattr(qsb, "versions_list", [])
+    monkeypatch.setattr(qsb, "dataset_content", None)
+    monkeypatch.setattr(qsb, "latest", "")
+    qsb._configure()
+    session = qsb._session()
+    monkeypatch.setattr(session, "adapters", OrderedDict(session.adapters))
+    qsb.clear_memory_cache()
+    qsb.reset_cursors()
+    qsb.reset_stats()
+    qsb._CATALOGS.clear()
+    yield qsb
+    qsb.clear_memory_cache()
+    qsb.reset_cursors()
+    qsb._CATALOGS.clear()
+
+
+@pytest.fixture
+def local(qsb, dataset):
+    """The library reading the test dataset from its directory."""
+    qsb.set_dataset_url(str(dataset))
+    return qsb
+
+
+class RecordingAdapter(FakeGitHubAdapter):
+    """Fake GitHub that logs the (url, status) of every request."""
+
+    def __init__(self, root: Path) -> None:
+        super().__init__(root)
+        self.log = []
+
+    def send(self, request, **kwargs):
+        resp = super().send(request, **kwargs)
+        self.log.append((request.url, resp.status_code))
+        return resp
+
+    def downloads(self, name: str):
+        """Statuses of the requests for the raw file `name`."""
+        return [status for url, status in self.log if "/dataset/" in url and url.endswith(name)]
+
+
+@pytest.fixture
+def github(qsb, dataset):
+    """The fake GitHub serving the test dataset to the library."""
+    adapter = RecordingAdapter(dataset)
+    for prefix in ("https://api.github.com/", "https://raw.githubusercontent.com/"):
+        qsb._session().mount(prefix, adapter)
+    return adapter
+
+
+@pytest.fixture(scope="session")
+def mirror_dataset(dataset, tmp_path_factory) -> Path:
+    """A copy of the test dataset indexed with catalogs, as published on a mirror."""
+    import qsimbench.qsimbench as qsb
+
+    root = tmp_path_factory.mktemp("mirror") / "dataset"
+    shutil.copytree(dataset, root)
+    qsb.index_dataset(root)
+    return root
+
+
+@pytest.fixture
+def mirror(qsb, mirror_dataset):
+    """A static HTTP mirror of the test dataset, configured as the dataset URL."""
+    adapter = RecordingAdapter(mirror_dataset)
+    qsb._session().mount(RAW_URL, adapter)
+    qsb.set_dataset_url(RAW_URL)
+    return adapter
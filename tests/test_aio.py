@@ -0,0 +1,85 @@
+"""Concurrent async callers share one fetch, and cancellation keeps the entry locked."""
+
+import asyncio
+import fcntl
+import threading
+
+import pytest
+
+pytest.importorskip("httpx")
+
+from qsimbench import aio  # noqa: E402
+
+ARGS = ("ghz", 4, "fake_fez", 50)
+
+
+@pytest.fixture
+def slow_fetch(local, monkeypatch):
+    """Make the local fetch of a history wait for `release`, counting calls."""
+    fetch = local._fetch_history
+    state = {"calls": 0, "started": threading.Event(), "release": threading.Event()}
+
+    def blocked(*args):
+        state["calls"] += 1
+        state["started"].set()
+        assert state["release"].wait(10)
+        return fetch(*args)
+
+    monkeypatch.setattr(local, "_fetch_history", blocked)
+    return state
+
+
+def _is_locked(qsb):
+    path = qsb._lock_path(qsb._history_location("ghz", 4, "fake_fez", "v1")[2])
+    with open(path, "a+b") as handle:
+        try:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return True
+        fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+        return False
+
+
+def test_concurrent_callers_share_one_fetch(local, slow_fetch):
+    async def main():
+        callers = [
+            asyncio.ensure_future(aio.aget_outcomes(*ARGS, versions=["v1"], seed=i))
+            for i in range(5)
+        ]
+        await asyncio.to_thread(slow_fetch["started"].wait, 10)
+        callers[0].cancel()  # the others keep waiting on the shared fetch
+        slow_fetch["release"].set()
+        results = await asyncio.gather(*callers[1:])
+        with pytest.raises(asyncio.CancelledError):
+            await callers[0]
+        await aio.aclose()
+        return results
+
+    results = asyncio.run(main())
+    assert slow_fetch["calls"] == 1
+    assert all(sum(counts.values()) == 50 for counts in results)
+
+
+def test_cancelled_fetch_holds_the_lock_until_its_thread_finishes(local, slow_fetch):
+    async def main():
+        caller = asyncio.ensure_future(aio.aget_outcomes(*ARGS, versions=["v1"]))
+        await asyncio.to_thread(slow_fetch["started"].wait, 10)
+        _, _, inflight = aio._loop_state()
+        (fetch,) = inflight.values()
+        fetch.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+        assert _is_locked(local)  # the worker thread is still writing
+
+        slow_fetch["release"].set()
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if not _is_locked(local):
+                break
+        assert not _is_locked(local)
+        counts = await aio.aget_outcomes(*ARGS, versions=["v1"])
+        await aio.aclose()
+        return counts
+
+    assert sum(asyncio.run(main()).values()) == 50
+    assert slow_fetch["calls"] == 1  # the entry written by the cancelled fetch is reused
@@ -0,0 +1,56 @@
+"""Version catalogs are persisted and reused by later processes without requests."""
+
+
+def _new_process(qsb, monkeypatch):
+    """Drop the in-process dataset tree and catalogs, as a new process would start."""
+    monkeypatch.setattr(qsb, "versions_list", [])
+    monkeypatch.setattr(qsb, "dataset_content", None)
+    qsb._CATALOGS.clear()
+    qsb.clear_memory_cache()
+
+
+def test_github_catalog_is_reused_without_requests(github, qsb, monkeypatch):
+    index = qsb.get_index(version="v1")
+    assert (qsb._dataset_cache_dir() / "v1" / "catalog.json").exists()
+    _new_process(qsb, monkeypatch)
+    github.log.clear()
+    assert qsb.get_index(version="v1") == index
+    assert github.log == []
+
+
+def test_mirror_catalog_is_reused_without_requests(mirror, qsb, monkeypatch):
+    index = qsb.get_index(version="v1")
+    qsb.get_outcomes("ghz", 4, "fake_fez", 10, versions=["v1"])
+    _new_process(qsb, monkeypatch)
+    mirror.log.clear()
+    assert qsb.get_index(version="v1") == index
+    qsb.get_outcomes("ghz", 4, "fake_fez", 10, versions=["v1"])
+    assert mirror.log == []
+
+
+def test_expired_mirror_catalog_is_revalidated_by_etag(mirror, qsb, monkeypatch):
+    qsb.get_index(version="v1")
+    qsb.get_outcomes("ghz", 4, "fake_fez", 10, versions=["v1"])
+    _new_process(qsb, monkeypatch)
+    monkeypatch.setattr(qsb, "CACHE_TIMEOUT", 0)
+    mirror.log.clear()
+    qsb.get_outcomes("ghz", 4, "fake_fez", 10, versions=["v1"])
+    # The history is revalidated by the blob SHA of the revalidated catalog
+    assert mirror.downloads("v1/catalog.json") == [304]
+    assert mirror.downloads("ghz_4_fake_fez.jsonl") == []
+
+
+def test_mirror_requests_have_a_timeout(mirror, qsb, monkeypatch):
+    calls = []
+    http_get = qsb._http_get
+
+    def recording(url, **kwargs):
+        calls.append(kwargs.get("timeout"))
+        return http_get(url, **kwargs)
+
+    monkeypatch.setattr(qsb, "_http_get", recording)
+    _new_process(qsb, monkeypatch)
+    (qsb._dataset_cache_dir() / "v1" / "catalog.json").unlink(missing_ok=True)
+    qsb.get_index(version="v1")
+    assert calls and None not in calls
+
@@ -0,0 +1,59 @@
+"""Persistent cursors hand out disjoint sequential windows to concurrent callers."""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+from qsimbench.qsimbench import _SQLiteCursors
+
+KEY = ("ghz", 4, "fake_fez", "circuit", ("v1",))
+
+
+def _claim_many(path, n):
+    """Claim `n` single positions, returning the positions obtained."""
+    store = _SQLiteCursors(path)
+    return [store.claim(KEY, lambda start: (start, start + 1)) for _ in range(n)]
+
+
+def test_thread_claims_are_disjoint(tmp_path):
+    path = tmp_path / "cursors.sqlite"
+    store = _SQLiteCursors(path)
+    with ThreadPoolExecutor(8) as pool:
+        claims = list(pool.map(
+            lambda _: store.claim(KEY, lambda start: (start, start + 1)), range(400)
+        ))
+    assert sorted(claims) == list(range(400))
+
+
+def test_process_claims_are_disjoint(tmp_path):
+    path = tmp_path / "cursors.sqlite"
+    with ProcessPoolExecutor(4, mp_context=multiprocessing.get_context("spawn")) as pool:
+        claims = [pos for part in pool.map(_claim_many, [path] * 4, [50] * 4) for pos in part]
+    assert sorted(claims) == list(range(200))
+
+
+def test_failed_claim_keeps_the_cursor(tmp_path):
+    store = _SQLiteCursors(tmp_path / "cursors.sqlite")
+    store.claim(KEY, lambda start: (None, 5))
+
+    def fail(start):
+        raise ValueError(start)
+
+    with pytest.raises(ValueError):
+        store.claim(KEY, fail)
+    assert store.claim(KEY, lambda start: (start, start)) == 5
+
+
+def test_cursors_survive_the_process(local, tmp_path):
+    path = tmp_path / "cursors.sqlite"
+    local.set_cursor_store(path)
+    first = local.get_outcomes("ghz", 4, "fake_fez", 300, versions=["v1"], exact=False)
+
+    # A new store on the same file, as another process would open it
+    local._SQLITE_CURSORS.clear()
+    second = local.get_outcomes("ghz", 4, "fake_fez", 300, versions=["v1"], exact=False)
+
+    local.reset_cursors()
+    assert local.get_outcomes("ghz", 4, "fake_fez", 300, versions=["v1"], exact=False) == first
+    assert second != first
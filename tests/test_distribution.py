@@ -0,0 +1,67 @@
+"""Distributions are stored next to their cache entry and follow its source."""
+
+import shutil
+
+import pytest
+
+ARGS = ("ghz", 4, "fake_fez")
+HISTORY = "v1/histories/circuit/ghz_4_fake_fez.jsonl"
+
+
+@pytest.fixture
+def editable(qsb, dataset, tmp_path):
+    """The library reading a private copy of the test dataset, free to change."""
+    root = tmp_path / "dataset"
+    shutil.copytree(dataset, root)
+    qsb.set_dataset_url(str(root))
+    return root
+
+
+def _no_aggregation(qsb, monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("history aggregated")
+
+    monkeypatch.setattr(qsb._HistoryView, "merge", fail)
+
+
+def test_distribution_is_reused_without_loading_the_history(local, monkeypatch):
+    counts = local.get_distribution(*ARGS, versions=["v1"])
+    _, _, cache_path = local._history_location(*ARGS, "v1")
+    assert local._distribution_path(cache_path).exists()
+
+    local.clear_memory_cache()
+    monkeypatch.setattr(local, "_get_data", lambda *a, **k: pytest.fail("history loaded"))
+    assert local.get_distribution(*ARGS, versions=["v1"]) == counts
+
+
+def test_revalidated_entry_keeps_its_distribution(local, monkeypatch):
+    counts = local.get_distribution(*ARGS, versions=["v1"])
+    local.clear_memory_cache()
+    _, _, cache_path = local._history_location(*ARGS, "v1")
+    local.os.utime(cache_path, (0, 0))  # expired, but the source is unchanged
+    _no_aggregation(local, monkeypatch)
+    assert local.get_distribution(*ARGS, versions=["v1"]) == counts
+
+
+def test_changed_source_invalidates_the_distribution(editable, qsb):
+    before = qsb.get_distribution(*ARGS, versions=["v1"])
+    path = editable / HISTORY
+    lines = path.read_text().splitlines(keepends=True)
+    path.write_text("".join(lines[:10]))
+    _, _, cache_path = qsb._history_location(*ARGS, "v1")
+    qsb.os.utime(cache_path, (0, 0))
+    qsb.clear_memory_cache()
+
+    after = qsb.get_distribution(*ARGS, versions=["v1"])
+    assert sum(after.values()) < sum(before.values())
+    assert after == qsb.get_distribution(*ARGS, versions=["v1"], force=True)
+
+
+def test_force_recomputes_the_distribution(local):
+    counts = local.get_distribution(*ARGS, versions=["v1"])
+    _, _, cache_path = local._history_location(*ARGS, "v1")
+    sidecar = local._distribution_path(cache_path)
+    sidecar.write_text(sidecar.read_text().replace('"counts": {', '"counts": {"bogus": 1, '))
+    assert "bogus" in local.get_distribution(*ARGS, versions=["v1"])
+    assert local.get_distribution(*ARGS, versions=["v1"], force=True) == counts
+    assert "bogus" not in local.get_distribution(*ARGS, versions=["v1"])
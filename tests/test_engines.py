@@ -0,0 +1,52 @@
+"""The NumPy and pure-Python aggregation engines return the same counts."""
+
+import pytest
+
+pytest.importorskip("numpy")
+
+CASES = [
+    # (algorithm, size, versions, shots)
+    ("ghz", 4, ["v1"], 37),
+    ("qft", 5, ["v1"], 1000),
+    ("qft", 5, ["v1"], 5000),  # several passes over the history
+    ("ghz", 4, ["v1"], 60_000),  # dozens of passes, aggregated from the prefix index
+    ("qft", 5, ["v1", "v2"], 2500),
+    ("ghz", 4, ["v1", "v2"], 3001),
+    ("reg", 3, ["v1"], 700),
+]
+
+
+def _both_engines(qsb, algorithm, size, versions, shots, **kwargs):
+    results = []
+    for engine in ("python", "numpy"):
+        qsb.reset_cursors()
+        results.append([
+            qsb.get_outcomes(algorithm, size, "fake_fez", shots, versions=versions, engine=engine, **kwargs)
+            for _ in range(3)  # sequential calls advance the cursors
+        ])
+    return results
+
+
+@pytest.mark.parametrize("algorithm, size, versions, shots", CASES)
+@pytest.mark.parametrize("strategy", ["sequential", "random"])
+@pytest.mark.parametrize("exact", [False, True])
+def test_engines_agree(local, algorithm, size, versions, shots, strategy, exact):
+    python, numpy = _both_engines(
+        local, algorithm, size, versions, shots, strategy=strategy, exact=exact, seed=11
+    )
+    assert python == numpy
+    if exact:
+        assert all(sum(counts.values()) == shots for counts in python)
+
+
+def test_engines_agree_with_weights(local):
+    python, numpy = _both_engines(
+        local, "qft", 5, ["v1", "v2"], 1234, version_weights=[1, 3], seed=5
+    )
+    assert python == numpy
+
+
+def test_engines_agree_on_integer_keys(local):
+    python, numpy = _both_engines(local, "qft", 5, ["v1"], 999, int_keys=True, strategy="random", seed=2)
+    assert python == numpy
+    assert all(isinstance(k, int) for k in python[0])
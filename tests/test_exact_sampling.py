@@ -0,0 +1,63 @@
+"""Exact down-sampling: totals, support and reproducibility of each method."""
+
+import pytest
+
+from qsimbench.qsimbench import _EXACT_METHODS, _HAS_NUMPY, QSimBenchError, _multinomial_sample
+
+AGG = {"000": 5000, "011": 1, "101": 2500, "110": 0, "111": 4999}
+METHODS = sorted(_EXACT_METHODS)
+
+
+def _skip_unavailable(method):
+    if method == "hypergeometric" and not _HAS_NUMPY:
+        pytest.skip("NumPy is not installed")
+
+
+@pytest.mark.parametrize("method", METHODS)
+@pytest.mark.parametrize("shots", [1, 7, 1024, 10000])
+def test_totals_and_support(method, shots):
+    _skip_unavailable(method)
+    drawn = _multinomial_sample(AGG, shots, seed=3, method=method)
+    assert sum(drawn.values()) == shots
+    assert all(k > 0 for k in drawn.values())
+    assert set(drawn) <= {b for b, k in AGG.items() if k}
+    if method == "hypergeometric":  # without replacement
+        assert all(drawn[b] <= AGG[b] for b in drawn)
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_seed_reproducibility(method):
+    _skip_unavailable(method)
+    first = _multinomial_sample(AGG, 4096, seed=42, method=method)
+    assert _multinomial_sample(AGG, 4096, seed=42, method=method) == first
+    assert _multinomial_sample(AGG, 4096, seed=43, method=method) != first
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_proportions(method):
+    _skip_unavailable(method)
+    drawn = _multinomial_sample(AGG, 5000, seed=1, method=method)
+    total = sum(AGG.values())
+    for b, k in AGG.items():
+        assert abs(drawn.get(b, 0) / 5000 - k / total) < 0.05
+
+
+def test_hypergeometric_takes_everything_when_asked_for_more():
+    if not _HAS_NUMPY:
+        pytest.skip("NumPy is not installed")
+    assert _multinomial_sample({"0": 3, "1": 2}, 5, seed=0, method="hypergeometric") == {"0": 3, "1": 2}
+
+
+def test_no_counts():
+    with pytest.raises(QSimBenchError):
+        _multinomial_sample({"0": 0}, 10, seed=0)
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_get_outcomes_exact(local, method):
+    _skip_unavailable(method)
+    for shots in (3, 95, 1001):
+        counts = local.get_outcomes(
+            "qft", 5, "fake_fez", shots, versions=["v1", "v2"], exact_method=method, seed=shots
+        )
+        assert sum(counts.values()) == shots
@@ -0,0 +1,62 @@
+"""Importing is free of I/O, and the dataset snapshot serves later processes offline."""
+
+import os
+import subprocess
+import sys
+
+import pytest
+import requests
+
+IMPORT_CHECK = """
+import socket, sys
+
+def refuse(*args, **kwargs):
+    raise AssertionError("network access during import")
+
+socket.socket.connect = refuse
+socket.create_connection = refuse
+import qsimbench
+for heavy in ("requests", "sqlite3", "urllib.request", "numpy"):
+    assert heavy not in sys.modules, heavy
+"""
+
+
+def test_import_does_no_io(tmp_path):
+    env = {**os.environ, "QSIMBENCH_CACHE_DIR": str(tmp_path / "cache")}
+    subprocess.run([sys.executable, "-c", IMPORT_CHECK], cwd=tmp_path, env=env, check=True)
+    assert list(tmp_path.iterdir()) == []  # no cache directory, no .env
+
+
+def _forget_dataset(qsb, monkeypatch):
+    """Drop the in-process dataset tree, as a new process would start."""
+    monkeypatch.setattr(qsb, "versions_list", [])
+    monkeypatch.setattr(qsb, "dataset_content", None)
+
+
+def _offline(github, monkeypatch):
+    def refuse(request, **kwargs):
+        raise requests.ConnectionError("offline")
+
+    monkeypatch.setattr(github, "send", refuse)
+
+
+def test_snapshot_is_used_without_requests(github, qsb, monkeypatch):
+    versions = qsb.get_versions()
+    assert versions == ["v1", "v2"]
+    _forget_dataset(qsb, monkeypatch)
+    _offline(github, monkeypatch)
+    assert qsb.get_versions() == versions
+
+
+def test_stale_snapshot_is_used_when_offline(github, qsb, monkeypatch):
+    qsb.get_versions()
+    _forget_dataset(qsb, monkeypatch)
+    monkeypatch.setattr(qsb, "SNAPSHOT_TIMEOUT", 0)
+    _offline(github, monkeypatch)
+    assert qsb.get_versions() == ["v1", "v2"]
+
+
+def test_no_snapshot_and_offline_fails(github, qsb, monkeypatch):
+    _offline(github, monkeypatch)
+    with pytest.raises(qsb.QSimBenchError):
+        qsb.get_versions()
@@ -0,0 +1,73 @@
+"""Streams yield batches or chunks lazily and share the sequential cursor with get_outcomes."""
+
+from itertools import islice
+
+import pytest
+
+ARGS = ("ghz", 4, "fake_fez")
+
+
+def _batches(qsb, version="v1"):
+    """Counts of every non-empty batch of a history, in order."""
+    history = qsb._get_data(*ARGS, version)
+    view = qsb._HistoryView([history])
+    key = view.outcome_key(0)
+    batches = []
+    for j in range(len(history)):
+        lo, hi = history.offsets[j], history.offsets[j + 1]
+        counts = {key(code): int(cnt) for code, cnt in zip(history.codes[lo:hi], history.counts[lo:hi])}
+        if counts:
+            batches.append(view.finalize(counts))
+    return batches
+
+
+def test_batches_are_streamed_in_order_and_wrap(local):
+    batches = _batches(local)
+    stream = local.iter_outcomes(*ARGS, versions=["v1"])
+    assert list(islice(stream, 2 * len(batches) + 3)) == batches * 2 + batches[:3]
+
+
+def test_chunks_cover_consecutive_batches(local):
+    batches = _batches(local)
+    stream = local.iter_outcomes(*ARGS, versions=["v1"], chunk_shots=25)
+    chunks = list(islice(stream, 4))
+    # Batches hold 10 shots: each chunk sums the next three
+    for i, chunk in enumerate(chunks):
+        expected = {}
+        for batch in batches[3 * i:3 * i + 3]:
+            for outcome, cnt in batch.items():
+                expected[outcome] = expected.get(outcome, 0) + cnt
+        assert chunk == expected
+
+
+def test_exact_chunks_have_exactly_the_requested_shots(local):
+    stream = local.iter_outcomes(*ARGS, versions=["v1"], chunk_shots=25, exact=True, seed=3)
+    assert all(sum(chunk.values()) == 25 for chunk in islice(stream, 20))
+
+
+def test_stream_and_get_outcomes_share_the_cursor(local):
+    batches = _batches(local)
+    stream = local.iter_outcomes(*ARGS, versions=["v1"])
+    assert list(islice(stream, 3)) == batches[:3]
+    assert local.get_outcomes(*ARGS, 20, versions=["v1"]) == {
+        k: batches[3].get(k, 0) + batches[4].get(k, 0) for k in {*batches[3], *batches[4]}
+    }
+    assert next(stream) == batches[5]
+
+
+def test_random_streams_are_reproducible(local):
+    first = list(islice(local.iter_outcomes(*ARGS, strategy="random", seed=9), 30))
+    second = list(islice(local.iter_outcomes(*ARGS, strategy="random", seed=9), 30))
+    assert first == second
+    assert all(sum(chunk.values()) == 10 for chunk in first)
+
+
+def test_cold_streams_do_not_decode_the_history(local):
+    stream = local.iter_outcomes(*ARGS, versions=["v1"])
+    list(islice(stream, 100))
+    assert local.memory_cache_info()["entries"] == 0
+
+
+def test_invalid_chunk_size(local):
+    with pytest.raises(local.QSimBenchError):
+        local.iter_outcomes(*ARGS, chunk_shots=0)
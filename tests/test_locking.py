@@ -0,0 +1,64 @@
+"""Cache entries are written atomically and downloaded once under concurrency."""
+
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from qsimbench.qsimbench import _atomic_write_chunks, _file_lock
+
+HISTORY = "v1/histories/circuit/qft_5_fake_fez.jsonl"
+
+
+def test_concurrent_misses_download_once(github, qsb):
+    barrier = threading.Barrier(8)
+
+    def sample(seed):
+        barrier.wait()
+        return qsb.get_outcomes("qft", 5, "fake_fez", 100, versions=["v1"], strategy="random", seed=seed)
+
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(sample, range(8)))
+    assert all(sum(r.values()) == 100 for r in results)
+    assert github.downloads(HISTORY) == [200]
+    assert qsb.disk_cache_info()["entries"] == 1
+
+
+def test_atomic_write_keeps_the_old_file_on_failure(tmp_path):
+    path = tmp_path / "entry.qsb"
+    path.write_bytes(b"old")
+
+    def chunks():
+        yield b"new"
+        raise RuntimeError("interrupted")
+
+    with pytest.raises(RuntimeError):
+        _atomic_write_chunks(path, chunks())
+    assert path.read_bytes() == b"old"
+    assert [p.name for p in tmp_path.iterdir()] == ["entry.qsb"]
+
+    assert _atomic_write_chunks(path, [b"ne", memoryview(b"w")]) == 3
+    assert path.read_bytes() == b"new"
+
+
+def _hold_lock(path, acquired):
+    with _file_lock(path):
+        acquired.put(time.monotonic())
+
+
+def test_lock_excludes_other_processes(tmp_path):
+    path = tmp_path / "entry.qsb"
+    ctx = multiprocessing.get_context("spawn")
+    acquired = ctx.Queue()
+    with _file_lock(path):
+        child = ctx.Process(target=_hold_lock, args=(path, acquired))
+        child.start()
+        time.sleep(1.0)
+        assert acquired.empty()
+        released = time.monotonic()
+    when = acquired.get(timeout=30)
+    child.join(timeout=30)
+    assert child.exitcode == 0
+    assert when >= released
@@ -0,0 +1,73 @@
+"""Decoded histories are kept in memory within a byte budget, evicting the least recently used."""
+
+import pytest
+
+CONFIGS = [("ghz", 4, "fake_fez"), ("qft", 5, "fake_fez"), ("reg", 3, "fake_fez")]
+
+
+@pytest.fixture
+def loads(local, monkeypatch):
+    """Paths of the disk entries decoded since the test started."""
+    paths = []
+    download_and_cache = local._download_and_cache
+
+    def recording(url, cache_path, **kwargs):
+        paths.append(cache_path.name)
+        return download_and_cache(url, cache_path, **kwargs)
+
+    monkeypatch.setattr(local, "_download_and_cache", recording)
+    return paths
+
+
+def test_repeated_calls_are_served_from_memory(local, loads):
+    first = local._get_data(*CONFIGS[0], "v1")
+    info = local.memory_cache_info()
+    for _ in range(5):
+        local.get_outcomes(*CONFIGS[0], 20, versions=["v1"])
+        assert local._get_data(*CONFIGS[0], "v1") is first
+    assert loads == ["ghz_4_fake_fez.qsb"]
+    after = local.memory_cache_info()
+    assert after["hits"] == info["hits"] + 10
+    assert after["misses"] == info["misses"]
+    assert after["entries"] == 1 and after["bytes"] == first.nbytes
+
+
+def test_least_recently_used_history_is_evicted(local, loads):
+    sizes = [local._get_data(*config, "v1").nbytes for config in CONFIGS]
+    local.clear_memory_cache()
+    local.set_memory_budget(sizes[0] + sizes[1] + sizes[2] - 1)
+    for config in CONFIGS[:2]:
+        local._get_data(*config, "v1")
+    local._get_data(*CONFIGS[0], "v1")  # now more recent than the second
+    evictions = local.memory_cache_info()["evictions"]
+    local._get_data(*CONFIGS[2], "v1")
+    assert local.memory_cache_info()["evictions"] == evictions + 1
+
+    loads.clear()
+    local._get_data(*CONFIGS[0], "v1")
+    local._get_data(*CONFIGS[2], "v1")
+    assert loads == []
+    local._get_data(*CONFIGS[1], "v1")
+    assert loads == ["qft_5_fake_fez.qsb"]
+
+
+def test_force_replaces_the_cached_history(local, loads):
+    first = local._get_data(*CONFIGS[0], "v1")
+    forced = local._get_data(*CONFIGS[0], "v1", force=True)
+    assert forced is not first
+    assert local._get_data(*CONFIGS[0], "v1") is forced
+    assert len(loads) == 2
+
+
+def test_zero_budget_disables_the_cache(local, loads):
+    local._get_data(*CONFIGS[0], "v1")
+    local.set_memory_budget(0)
+    assert local.memory_cache_info()["entries"] == 0
+    local._get_data(*CONFIGS[0], "v1")
+    assert len(loads) == 2
+    assert local.memory_cache_info()["bytes"] == 0
+
+
+def test_budget_must_be_a_non_negative_integer(local):
+    with pytest.raises(local.QSimBenchError):
+        local.set_memory_budget(-1)
@@ -0,0 +1,49 @@
+"""Metadata is served from the versioned disk cache, as fresh objects on every call."""
+
+import asyncio
+
+import pytest
+
+
+def test_metadata_is_served_from_disk_without_requests(github, qsb, monkeypatch):
+    metadata = qsb.get_metadata("ghz", 4, "fake_fez", version="v1")
+    version_metadata = qsb.get_version_metadata("v1")
+    assert metadata == [{"algorithm": "ghz", "size": 4, "backend": "fake_fez"}]
+    assert version_metadata == {"version": "v1"}
+
+    # A new process: the snapshot, catalog and metadata files are on disk
+    monkeypatch.setattr(qsb, "versions_list", [])
+    monkeypatch.setattr(qsb, "dataset_content", None)
+    qsb._CATALOGS.clear()
+    github.log.clear()
+    assert qsb.get_metadata("ghz", 4, "fake_fez", version="v1") == metadata
+    assert qsb.get_version_metadata("v1") == version_metadata
+    assert github.log == []
+
+
+def test_metadata_follows_the_resolved_version(local):
+    assert local.get_version_metadata() == {"version": "v2"}
+    assert local.get_version_metadata("v1") == {"version": "v1"}
+
+
+def test_metadata_results_are_not_shared(local):
+    first = local.get_metadata("ghz", 4, "fake_fez")
+    first.append("changed")
+    first[0]["size"] = 0
+    assert local.get_metadata("ghz", 4, "fake_fez") == [
+        {"algorithm": "ghz", "size": 4, "backend": "fake_fez"}
+    ]
+
+
+def test_async_metadata_results_are_not_shared(local):
+    pytest.importorskip("httpx")
+    from qsimbench import aio
+
+    async def main():
+        first = await aio.aget_metadata("qft", 5, "fake_fez", version="v1")
+        first.clear()
+        second = await aio.aget_metadata("qft", 5, "fake_fez", version="v1")
+        await aio.aclose()
+        return second
+
+    assert asyncio.run(main()) == [{"algorithm": "qft", "size": 5, "backend": "fake_fez"}]
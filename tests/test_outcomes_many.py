@@ -0,0 +1,52 @@
+"""Batched requests fetch each history once and match one-by-one calls, in either order."""
+
+import threading
+
+import pytest
+
+SPECS = [
+    {"algorithm": "qft", "size": 5, "backend": "fake_fez", "shots": 200, "strategy": "random", "seed": 1},
+    {"algorithm": "ghz", "size": 4, "backend": "fake_fez", "shots": 50, "strategy": "random", "seed": 2},
+    {"algorithm": "qft", "size": 5, "backend": "fake_fez", "shots": 70, "strategy": "random", "seed": 3,
+     "versions": ["v1", "v2"]},
+    {"algorithm": "ghz", "size": 4, "backend": "fake_fez", "shots": 50, "strategy": "random", "seed": 2},
+]
+
+
+def test_results_match_single_calls(github, qsb):
+    results = qsb.get_outcomes_many(SPECS, max_workers=3)
+    # Identical histories across specs are downloaded once
+    assert github.downloads("v2/histories/circuit/qft_5_fake_fez.jsonl") == [200]
+    assert github.downloads("v2/histories/circuit/ghz_4_fake_fez.jsonl") == [200]
+    assert github.downloads("v1/histories/circuit/qft_5_fake_fez.jsonl") == [200]
+    assert results == [qsb.get_outcomes(**spec) for spec in SPECS]
+
+
+def test_unordered_results_follow_completion(local, monkeypatch):
+    expected = local.get_outcomes_many(SPECS)
+    local.clear_memory_cache()
+
+    # The qft histories only arrive once the ghz results have been handed out
+    released = threading.Event()
+    download_and_cache = local._download_and_cache
+
+    def slow_qft(url, cache_path, **kwargs):
+        if "qft" in cache_path.name:
+            assert released.wait(10)
+        return download_and_cache(url, cache_path, **kwargs)
+
+    monkeypatch.setattr(local, "_download_and_cache", slow_qft)
+    results = local.get_outcomes_many(SPECS, ordered=False)
+    first = [next(results), next(results)]
+    assert sorted(i for i, _ in first) == [1, 3]
+    released.set()
+    rest = list(results)
+    assert sorted(i for i, _ in rest) == [0, 2]
+    assert {i: counts for i, counts in first + rest} == dict(enumerate(expected))
+
+
+def test_invalid_specs_are_rejected(local):
+    with pytest.raises(local.QSimBenchError):
+        local.get_outcomes_many([{"algorithm": "ghz", "size": 4, "backend": "fake_fez", "shot": 5}])
+    with pytest.raises(local.QSimBenchError):
+        local.get_outcomes_many([{"algorithm": "ghz", "size": 4}])
@@ -0,0 +1,64 @@
+"""Prefetch resumes partial downloads, verifies blob SHAs and validates cached entries."""
+
+NAME = "ghz_4_fake_fez.jsonl"
+FILTERS = dict(kinds=["circuit"], algorithms=["ghz"], sizes=[4])
+
+
+def _paths(qsb, dataset):
+    cache_path = qsb._history_location("ghz", 4, "fake_fez", "v1")[2]
+    source = dataset / "v1" / "histories" / "circuit" / NAME
+    return cache_path, qsb._part_path(cache_path), source.read_bytes()
+
+
+def _counts(qsb):
+    qsb.clear_memory_cache()
+    return qsb.get_outcomes("ghz", 4, "fake_fez", 100, versions=["v1"], exact=False)
+
+
+def test_partial_download_is_resumed(github, qsb, dataset):
+    cache_path, part_path, data = _paths(qsb, dataset)
+    part_path.parent.mkdir(parents=True)
+    part_path.write_bytes(data[:len(data) // 2])
+
+    summary = qsb.prefetch("v1", **FILTERS)
+    assert summary["downloaded"] == 1 and not summary["failed"]
+    assert summary["bytes"] == len(data) - len(data) // 2
+    assert github.downloads(NAME) == [206]
+    assert not part_path.exists()
+    assert qsb._read_header(cache_path)["sha"] == github.blobs[f"v1/histories/circuit/{NAME}"]
+
+
+def test_stale_partial_download_fails_the_checksum_and_restarts(github, qsb, dataset):
+    cache_path, part_path, data = _paths(qsb, dataset)
+    part_path.parent.mkdir(parents=True)
+    part_path.write_bytes(b"x" * 100)
+
+    summary = qsb.prefetch("v1", **FILTERS)
+    assert summary["downloaded"] == 1 and not summary["failed"]
+    assert github.downloads(NAME) == [206, 200]
+    assert sum(_counts(qsb).values()) == 100
+
+
+def test_cached_entry_is_skipped_and_leftover_part_removed(github, qsb, dataset):
+    cache_path, part_path, _ = _paths(qsb, dataset)
+    qsb.prefetch("v1", **FILTERS)
+    part_path.write_bytes(b"leftover")
+
+    summary = qsb.prefetch("v1", **FILTERS)
+    assert summary["skipped"] == 1 and summary["downloaded"] == 0
+    assert github.downloads(NAME) == [200]
+    assert not part_path.exists()
+
+
+def test_truncated_entry_is_downloaded_again(github, qsb, dataset):
+    cache_path, _, _ = _paths(qsb, dataset)
+    qsb.prefetch("v1", **FILTERS)
+    expected = _counts(qsb)
+    with open(cache_path, "r+b") as f:  # the header, with its SHA, is intact
+        f.truncate(cache_path.stat().st_size - 16)
+
+    summary = qsb.prefetch("v1", **FILTERS)
+    assert summary["downloaded"] == 1 and summary["skipped"] == 0
+    assert github.downloads(NAME) == [200, 200]
+    qsb.reset_cursors()
+    assert _counts(qsb) == expected
@@ -0,0 +1,80 @@
+"""Round trips of the binary ``.qsb`` cache format and its outcome encodings."""
+
+import pytest
+
+from qsimbench.qsimbench import QSimBenchError, _COMPRESSIONS, _HAS_ZSTD, _History
+
+RECORDS = [
+    {"shots": 4, "data": {"00": 3, "11": 1}},
+    {"shots": 0, "data": {"01": 9}},
+    {"shots": 5, "data": {"11": 2, "10": 3}},
+]
+
+
+def _columns(history):
+    return (
+        history.labels,
+        None if history.values is None else list(history.values),
+        history.width,
+        list(history.shots),
+        list(history.offsets),
+        list(history.codes),
+        list(history.counts),
+    )
+
+
+@pytest.mark.parametrize("compression", _COMPRESSIONS)
+def test_round_trip(compression):
+    if compression == "zstd" and not _HAS_ZSTD:
+        pytest.skip("zstandard is not installed")
+    history = _History.from_records(RECORDS)
+    decoded = _History.from_bytes(history.to_bytes(compression, sha="abc"))
+    assert _columns(decoded) == _columns(history)
+
+
+def test_bitstrings_are_packed():
+    history = _History.from_records(RECORDS)
+    assert history.labels is None
+    assert history.width == 2
+    assert list(history.values) == [0b00, 0b11, 0b10]
+    # The batch without shots keeps its place but none of its data
+    assert list(history.shots) == [4, 0, 5]
+    assert list(history.offsets) == [0, 2, 2, 4]
+
+
+@pytest.mark.parametrize("outcomes", [
+    ["00 1", "11 0"],          # several registers
+    ["0", "11"],               # mixed widths
+    ["0" * 65, "1" * 65],      # wider than 64 bits
+    ["0x", "1x"],              # not bitstrings
+])
+def test_unpackable_outcomes_keep_their_labels(outcomes):
+    history = _History.from_records([{"shots": 2, "data": {o: 1 for o in outcomes}}])
+    assert history.labels == outcomes
+    assert history.values is None
+    decoded = _History.from_bytes(history.to_bytes())
+    assert _columns(decoded) == _columns(history)
+
+
+def test_truncated_file_is_rejected():
+    data = _History.from_records(RECORDS).to_bytes()
+    with pytest.raises(QSimBenchError):
+        _History.from_bytes(data[:-8])
+    with pytest.raises(QSimBenchError):
+        _History.from_bytes(b"not a cache file")
+
+
+def test_labels_reach_the_caller(local):
+    counts = local.get_outcomes("reg", 3, "fake_fez", 50, versions=["v1"], seed=1)
+    assert sum(counts.values()) == 50
+    assert set(counts) <= {"00 1", "11 0", "01 1"}
+    with pytest.raises(QSimBenchError):
+        local.get_outcomes("reg", 3, "fake_fez", 50, versions=["v1"], int_keys=True)
+
+
+def test_packed_outcomes_reach_the_caller(local):
+    kwargs = dict(versions=["v1"], seed=1, strategy="random")
+    counts = local.get_outcomes("ghz", 4, "fake_fez", 50, **kwargs)
+    assert set(counts) <= {"0000", "1111", "0101"}
+    ints = local.get_outcomes("ghz", 4, "fake_fez", 50, int_keys=True, **kwargs)
+    assert ints == {int(k, 2): v for k, v in counts.items()}
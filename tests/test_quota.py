@@ -0,0 +1,88 @@
+"""Quota eviction is least-recently-used, counts every cached file and never removes pinned entries."""
+
+CONFIGS = [("ghz", 4, "v1"), ("qft", 5, "v1"), ("ghz", 4, "v2"), ("qft", 5, "v2")]
+
+
+def _cache_path(qsb, algorithm, size, version):
+    return qsb._history_location(algorithm, size, "fake_fez", version)[2]
+
+
+def _load(qsb, algorithm, size, version):
+    qsb.clear_memory_cache()  # go through the disk cache
+    qsb.get_outcomes(algorithm, size, "fake_fez", 10, versions=[version])
+
+
+def test_pinned_entries_survive_eviction(local):
+    local.pin("ghz", 4, "fake_fez", version="v1")
+    for config in CONFIGS:
+        _load(local, *config)
+    local.set_cache_quota(1)
+
+    cached = [c for c in CONFIGS if _cache_path(local, *c).exists()]
+    assert cached == [("ghz", 4, "v1")]
+    info = local.disk_cache_info()
+    assert info["entries"] == 1 and info["pinned"] == 1
+
+    # The entry just written is kept too, even over the quota
+    _load(local, "qft", 5, "v2")
+    assert _cache_path(local, "qft", 5, "v2").exists()
+    assert _cache_path(local, "ghz", 4, "v1").exists()
+
+    local.unpin("ghz", 4, "fake_fez", version="v1")
+    _load(local, "ghz", 4, "v2")
+    assert not _cache_path(local, "ghz", 4, "v1").exists()
+    assert local.disk_cache_info()["pinned"] == 0
+
+
+def test_least_recently_used_entry_is_evicted_first(local):
+    first, second, third = CONFIGS[:3]
+    for config in (first, second, third):
+        _load(local, *config)
+    _load(local, *first)  # now the most recently used
+
+    local.set_cache_quota(local.disk_cache_info()["bytes"] - 1)
+    assert not _cache_path(local, *second).exists()
+    assert _cache_path(local, *first).exists()
+    assert _cache_path(local, *third).exists()
+
+
+def test_memory_hits_count_as_uses(local):
+    first, second, third = CONFIGS[:3]
+    for algorithm, size, version in (first, second, third):
+        local.get_outcomes(algorithm, size, "fake_fez", 10, versions=[version])
+    # Served from memory, which makes its disk entry the most recently used
+    hits = local.memory_cache_info()["hits"]
+    local.get_outcomes("ghz", 4, "fake_fez", 10, versions=["v1"])
+    assert local.memory_cache_info()["hits"] == hits + 1
+
+    local.set_cache_quota(local.disk_cache_info()["bytes"] - 1)
+    assert _cache_path(local, *first).exists()
+    assert not _cache_path(local, *second).exists()
+
+
+def test_every_file_counts_towards_the_quota(local):
+    _load(local, "ghz", 4, "v1")
+    local.get_distribution("ghz", 4, "fake_fez", versions=["v1"])
+    files = [p for p in local.CACHE_DIR.rglob("*") if p.is_file() and not p.name.startswith(".")]
+    assert len(files) > 2  # the history, its sidecar, the catalog...
+    assert local.disk_cache_info()["bytes"] == sum(p.stat().st_size for p in files)
+
+
+def test_writes_do_not_rescan_the_cache(local, monkeypatch):
+    local.set_cache_quota(10**9)  # scans once
+    scans = []
+    scan = local._DISK_USAGE._scan
+    monkeypatch.setattr(local._DISK_USAGE, "_scan", lambda: scans.append(1) or scan())
+    for config in CONFIGS:
+        _load(local, *config)
+    assert scans == []
+    assert local.disk_cache_info()["entries"] == len(CONFIGS)
+
+
+def test_eviction_removes_distribution_sidecars(local):
+    local.get_distribution("ghz", 4, "fake_fez", versions=["v1"])
+    path = _cache_path(local, "ghz", 4, "v1")
+    sidecar = local._distribution_path(path)
+    assert sidecar.exists()
+    local.set_cache_quota(1)
+    assert not path.exists() and not sidecar.exists()
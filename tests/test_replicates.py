@@ -0,0 +1,50 @@
+"""Replicates are reproducible per seed and only hold columns for the outcomes drawn."""
+
+import pytest
+
+pytest.importorskip("numpy")
+
+
+def _rows(outcomes, matrix):
+    """Each replicate as an {outcome: count} dict, independent of the columns."""
+    return [
+        {outcome: int(count) for outcome, count in zip(outcomes, row) if count}
+        for row in matrix
+    ]
+
+
+@pytest.mark.parametrize("exact", [True, False])
+def test_replicates_are_reproducible(local, exact):
+    first = local.get_replicates("qft", 5, "fake_fez", 50, 20, versions=["v1"], seed=3, exact=exact)
+    second = local.get_replicates("qft", 5, "fake_fez", 50, 20, versions=["v1"], seed=3, exact=exact)
+    assert first[0] == second[0]
+    assert (first[1] == second[1]).all()
+    other = local.get_replicates("qft", 5, "fake_fez", 50, 20, versions=["v1"], seed=4, exact=exact)
+    assert _rows(*other) != _rows(*first)
+
+
+def test_first_replicates_do_not_depend_on_the_count(local):
+    few = local.get_replicates("qft", 5, "fake_fez", 30, 3, versions=["v1", "v2"], seed=8)
+    many = local.get_replicates("qft", 5, "fake_fez", 30, 40, versions=["v1", "v2"], seed=8)
+    assert _rows(*many)[:3] == _rows(*few)
+
+
+@pytest.mark.parametrize("exact", [True, False])
+def test_columns_are_restricted_to_drawn_outcomes(local, exact):
+    outcomes, matrix = local.get_replicates(
+        "qft", 5, "fake_fez", 15, 2, versions=["v1"], seed=1, exact=exact
+    )
+    assert matrix.shape == (2, len(outcomes))
+    assert outcomes == sorted(outcomes)
+    assert len(outcomes) < 32  # a few batches of 10 shots cannot hit every outcome
+    assert matrix.any(axis=0).all()
+    if exact:
+        assert (matrix.sum(axis=1) == 15).all()
+
+
+def test_integer_labels(local):
+    outcomes, matrix = local.get_replicates(
+        "ghz", 4, "fake_fez", 100, 5, versions=["v1"], seed=2, int_keys=True
+    )
+    assert set(outcomes) <= {0b0000, 0b1111, 0b0101}
+    assert (matrix.sum(axis=1) == 100).all()
@@ -0,0 +1,44 @@
+"""Expired cache entries are revalidated instead of downloaded again."""
+
+HISTORY = "v1/histories/circuit/ghz_4_fake_fez.jsonl"
+
+
+def _sample(qsb):
+    return qsb.get_outcomes("ghz", 4, "fake_fez", 500, versions=["v1"], strategy="random", seed=4)
+
+
+def test_unchanged_blob_sha_skips_the_request(github, qsb):
+    first = _sample(qsb)
+    assert github.downloads(HISTORY) == [200]
+    qsb.set_cache_timeout(0)  # every entry, on disk and in memory, is expired
+    for _ in range(3):
+        assert _sample(qsb) == first
+    assert github.downloads(HISTORY) == [200]
+
+
+def test_unchanged_etag_is_not_downloaded(github, qsb, monkeypatch):
+    first = _sample(qsb)
+    # Without a blob SHA to compare, revalidation falls back to If-None-Match
+    monkeypatch.setattr(qsb._storage(), "revision", lambda version, path: None)
+    qsb.set_cache_timeout(0)
+    assert _sample(qsb) == first
+    assert _sample(qsb) == first
+    assert github.downloads(HISTORY) == [200, 304, 304]
+
+
+def test_revalidation_keeps_the_entry_fresh(github, qsb, monkeypatch):
+    _sample(qsb)
+    monkeypatch.setattr(qsb._storage(), "revision", lambda version, path: None)
+    qsb.set_cache_timeout(3600)
+    qsb.clear_memory_cache()
+    _, _, cache_path = qsb._history_location("ghz", 4, "fake_fez", "v1")
+    qsb.os.utime(cache_path, (0, 0))  # expired long ago
+    _sample(qsb)
+    _sample(qsb)  # fresh again: served from memory without a request
+    assert github.downloads(HISTORY) == [200, 304]
+
+
+def test_force_downloads_again(github, qsb):
+    _sample(qsb)
+    qsb.get_outcomes("ghz", 4, "fake_fez", 500, versions=["v1"], force=True)
+    assert github.downloads(HISTORY) == [200, 200]
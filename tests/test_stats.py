@@ -0,0 +1,86 @@
+"""Instrumentation counts what the hot paths process and reports it to the trace hook."""
+
+import pytest
+
+HISTORY = "v1/histories/circuit/ghz_4_fake_fez.jsonl"
+
+
+def _sample(qsb, **kwargs):
+    return qsb.get_outcomes("ghz", 4, "fake_fez", 55, versions=["v1"], **kwargs)
+
+
+@pytest.fixture
+def events(qsb):
+    """Events received by a trace hook installed for the test."""
+    received = []
+    qsb.set_trace_hook(received.append)
+    yield received
+    qsb.set_trace_hook(None)
+
+
+def test_nothing_is_recorded_by_default(local):
+    _sample(local, exact=True)
+    snapshot = local.stats()
+    assert snapshot["enabled"] is False
+    assert not any(snapshot["counters"].values())
+    assert not any(phase["calls"] for phase in snapshot["phases"].values())
+
+
+def test_counters_follow_the_hot_paths(github, qsb, dataset):
+    qsb.set_stats_enabled(True)
+    _sample(qsb)
+    counters = qsb.stats()["counters"]
+    history = qsb._get_data("ghz", 4, "fake_fez", "v1")
+    assert counters["bytes_downloaded"] == (dataset / HISTORY).stat().st_size
+    assert counters["records_parsed"] == len(history)
+    assert counters["disk_misses"] == 1 and counters["memory_misses"] == 1
+    assert counters["bytes_written"] > 0
+    assert counters["requests"] == len(github.log)
+
+    qsb.reset_stats()
+    _sample(qsb, exact=True)
+    snapshot = qsb.stats()
+    assert snapshot["counters"]["memory_hits"] >= 1
+    assert snapshot["counters"]["requests"] == snapshot["counters"]["records_parsed"] == 0
+    assert snapshot["counters"]["batches_aggregated"] >= 6  # 55 shots from batches of 10
+    assert snapshot["counters"]["exact_samples"] == 1
+    assert snapshot["phases"]["aggregate"]["calls"] == 1
+    assert snapshot["phases"]["exact_sample"]["calls"] == 1
+
+
+def test_collected_values_are_kept_when_disabled(local):
+    local.set_stats_enabled(True)
+    _sample(local)
+    collected = local.stats()["counters"]
+    local.set_stats_enabled(False)
+    _sample(local)
+    assert local.stats()["counters"] == collected
+    local.reset_stats()
+    assert not any(local.stats()["counters"].values())
+
+
+def test_trace_hook_receives_every_event(local, events):
+    # Stats collection is off: the hook alone turns instrumentation on
+    _sample(local, exact=True)
+    assert {event["phase"] for event in events} >= {"parse", "aggregate", "exact_sample"}
+    assert all(event["phase"] is None or event["phase"] in local._PHASES for event in events)
+    assert all(event["seconds"] >= 0 for event in events)
+    assert not any(local.stats()["counters"].values())
+
+    # With both on, the hook sees exactly what the statistics add up
+    events.clear()
+    local.set_stats_enabled(True)
+    local.clear_memory_cache()
+    _sample(local)
+    totals = dict.fromkeys(local._COUNTERS, 0)
+    for event in events:
+        for name in local._COUNTERS:
+            totals[name] += event.get(name, 0)
+    assert totals == local.stats()["counters"]
+
+
+def test_invalid_settings_are_rejected(qsb):
+    with pytest.raises(qsb.QSimBenchError):
+        qsb.set_trace_hook("print")
+    with pytest.raises(qsb.QSimBenchError):
+        qsb.set_stats_enabled(1)
@@ -0,0 +1,70 @@
+"""Histories are downloaded in bounded chunks and parsed as the body arrives."""
+
+import json
+
+import pytest
+
+HISTORY = "v1/histories/circuit/qft_5_fake_fez.jsonl"
+
+
+def _columns(history):
+    return [list(column) for column in (history.offsets, history.codes, history.counts, history.shots)]
+
+
+@pytest.mark.parametrize("chunks", [
+    [b'{"a": 1}\n{"b": 2}\n'],
+    [b'{"a": 1', b'}\n{"b"', b': 2}'],  # lines split across chunks, no final newline
+    [b'{"a": 1}\r\n', b"\n", b'{"b": 2}\r\n', b""],
+])
+def test_lines_are_split_across_chunks(qsb, chunks):
+    assert [json.loads(line) for line in qsb._iter_lines(chunks) if line.strip()] == [{"a": 1}, {"b": 2}]
+
+
+def test_download_is_streamed_in_chunks(github, qsb, dataset, monkeypatch):
+    monkeypatch.setattr(qsb, "_DOWNLOAD_CHUNK", 97)
+    sizes = []
+    tee_body = qsb._tee_body
+
+    def recording(resp, f):
+        assert resp.raw is not None and not resp._content_consumed
+        for chunk in tee_body(resp, f):
+            sizes.append(len(chunk))
+            yield chunk
+
+    monkeypatch.setattr(qsb, "_tee_body", recording)
+    history = qsb._get_data("qft", 5, "fake_fez", "v1")
+    assert github.downloads(HISTORY) == [200]
+    assert max(sizes) <= 97 and sum(sizes) == (dataset / HISTORY).stat().st_size
+
+    # Same records as a parse of the whole file, and the blob SHA of what was received
+    expected = qsb._parse_history((dataset / HISTORY).read_bytes().splitlines())
+    assert _columns(history) == _columns(expected)
+    _, _, cache_path = qsb._history_location("qft", 5, "fake_fez", "v1")
+    assert qsb._history_source(cache_path) == github.blobs[HISTORY]
+    assert not qsb._part_path(cache_path).exists()
+
+
+def test_interrupted_download_leaves_no_entry(github, qsb, monkeypatch):
+    tee_body = qsb._tee_body
+
+    def broken(resp, f):
+        body = tee_body(resp, f)
+        yield next(body)
+        raise qsb.requests.ConnectionError("connection reset")
+
+    monkeypatch.setattr(qsb, "_DOWNLOAD_CHUNK", 64)
+    monkeypatch.setattr(qsb, "_tee_body", broken)
+    with pytest.raises(qsb.QSimBenchError):
+        qsb._get_data("qft", 5, "fake_fez", "v1")
+    _, _, cache_path = qsb._history_location("qft", 5, "fake_fez", "v1")
+    assert not cache_path.exists()
+    assert not qsb._part_path(cache_path).exists()
+
+    monkeypatch.setattr(qsb, "_tee_body", tee_body)
+    assert len(qsb._get_data("qft", 5, "fake_fez", "v1"))
+
+
+def test_standard_decoder_without_orjson(qsb, monkeypatch):
+    monkeypatch.setattr(qsb, "_HAS_ORJSON", False)
+    monkeypatch.setattr(qsb, "_json_loads", None)
+    assert qsb._json_decoder() is json.loads
@@ -0,0 +1,101 @@
+"""Multi-version views: batch numbering, outcome merging and version weights."""
+
+import pytest
+
+from qsimbench.qsimbench import QSimBenchError, _allocate_shots, _History, _HistoryView
+
+V1 = {"0000", "1111", "0101"}  # outcomes of ghz_4_fake_fez in each version
+V2 = {"0011", "1100"}
+
+
+def _history(*batches):
+    return _History.from_records({"shots": sum(b.values()), "data": b} for b in batches)
+
+
+def test_view_numbers_batches_across_parts():
+    view = _HistoryView([_history({"0": 1}, {"1": 2}), _history({"1": 3}), _history({"0": 4}, {"1": 5})])
+    assert len(view) == 5
+    assert [view.locate(i) for i in range(5)] == [(0, 0), (0, 1), (1, 0), (2, 0), (2, 1)]
+    assert [view.shots_at(i) for i in range(5)] == [1, 2, 3, 4, 5]
+    assert view.part_shots() == [3, 3, 9]
+
+
+def test_view_merges_outcomes_by_value():
+    a, b = _history({"01": 1, "10": 2}), _history({"10": 3, "11": 4})
+    view = _HistoryView([a, b])
+    assert view.packed
+    merged = view.merge([a.totals(), b.totals()])
+    assert view.finalize(merged) == {"01": 1, "10": 5, "11": 4}
+    assert view.finalize(merged, int_keys=True) == {1: 1, 2: 5, 3: 4}
+
+
+@pytest.mark.parametrize("other", [{"010": 3}, {"1 0": 3}])
+def test_view_merges_mixed_encodings_as_bitstrings(other):
+    a, b = _history({"01": 1, "10": 2}), _history(other)
+    view = _HistoryView([a, b])
+    assert not view.packed
+    assert view.finalize(view.merge([a.totals(), b.totals()])) == {"01": 1, "10": 2, **other}
+    with pytest.raises(QSimBenchError):
+        view.finalize({}, int_keys=True)
+
+
+@pytest.mark.parametrize("shots, weights, expected", [
+    (10, [1, 1], [5, 5]),
+    (10, [1, 1, 1], [4, 3, 3]),  # ties go to the earlier weight
+    (7, [0.5, 0.25, 0.25], [3, 2, 2]),
+    (5, [1, 0], [5, 0]),
+    (1, [1, 3], [0, 1]),
+])
+def test_allocate_shots(shots, weights, expected):
+    assert _allocate_shots(shots, weights) == expected
+
+
+def _split(counts):
+    """Shots drawn from each version of ghz_4_fake_fez."""
+    assert set(counts) <= V1 | V2
+    return (
+        sum(k for b, k in counts.items() if b in V1),
+        sum(k for b, k in counts.items() if b in V2),
+    )
+
+
+@pytest.mark.parametrize("strategy", ["sequential", "random"])
+def test_weights_split_the_shots(local, strategy):
+    counts = local.get_outcomes(
+        "ghz", 4, "fake_fez", 400, versions=["v1", "v2"], exact=False,
+        strategy=strategy, version_weights=[3, 1], seed=9,
+    )
+    assert _split(counts) == (300, 100)
+
+
+@pytest.mark.parametrize("strategy", ["sequential", "random"])
+def test_zero_weight_excludes_a_version(local, strategy):
+    counts = local.get_outcomes(
+        "ghz", 4, "fake_fez", 250, versions=["v1", "v2"],
+        strategy=strategy, version_weights=[0, 2], seed=9,
+    )
+    assert _split(counts) == (0, 250)
+
+
+def test_sequential_default_split_follows_the_shots_held(local):
+    held = [
+        sum(local._get_data("ghz", 4, "fake_fez", version).shots) for version in ("v1", "v2")
+    ]
+    counts = local.get_outcomes("ghz", 4, "fake_fez", 1000, versions=["v1", "v2"], exact=False)
+    # Without exact sampling, each window ends with a whole batch of 10 shots
+    for got, want in zip(_split(counts), _allocate_shots(1000, held)):
+        assert want <= got < want + 10
+
+
+def test_random_draws_from_every_version(local):
+    counts = local.get_outcomes(
+        "ghz", 4, "fake_fez", 2000, versions=["v1", "v2"], strategy="random", seed=1
+    )
+    from_v1, from_v2 = _split(counts)
+    assert from_v1 > from_v2 > 0
+
+
+@pytest.mark.parametrize("weights", [[1], [1, -1], [0, 0], [1, "2"]])
+def test_invalid_weights(local, weights):
+    with pytest.raises(QSimBenchError):
+        local.get_outcomes("ghz", 4, "fake_fez", 10, versions=["v1", "v2"], version_weights=weights)
@@ -0,0 +1,120 @@
+"""Incremental window statistics match a brute-force per-window computation."""
+
+import math
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+ARGS = ("qft", 5, "fake_fez")
+
+
+def _brute_force(history, window, step, target):
+    """Metrics of every window from its own counts, one window at a time."""
+    rows, previous = [], None
+    for start in range(0, len(history) - window + 1, step):
+        counts = {}
+        for batch in range(start, start + window):
+            lo, hi = history.offsets[batch], history.offsets[batch + 1]
+            for code, cnt in zip(history.codes[lo:hi], history.counts[lo:hi]):
+                counts[code] = counts.get(code, 0) + cnt
+        shots = sum(counts.values())
+        if not shots:
+            rows.append((start, 0, math.nan, math.nan, math.nan, math.nan))
+            previous = None
+            continue
+        probs = {code: cnt / shots for code, cnt in counts.items()}
+        entropy = -sum(p * math.log2(p) for p in probs.values())
+        tvd = hellinger = math.nan
+        if previous is not None:
+            keys = set(probs) | set(previous)
+            tvd = 0.5 * sum(abs(probs.get(k, 0) - previous.get(k, 0)) for k in keys)
+            overlap = sum(math.sqrt(probs.get(k, 0) * previous.get(k, 0)) for k in keys)
+            hellinger = math.sqrt(max(0.0, 1 - overlap))
+        rows.append((start, shots, entropy, probs.get(target, 0.0), tvd, hellinger))
+        previous = probs
+    return np.array(rows, dtype=float).reshape(-1, 6)
+
+
+def _as_rows(stats):
+    names = ("start", "shots", "entropy", "success_probability", "tvd", "hellinger")
+    return np.column_stack([stats[name] for name in names])
+
+
+@pytest.mark.parametrize("window, step", [
+    (10, None), (10, 1), (7, 3), (3, 5), (1, 1), (25, 25), (150, 1), (150, 7),
+])
+def test_matches_brute_force(local, window, step):
+    history = local._get_data(*ARGS, "v1")
+    stats = local.get_window_stats(*ARGS, window, step=step, version="v1", target="00000")
+    expected = _brute_force(history, window, step or window, history.values.tolist().index(0))
+    assert stats["target"] == "00000"
+    np.testing.assert_allclose(_as_rows(stats), expected, rtol=1e-9, atol=1e-12)
+
+
+def test_windows_around_empty_batches(local):
+    # Batch 7 of each 25 has no shots: single-batch windows over it are NaN
+    stats = local.get_window_stats("ghz", 4, "fake_fez", 1, version="v1")
+    assert stats["shots"][7] == 0
+    for name in ("entropy", "success_probability", "tvd", "hellinger"):
+        assert math.isnan(stats[name][7])
+    assert math.isnan(stats["tvd"][8]) and not math.isnan(stats["tvd"][9])
+
+
+def test_results_are_read_only(local):
+    stats = local.get_window_stats(*ARGS, 10, version="v1")
+    with pytest.raises(ValueError):
+        stats["entropy"][0] = 0.0
+
+
+def _sidecars(qsb):
+    cache_path = qsb._history_location(*ARGS, "v1")[2]
+    return sorted(cache_path.parent.glob(f"{cache_path.stem}.windows.*"))
+
+
+def test_results_are_stored_with_the_cache_entry(local, monkeypatch):
+    first = local.get_window_stats(*ARGS, 10, step=3, version="v1")
+    assert len(_sidecars(local)) == 1
+
+    # Another process: served from the sidecar, without loading the history
+    local.clear_memory_cache()
+
+    def no_history(*args, **kwargs):
+        raise AssertionError("history loaded")
+
+    monkeypatch.setattr(local, "_get_data", no_history)
+    second = local.get_window_stats(*ARGS, 10, step=3, version="v1")
+    assert second["target"] == first["target"]
+    np.testing.assert_array_equal(_as_rows(second), _as_rows(first))
+    with pytest.raises(ValueError):
+        second["tvd"][1] = 0.0
+
+
+def test_sidecar_of_another_source_is_ignored(local):
+    local.get_window_stats(*ARGS, 10, version="v1")
+    (sidecar,) = _sidecars(local)
+    data = sidecar.read_bytes()
+    head, _, body = data.partition(b"\n")
+    sidecar.write_bytes(head.replace(b'"source": "', b'"source": "old-') + b"\n" + body)
+
+    stats = local.get_window_stats(*ARGS, 10, version="v1")
+    assert not math.isnan(stats["entropy"][0])
+    assert sidecar.read_bytes() == data  # recomputed and stored again
+
+
+def test_expired_entry_is_not_served_from_the_sidecar(local, monkeypatch):
+    local.get_window_stats(*ARGS, 10, version="v1")
+    monkeypatch.setattr(local, "CACHE_TIMEOUT", 0)
+    loads = []
+    get_data = local._get_data
+    monkeypatch.setattr(local, "_get_data", lambda *a, **k: loads.append(a) or get_data(*a, **k))
+    local.get_window_stats(*ARGS, 10, version="v1")
+    assert len(loads) == 1
+
+
+def test_eviction_removes_window_sidecars(local):
+    local.get_window_stats(*ARGS, 10, version="v1")
+    local.get_window_stats(*ARGS, 5, step=1, version="v1")
+    assert len(_sidecars(local)) == 2
+    local.set_cache_quota(1)
+    assert _sidecars(local) == []